@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import struct
+import tempfile
+import timeit
+import wave
+
+import taglib
+from playerlib.track.readers import audio_headers
+
+def create_wav(path, seconds):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(bytes(44100 * 4 * seconds))
+
+def create_flac(path, seconds):
+    info = (44100 << 44) | (1 << 41) | (15 << 36) | (44100 * seconds)
+    with open(path, 'wb') as f:
+        f.write(b'fLaC' + bytes([0x80, 0, 0, 34]) + bytes(10) + struct.pack('>Q', info) + bytes(16))
+        f.write(bytes(1024 * 1024))
+
+def create_mp3(path, frames):
+    with open(path, 'wb') as f:
+        f.write(bytes([0xff, 0xfb, 0x90, 0x00]) + bytes(32) + b'Xing' + struct.pack('>II', 1, frames))
+        f.write(bytes(1024 * 1024))
+
+def taglib_length(path):
+    return taglib.File(path).length
+
+def main():
+    nr_of_reads = 200
+    with tempfile.TemporaryDirectory() as d:
+        files = [os.path.join(d, name) for name in ('file.wav', 'file.flac', 'file.mp3')]
+        create_wav(files[0], 60)
+        create_flac(files[1], 60)
+        create_mp3(files[2], 2000)
+        readers = [('headers', audio_headers.read_length), ('taglib', taglib_length)]
+        for path in files:
+            for name, reader in readers if not path.endswith('.mp3') else readers[:1]:
+                length = reader(path)
+                elapsed = min(timeit.repeat(lambda: reader(path), number=nr_of_reads, repeat=5))
+                print('{:>8} {}: length {}s in {:.1f} us/file'.format(
+                    name, os.path.basename(path), length, elapsed / nr_of_reads * 1e6))
+
+if __name__ == '__main__':
+    main()
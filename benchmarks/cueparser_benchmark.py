@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import tempfile
+import timeit
+
+from cueparser import *
+
+def create_cue_sheet(path, nr_of_tracks):
+    with open(path, 'w') as f:
+        f.write('REM GENRE "Heavy Metal"\nREM DATE 1982\nPERFORMER "Iron Maiden"\nTITLE "The Number of the Beast"\n')
+        f.write('FILE "album.flac" WAVE\n')
+        for i in range(1, nr_of_tracks + 1):
+            f.write('  TRACK {:02} AUDIO\n'.format(i))
+            f.write('    TITLE "Track {}"\n'.format(i))
+            f.write('    PERFORMER "Iron Maiden"\n')
+            f.write('    FLAGS DCP\n')
+            f.write('    INDEX 00 {:02}:{:02}:00\n'.format(i * 3, 55))
+            f.write('    INDEX 01 {:02}:{:02}:00\n'.format(i * 4, 0))
+
+def main():
+    nr_of_sheets = 1000
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'album.cue')
+        create_cue_sheet(path, 20)
+        parser = CueParser()
+        elapsed = min(timeit.repeat(lambda: parser.parse(path), number=nr_of_sheets, repeat=5))
+        print('parse: {} sheets with 20 tracks in {:.3f}s ({:.1f} us/sheet)'.format(
+            nr_of_sheets, elapsed, elapsed / nr_of_sheets * 1e6))
+
+if __name__ == '__main__':
+    main()
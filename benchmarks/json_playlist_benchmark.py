@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import json
+import tempfile
+import time
+import tracemalloc
+
+from playerlib.playlist.formats.json_playlist import *
+from playerlib.track.track import *
+
+def create_tracks(nr_of_tracks):
+    tracks = []
+    for i in range(nr_of_tracks):
+        track = Track()
+        track.path = '/music/Artist {0}/Album {1}/{2:02} - Track {3}.flac'.format(i % 500, i % 20, i % 20, i)
+        track.title = 'Track {}'.format(i)
+        track.artist = 'Artist {}'.format(i % 500)
+        track.album = 'Album {}'.format(i % 20)
+        track.index = str(i % 20)
+        track.set_length(200 + i % 100)
+        tracks.append(track)
+    return tracks
+
+def load_list(filename):
+    # Previous way: whole file is decoded before any track is created
+    with open(filename, 'r') as f:
+        for track in json.load(f, object_hook=lambda d: string_pool.intern_track(Track(d))):
+            yield track
+
+def load_lines(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        yield from JsonPlaylist().iter_read(f)
+
+def measure(load, filename):
+    string_pool.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tracks = load(filename)
+    next(tracks)
+    first = time.perf_counter() - start
+    # Tracks are dropped as playlist would keep them anyway
+    for _ in tracks: pass
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak
+
+def main():
+    nr_of_tracks = 100000
+    tracks = create_tracks(nr_of_tracks)
+    with tempfile.TemporaryDirectory() as tmp:
+        list_file, lines_file = os.path.join(tmp, 'list.json'), os.path.join(tmp, 'lines.json')
+        with open(list_file, 'w') as f:
+            json.dump([t.to_dict() for t in tracks], f, indent=1)
+        start = time.perf_counter()
+        with open(lines_file, 'w', encoding='utf-8') as f:
+            JsonPlaylist().write(f, tracks)
+        print('{} tracks; saving as JSON lines: {:.3f}s'.format(nr_of_tracks, time.perf_counter() - start))
+        for name, load, filename in (('JSON list', load_list, list_file), ('JSON lines', load_lines, lines_file)):
+            first, total, peak = measure(load, filename)
+            print('{:>10}: first track after {:.3f}s, all after {:.3f}s, peak memory {:.1f} MiB'.format(
+                name, first, total, peak / 2**20))
+
+if __name__ == '__main__':
+    main()
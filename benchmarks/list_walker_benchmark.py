@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import time
+import tracemalloc
+import urwim
+
+class Entry(urwim.ListBoxEntry):
+
+    def __init__(self, line):
+        self.line = line
+        super().__init__(['  ', line], 'file', 'file_focused')
+
+    @property
+    def text(self):
+        return self.line
+
+class Item(urwim.ListItem):
+
+    __slots__ = ('line',)
+
+    def __init__(self, line):
+        self.line = line
+        super().__init__(['  ', line], 'file', 'file_focused')
+
+    @property
+    def text(self):
+        return self.line
+
+def measure(walker_class, entry_class, lines):
+    tracemalloc.start()
+    start = time.perf_counter()
+    walker = walker_class([entry_class(line) for line in lines])
+    listbox = urwim.ListWidget(walker)
+    listbox.render((80, 50), focus=True)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, memory, listbox
+
+def main():
+    nr_of_rows = 100000
+    lines = ['{}. Artist - Track {} 00:03:20'.format(i % 20, i) for i in range(nr_of_rows)]
+    for name, walker_class, entry_class in (
+            ('SimpleListWalker', urwim.SimpleListWalker, Entry),
+            ('VirtualListWalker', urwim.VirtualListWalker, Item)):
+        elapsed, memory, _ = measure(walker_class, entry_class, lines)
+        print('{:>17}: {} rows built and rendered in {:.3f}s, {:.1f} MiB'.format(
+            name, nr_of_rows, elapsed, memory / 2**20))
+
+if __name__ == '__main__':
+    main()
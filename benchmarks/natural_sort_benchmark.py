@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import random
+import re
+import timeit
+
+from playerlib.natural_sort import *
+
+def old_predicate(f):
+    # Previous key of TracksReader
+    if f[0].isdigit():
+        a = re.search('[0-9]*.[0-9]+', f).group(0)
+        return a.zfill(9)
+    return f
+
+def create_names(nr_of_names):
+    names = []
+    for i in range(nr_of_names):
+        kind = i % 3
+        if kind == 0: names.append('{:02} - Track {}.flac'.format(i % 100, i))
+        elif kind == 1: names.append('CD{}/Track {}.mp3'.format(i % 7, i))
+        else: names.append('Some Artist - Song {}.ogg'.format(i))
+    random.Random(0).shuffle(names)
+    return names
+
+def main():
+    names = create_names(100000)
+    for name, key in (('old predicate', old_predicate), ('natural_sort_key', natural_sort_key)):
+        elapsed = min(timeit.repeat(lambda: sorted(names, key=key), number=1, repeat=5))
+        print('{:>16}: sorted {} names in {:.3f}s'.format(name, len(names), elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import random
+import time
+
+from playerlib.playlist.play_order import *
+
+class Entry:
+
+    __slots__ = ('prev', 'next')
+
+    def __init__(self, prev=None):
+        self.prev = prev
+        self.next = None
+        if prev: prev.next = self
+
+def create_entries(nr_of_entries):
+    entries = []
+    last = None
+    for _ in range(nr_of_entries):
+        last = Entry(last)
+        entries.append(last)
+    return entries
+
+def naive_next(entries, played):
+    # Picking a random entry which wasn't played yet, by scanning the playlist
+    remaining = [e for e in entries if e not in played]
+    return random.choice(remaining) if remaining else None
+
+def measure_play_order(nr_of_entries, nr_of_steps):
+    entries = create_entries(nr_of_entries)
+    play_order = PlayOrder()
+    play_order.entries = entries
+    play_order.add(entries)
+    play_order.shuffle = True
+    entry = entries[0]
+    play_order.play(entry)
+    start = time.perf_counter()
+    for i in range(nr_of_steps):
+        entry = play_order.next(entry)
+        play_order.play(entry)
+        if i % 10 == 0:
+            # Playlist changes between steps
+            added = Entry()
+            entries.append(added)
+            play_order.add([added])
+            play_order.remove(play_order.next(entry))
+    return (time.perf_counter() - start) / nr_of_steps
+
+def measure_naive(nr_of_entries, nr_of_steps):
+    entries = create_entries(nr_of_entries)
+    played = set()
+    start = time.perf_counter()
+    for _ in range(nr_of_steps):
+        played.add(naive_next(entries, played))
+    return (time.perf_counter() - start) / nr_of_steps
+
+def main():
+    for nr_of_entries in (1000, 10000, 100000):
+        print('{:>6} entries: play order {:.2f}us per step, scanning playlist {:.2f}us per step'.format(
+            nr_of_entries,
+            measure_play_order(nr_of_entries, 10000) * 1e6,
+            measure_naive(nr_of_entries, 50) * 1e6))
+
+if __name__ == '__main__':
+    main()
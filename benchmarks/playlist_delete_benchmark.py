@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import time
+from unittest.mock import patch
+
+from playerlib.playlist.playlist import *
+from playerlib.track.track import *
+
+def create_playlist(nr_of_tracks):
+    playlist = Playlist(lambda track: None)
+    tracks = []
+    for i in range(nr_of_tracks):
+        track = Track()
+        track.path = '/music/{}.flac'.format(i)
+        track.title = 'Track {}'.format(i)
+        track.length = 200
+        tracks.append(track)
+    playlist.add_tracks(tracks)
+    return playlist
+
+def delete_entries(playlist, nr_of_deletes):
+    playlist.listbox.focus_position = len(playlist.content) // 2
+    start = time.perf_counter()
+    for _ in range(nr_of_deletes):
+        playlist.listbox.delete()
+    return time.perf_counter() - start
+
+def relink_on_delete(self, entry, position):
+    # Previous behaviour: whole playlist is relinked after each delete
+    if self._unfiltered is not None:
+        self._unfiltered.remove(entry)
+    self._relink_playlist()
+
+def main():
+    nr_of_tracks = 50000
+    nr_of_deletes = 2000
+    with patch('urwim.redraw'):
+        with patch.object(Playlist, '_on_delete', relink_on_delete):
+            relink_time = delete_entries(create_playlist(nr_of_tracks), nr_of_deletes)
+        unlink_time = delete_entries(create_playlist(nr_of_tracks), nr_of_deletes)
+    print('{} deletes from {} tracks: relinking whole playlist {:.3f}s, unlinking entry {:.3f}s'.format(
+        nr_of_deletes, nr_of_tracks, relink_time, unlink_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import tempfile
+import time
+from unittest.mock import patch
+
+from playerlib.playlist.playlist import *
+from playerlib.track.track import *
+
+def create_tracks(nr_of_tracks):
+    tracks = []
+    for i in range(nr_of_tracks):
+        track = Track()
+        track.path = '/music/Artist {0}/Album {1}/{2:02} - Track {3}.flac'.format(i % 500, i % 20, i % 20, i)
+        track.title = 'Track {}'.format(i)
+        track.artist = 'Artist {}'.format(i % 500)
+        track.index = str(i % 20)
+        track.set_length(200 + i % 100)
+        tracks.append(track)
+    return tracks
+
+def main():
+    nr_of_tracks = 20000
+    tracks = create_tracks(nr_of_tracks)
+    with tempfile.TemporaryDirectory() as tmp, patch('urwim.redraw'):
+        for extension in ('.m3u8', '.pls', '.xspf', '.json'):
+            filename = os.path.join(tmp, 'list' + extension)
+            PlaylistFormats().find(filename).save(filename, tracks)
+            playlist = Playlist(lambda track: None)
+            with patch.object(playlist.tracks_reader, 'read_metadata', wraps=playlist.tracks_reader.read_metadata) as read_mock:
+                start = time.perf_counter()
+                playlist.load_playlist(filename)
+                elapsed = time.perf_counter() - start
+            print('{:>5}: {} tracks loaded in {:.3f}s, {} files read for metadata'.format(
+                extension, len(playlist.content), elapsed, read_mock.call_count))
+
+if __name__ == '__main__':
+    main()
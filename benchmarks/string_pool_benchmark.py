@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import json
+import tracemalloc
+
+from playerlib.track.string_pool import *
+from playerlib.track.track import *
+
+def create_playlist(nr_of_albums, nr_of_tracks):
+    # Albums ripped to single files with cue sheets, so all tracks of an
+    # album share path, artist and album
+    tracks = []
+    for album in range(nr_of_albums):
+        for i in range(nr_of_tracks):
+            track = Track()
+            track.path = '/music/Some Artist {0}/Some Album {1}/Some Album {1}.flac'.format(album % 50, album)
+            track.title = 'Track {}'.format(i)
+            track.artist = 'Some Artist {}'.format(album % 50)
+            track.album = 'Some Album {}'.format(album)
+            track.index = str(i + 1)
+            track.length = 240
+            track.offset = 240 * i
+            track.length_string, track.time_format = '04:00', '%M:%S'
+            tracks.append(track.to_dict())
+    return json.dumps(tracks)
+
+def load(data, pool):
+    tracemalloc.start()
+    if pool:
+        tracks = json.loads(data, object_hook=lambda d: pool.intern_track(Track(d)))
+    else:
+        tracks = [Track(t) for t in json.loads(data)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tracks, current, peak
+
+def main():
+    data = create_playlist(5000, 20)
+    for pool in (None, StringPool()):
+        tracks, current, peak = load(data, pool)
+        print('{:>12}: {} tracks, {:.1f} MiB retained, {:.1f} MiB peak{}'.format(
+            'interned' if pool else 'not interned', len(tracks), current / 2**20, peak / 2**20,
+            ', pool: {}'.format(pool.stats) if pool else ''))
+        del tracks
+
+if __name__ == '__main__':
+    main()
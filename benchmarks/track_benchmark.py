@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import json
+import time
+import tracemalloc
+
+from playerlib.track.track import *
+
+class LegacyTrack:
+    '''Previous Track implementation, with attributes kept in __dict__'''
+
+    def __init__(self, dictionary=None):
+        self.path = None
+        self.offset = 0
+        self.length = 0
+        self.index = 0
+        self.title = None
+        self.artist = None
+        self.album = None
+        self.performer = None
+        self.pending = False
+        self.state = 0
+        self.playlist_entry = None
+        if dictionary:
+            for k, v in dictionary.items():
+                setattr(self, k, v)
+
+    def to_dict(self):
+        d = self.__dict__.copy()
+        del d['state']
+        del d['playlist_entry']
+        return d
+
+def create_tracks(cls, nr_of_tracks):
+    tracks = []
+    for i in range(nr_of_tracks):
+        track = cls()
+        track.path = '/music/Some Artist/Some Album/{:02} - Track {}.flac'.format(i % 20, i)
+        track.title = 'Track {}'.format(i)
+        track.artist = 'Some Artist'
+        track.album = 'Some Album'
+        track.index = str(i % 20)
+        track.length = 200 + i % 100
+        track.length_string, track.time_format = '03:20', '%M:%S'
+        tracks.append(track)
+    return tracks
+
+def measure(cls, nr_of_tracks):
+    tracemalloc.start()
+    tracks = create_tracks(cls, nr_of_tracks)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    data = json.dumps([t.to_dict() for t in tracks])
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tracks = [cls(d) for d in json.loads(data)]
+    load_time = time.perf_counter() - start
+
+    print('{:>12}: {:.1f} MiB for {} tracks, save {:.3f}s, load {:.3f}s'.format(
+        cls.__name__, memory / 2**20, nr_of_tracks, save_time, load_time))
+
+def main():
+    for cls in (LegacyTrack, Track):
+        measure(cls, 100000)
+
+if __name__ == '__main__':
+    main()
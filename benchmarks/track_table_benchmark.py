@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+sys.path.insert(1, os.path.abspath(os.path.dirname(sys.argv[0])) + '/../src')
+
+import random
+import timeit
+import tracemalloc
+from array import array
+
+from playerlib.natural_sort import *
+from playerlib.track.track import *
+from playerlib.track.track_table import *
+
+class SlotsTrack:
+    '''Track keeping all of its metadata, as playlist had it before TrackTable'''
+
+    __slots__ = ('path', 'offset', 'length', 'index', 'title', 'artist', 'album', 'performer', 'pending',
+        'length_string', 'time_format', 'state', 'playlist_entry', '_line')
+
+    def __init__(self):
+        self.offset = 0
+        self.performer = None
+        self.pending = False
+        self.state = 0
+        self.playlist_entry = None
+        self._line = None
+
+def create_tracks(cls, nr_of_tracks):
+    rng = random.Random(0)
+    tracks = []
+    for i in range(nr_of_tracks):
+        track = cls()
+        artist, album = rng.randrange(500), rng.randrange(20)
+        track.path = '/music/Artist {0}/Album {1}/{2:02} - Track {3}.flac'.format(artist, album, i % 20, i)
+        track.title = 'Track {}'.format(i)
+        track.artist = 'Artist {}'.format(artist)
+        track.album = 'Album {}'.format(album)
+        track.index = str(i % 20)
+        track.length = 200.0 + i % 100
+        track.length_string, track.time_format = '03:20', '%M:%S'
+        tracks.append(track)
+    return tracks
+
+def create_table(nr_of_tracks):
+    table = TrackTable()
+    tracks = create_tracks(Track, nr_of_tracks)
+    for track in tracks:
+        track.attach(table)
+    return tracks, table, array('l', (t.row for t in tracks))
+
+def measure_memory(create):
+    tracemalloc.start()
+    result = create()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory, result
+
+def loop_sort(tracks):
+    return sorted(tracks, key=lambda t: (natural_sort_key(t.artist), natural_sort_key(t.album), int(t.index)))
+
+def loop_filter(tracks, pattern):
+    return [t for t in tracks if any(pattern in (s or '').casefold() for s in (t.path, t.title, t.artist, t.album))]
+
+def loop_total(tracks):
+    return sum(t.length for t in tracks)
+
+def main():
+    nr_of_tracks = 200000
+    # Strings are shared by both, so only what differs is counted
+    slots_memory, slots_tracks = measure_memory(lambda: create_tracks(SlotsTrack, nr_of_tracks))
+    table_memory, (_, table, rows) = measure_memory(lambda: create_table(nr_of_tracks))
+    print('{} tracks'.format(nr_of_tracks))
+    print('{:>8}: tracks with all metadata {:.1f} MiB, tracks attached to TrackTable {:.1f} MiB'.format(
+        'memory', slots_memory / 2**20, table_memory / 2**20))
+    benchmarks = [
+        ('sort', lambda: loop_sort(slots_tracks), lambda: table.sort(rows, ['artist', 'album', 'index'])),
+        ('filter', lambda: loop_filter(slots_tracks, 'artist 42'), lambda: table.filter(rows, 'artist 42')),
+        ('total', lambda: loop_total(slots_tracks), lambda: table.total_length(rows)),
+    ]
+    for name, loop, columnar in benchmarks:
+        loop_time = min(timeit.repeat(loop, number=1, repeat=3))
+        table_time = min(timeit.repeat(columnar, number=1, repeat=3))
+        print('{:>8}: loop over tracks {:.3f}s, TrackTable {:.3f}s'.format(name, loop_time, table_time))
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
+import codecs
 import logging
 import os
-import re
 
 class CueParser:
 
@@ -12,11 +12,32 @@ class CueParser:
             self.index = index
             self.performer = None
             self.title = None
+            self.isrc = None
+            self.flags = []
+            self.pregap = None
             self.offset = 0
-            self.length = 0
+            self._length = 0
+            self._length_resolver = None
+
+        @property
+        def length(self):
+            if self._length_resolver:
+                resolver, self._length_resolver = self._length_resolver, None
+                self._length = resolver()
+            return self._length
+
+        @length.setter
+        def length(self, value):
+            self._length = value
+            self._length_resolver = None
 
         def __repr__(self):
-            return str(self.__dict__)
+            # Length which is not resolved yet is left out, so logging
+            # doesn't read audio files
+            fields = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+            if not self._length_resolver:
+                fields['length'] = self._length
+            return str(fields)
 
 
     class CueSheet:
@@ -24,90 +45,232 @@ class CueParser:
             self.cdtextfile = None
             self.catalog = None
             self.performer = None
+            self.genre = None
+            self.date = None
             self.rem = []
-            self.title = []
+            self.title = None
             self.tracks = []
+            self.encoding = None
 
         def __repr__(self):
-            return str(self.__dict__)
+            return str({k: v for k, v in self.__dict__.items() if not k.startswith('_')})
+
 
+    class _State:
+        def __init__(self, cuesheet, use_taglib, lazy_lengths, parent_dir):
+            self.cuesheet = cuesheet
+            self.finished = 0
+            self.current_track = None
+            self.current_file = None
+            self.use_taglib = use_taglib
+            self.lazy_lengths = lazy_lengths
+            self.parent_dir = parent_dir
+            self.lengths = {}
 
-    def __init__(self):
+
+    default_encodings = ['windows-1250', 'latin2']
+    lengths_cache_size = 1024
+
+    _boms = [
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    ]
+
+    def __init__(self, encodings=None, length_reader=None):
+        '''length_reader, if given, is called with a path of an audio file instead of taglib'''
         self.logger = logging.getLogger('CueParser')
+        self._encodings = encodings if encodings is not None else self.default_encodings
+        self._length_reader = length_reader
+        self._lengths = {}
+        self._handlers = {
+            'REM': self._handle_rem,
+            'PERFORMER': self._handle_performer,
+            'TITLE': self._handle_title,
+            'CDTEXTFILE': self._handle_cdtextfile,
+            'CATALOG': self._handle_catalog,
+            'FILE': self._handle_file,
+            'TRACK': self._handle_track,
+            'INDEX': self._handle_index,
+            'FLAGS': self._handle_flags,
+            'ISRC': self._handle_isrc,
+        }
 
-    def _update_last_track_in_file(self, parent_dir, track):
+    def _read_length(self, path):
+        if self._length_reader:
+            return self._length_reader(path)
         import taglib
-        f = taglib.File(os.path.join(parent_dir, track.file))
-        track.length = f.length - track.offset
-
-    def _append_regex_match(self, tag_list, regex, line):
-        match = re.match(regex, line)
-        if match:
-            tag_list.append(match.group(1))
-            return True
-
-    def _assign_regex_match(self, obj, key, regex, line):
-        match = re.match(regex, line)
-        if match:
-            obj.__dict__[key] = match.group(1).replace("\\", "\\\\")
-            return True
-
-    def _parse_file(self, f, use_taglib, parent_dir):
-        cuesheet = self.CueSheet()
-        current_track = None
-        current_file = None
-        for raw_line in f:
-            line = raw_line.rstrip()
-
-            if self._append_regex_match(cuesheet.rem, r'^REM (.*)$', line): continue
-            elif self._assign_regex_match(cuesheet, 'performer', r'^PERFORMER "(.*)"$', line): continue
-            elif self._assign_regex_match(cuesheet, 'title', r'^TITLE "(.*)"$', line): continue
-            elif self._assign_regex_match(cuesheet, 'cdtextfile', r'^CDTEXTFILE "(.*)"$', line): continue
-            elif self._assign_regex_match(cuesheet, 'catalog', r'^CATALOG "(.*)"$', line): continue
-            elif current_track:
-                if self._assign_regex_match(current_track, 'title', r'^    TITLE "(.*)"$', line): continue
-                elif self._assign_regex_match(current_track, 'performer', r'^    PERFORMER "(.*)"$', line): continue
-
-            match = re.match('^FILE "(.*)"', line)
-            if match:
-                current_file = match.group(1).replace("\\", "\\\\")
-                continue
-
-            match = re.match('^  TRACK ([0-9]+) AUDIO$', line)
-            if match:
-                if current_track:
-                    self.logger.debug(current_track)
-                    cuesheet.tracks.append(current_track)
-                current_track = self.CueTrack(current_file, int(match.group(1)))
-                continue
-
-            match = re.match('^    INDEX 01 ([0-9]{2}):([0-9]{2}):([0-9]{2})$', line)
-            if match:
-                if current_track:
-                    current_track.offset = int(match.group(1)) * 60 + int(match.group(2))
-                    if len(cuesheet.tracks) > 0:
-                        last_track = cuesheet.tracks[-1]
-                        if last_track.file == current_track.file:
-                            last_track.length = current_track.offset - last_track.offset
-                        elif use_taglib:
-                            self._update_last_track_in_file(parent_dir, last_track)
-                continue
-
-        if current_track:
+        return taglib.File(path).length
+
+    def _get_length(self, path):
+        # Lengths are cached between parses; entry is valid as long as
+        # the audio file was not modified
+        try:
+            path = os.path.realpath(path)
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return self._read_length(path)
+        cached = self._lengths.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        length = self._read_length(path)
+        if len(self._lengths) >= self.lengths_cache_size:
+            del self._lengths[next(iter(self._lengths))]
+        self._lengths[path] = (mtime, length)
+        return length
+
+    def _update_last_track_in_file(self, state, track):
+        path = os.path.join(state.parent_dir, track.file)
+        offset = track.offset
+        if state.lazy_lengths:
+            track._length_resolver = lambda: self._get_length(path) - offset
+            return
+        if path not in state.lengths:
+            state.lengths[path] = self._get_length(path)
+        track.length = state.lengths[path] - offset
+
+    def _unquote(self, value):
+        if value.startswith('"'):
+            end = value.rfind('"')
+            value = value[1:end] if end > 0 else value[1:]
+        return value.replace("\\", "\\\\")
+
+    def _parse_time(self, value):
+        minutes, seconds, _ = value.split(':')
+        return int(minutes) * 60 + int(seconds)
+
+    def _handle_rem(self, state, args):
+        state.cuesheet.rem.append(args)
+        tokens = args.split(None, 1)
+        if len(tokens) < 2: return
+        if tokens[0] == 'GENRE':
+            state.cuesheet.genre = self._unquote(tokens[1])
+        elif tokens[0] == 'DATE':
+            state.cuesheet.date = self._unquote(tokens[1])
+
+    def _handle_performer(self, state, args):
+        (state.current_track or state.cuesheet).performer = self._unquote(args)
+
+    def _handle_title(self, state, args):
+        (state.current_track or state.cuesheet).title = self._unquote(args)
+
+    def _handle_cdtextfile(self, state, args):
+        state.cuesheet.cdtextfile = self._unquote(args)
+
+    def _handle_catalog(self, state, args):
+        state.cuesheet.catalog = self._unquote(args)
+
+    def _handle_file(self, state, args):
+        if not args.startswith('"'):
+            # Unquoted name; last token is the file type
+            tokens = args.rsplit(None, 1)
+            args = tokens[0]
+        state.current_file = self._unquote(args)
+
+    def _handle_track(self, state, args):
+        number, track_type = args.split()
+        if track_type != 'AUDIO': return
+        if state.current_track:
+            self.logger.debug(state.current_track)
+            # Length of the last appended track can only be set by INDEX of the
+            # current one, so from now on it's final
+            state.finished = len(state.cuesheet.tracks)
+            state.cuesheet.tracks.append(state.current_track)
+        state.current_track = self.CueTrack(state.current_file, int(number))
+
+    def _handle_index(self, state, args):
+        track = state.current_track
+        if not track: return
+        number, time = args.split()
+        if int(number) == 0:
+            track.pregap = self._parse_time(time)
+            return
+        elif int(number) != 1:
+            return
+        track.offset = self._parse_time(time)
+        tracks = state.cuesheet.tracks
+        if len(tracks) > 0:
+            last_track = tracks[-1]
+            if last_track.file == track.file:
+                last_track.length = track.offset - last_track.offset
+            elif state.use_taglib:
+                self._update_last_track_in_file(state, last_track)
+            state.finished = len(tracks)
+
+    def _handle_flags(self, state, args):
+        if state.current_track:
+            state.current_track.flags = args.split()
+
+    def _handle_isrc(self, state, args):
+        if state.current_track:
+            state.current_track.isrc = self._unquote(args)
+
+    def _parse_line(self, state, line):
+        tokens = line.split(None, 1)
+        if not tokens: return
+        handler = self._handlers.get(tokens[0])
+        if handler:
+            handler(state, tokens[1].strip() if len(tokens) > 1 else '')
+
+    def _iter_lines(self, lines, cuesheet, use_taglib, lazy_lengths, parent_dir):
+        state = self._State(cuesheet, use_taglib, lazy_lengths, parent_dir)
+        tracks = cuesheet.tracks
+        yielded = 0
+        for line in lines:
+            try:
+                self._parse_line(state, line)
+            except ValueError:
+                self.logger.warning('Malformed line: {}'.format(line.strip()))
+            while yielded < state.finished:
+                yield tracks[yielded]
+                yielded += 1
+
+        if state.current_track:
             if use_taglib:
-                self._update_last_track_in_file(parent_dir, current_track)
-            self.logger.debug(current_track)
-            cuesheet.tracks.append(current_track)
+                self._update_last_track_in_file(state, state.current_track)
+            self.logger.debug(state.current_track)
+            tracks.append(state.current_track)
 
+        yield from tracks[yielded:]
+
+    def _parse_file(self, f, use_taglib, lazy_lengths, parent_dir):
+        cuesheet = self.CueSheet()
+        for _ in self._iter_lines(f, cuesheet, use_taglib, lazy_lengths, parent_dir):
+            pass
         return cuesheet
 
-    def parse(self, path, use_taglib=False):
-        parent_dir = os.path.dirname(path)
-        encodings = ['utf-8', 'windows-1250', 'latin2']
-        for encoding in encodings:
+    def _decode(self, data):
+        for bom, encoding in self._boms:
+            if data.startswith(bom):
+                return data.decode(encoding), encoding
+        for encoding in ['utf-8'] + self._encodings:
             try:
-                with open(path, 'r', encoding=encoding) as f:
-                    return self._parse_file(f, use_taglib, parent_dir)
-            except Exception as e:
+                return data.decode(encoding), encoding
+            except UnicodeDecodeError:
                 pass
+        raise RuntimeError('Cannot decode cue sheet using any of: {}'.format(', '.join(['utf-8'] + self._encodings)))
+
+    def parse_string(self, string, parent_dir='', use_taglib=False, lazy_lengths=False):
+        return self._parse_file(string.splitlines(), use_taglib, lazy_lengths, parent_dir)
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        string, encoding = self._decode(data)
+        self.logger.debug('{}: decoded as {}'.format(path, encoding))
+        return string, encoding
+
+    def parse(self, path, use_taglib=False, lazy_lengths=False):
+        '''With lazy_lengths, audio files are opened only when length of a track is accessed'''
+        string, encoding = self._read(path)
+        cuesheet = self.parse_string(string, os.path.dirname(path), use_taglib, lazy_lengths)
+        cuesheet.encoding = encoding
+        return cuesheet
 
+    def iter_tracks(self, path, use_taglib=False, lazy_lengths=False, cuesheet=None):
+        '''Yields each track as soon as its length is known; cuesheet, if given, is filled while parsing'''
+        cuesheet = cuesheet if cuesheet is not None else self.CueSheet()
+        string, cuesheet.encoding = self._read(path)
+        yield from self._iter_lines(string.splitlines(), cuesheet, use_taglib, lazy_lengths, os.path.dirname(path))
@@ -24,8 +24,8 @@ class Bookmarks(urwim.ViewWidget):
         self._load_bookmarks()
         self.listbox = urwim.ListWidget(
             self.content,
-            on_delete=lambda x: self._on_delete(x),
-            on_paste=lambda x: self._on_paste(x))
+            on_delete=lambda x, position: self._on_delete(x),
+            on_paste=lambda x, position: self._on_paste(x))
         callbacks = {
             'enter': self._handle_enter,
             '1': lambda: self._handle_number(1),
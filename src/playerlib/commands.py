@@ -3,6 +3,7 @@
 import urwim
 
 import playerlib.context as ctx
+from playerlib.track.track import format_time
 
 class Commands(urwim.Commands):
 
@@ -20,6 +21,14 @@ class Commands(urwim.Commands):
     def replace_playlist(self, path: str) -> None:
         self._context.playlist.add_to_playlist(path, clear_and_play=True)
 
+    @urwim.asynchronous
+    def add_to_playlist_recursive(self, path: str) -> None:
+        self._context.playlist.add_to_playlist(path, recursive=True)
+
+    @urwim.asynchronous
+    def replace_playlist_recursive(self, path: str) -> None:
+        self._context.playlist.add_to_playlist(path, clear_and_play=True, recursive=True)
+
     def clear_playlist(self) -> None:
         self._context.playlist.clear()
 
@@ -31,6 +40,21 @@ class Commands(urwim.Commands):
     def load_playlist(self, playlist_file: str) -> None:
         self._context.playlist.load_playlist(playlist_file)
 
+    @urwim.asynchronous
+    def sort_playlist(self, *keys: str) -> None:
+        self._context.playlist.sort(list(keys) if keys else ['artist', 'album', 'index'])
+
+    @urwim.asynchronous
+    def filter_playlist(self, pattern: str = '') -> None:
+        self._context.playlist.filter(pattern)
+
+    def playlist_length(self) -> None:
+        playlist = self._context.playlist
+        current_track = self._context.playback_controller.current_track
+        self.info('Total: {}, remaining: {}'.format(
+            format_time(int(playlist.total_length())),
+            format_time(int(playlist.remaining_length(current_track)))))
+
     def pause(self) -> None:
         self._context.playback_controller.pause()
 
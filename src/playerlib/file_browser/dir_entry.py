@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
 import os
-import re
 import urwim
 
-class DirEntry(urwim.ListBoxEntry):
+from playerlib.natural_sort import *
+
+class DirEntry(urwim.ListItem):
+
+    __slots__ = ('name', 'parent_path', 'isdir', 'level', 'open', 'sort_key')
 
     def __init__(self, name, parent_path, is_a_dir=False, level=0):
         self.name = name
@@ -12,6 +15,7 @@ class DirEntry(urwim.ListBoxEntry):
         self.isdir = is_a_dir
         self.level = level
         self.open = False
+        self.sort_key = (not is_a_dir, natural_sort_key(name))
         if is_a_dir:
             super().__init__(['  ' * level, u'▸ ', name, '/'], 'dir', 'dir_focused')
         else:
@@ -26,13 +30,6 @@ class DirEntry(urwim.ListBoxEntry):
         return self.name
 
     def __lt__(self, other):
-        if self.isdir and not other.isdir: return True
-        elif not self.isdir and other.isdir: return False
-        if other.name[0].isdigit() and self.name[0].isdigit():
-            try:
-                a = re.search('[0-9]+', self.name).group(0)
-                b = re.search('[0-9]+', other.name).group(0)
-                return int(a) < int(b)
-            except: pass
-        return self.name.lower() < other.name.lower()
+        # Dirs go first
+        return self.sort_key < other.sort_key
 
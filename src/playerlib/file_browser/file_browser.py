@@ -11,7 +11,7 @@ class FileBrowser(urwim.ViewWidget):
     footer_text:   str = 'Browser'
     dir_name:      str
     header:        urwim.Header
-    content:       urwim.SimpleListWalker
+    content:       urwim.VirtualListWalker
     listbox:       urwim.ListWidget
     last_position: int
     logger:        logging.Logger
@@ -20,18 +20,18 @@ class FileBrowser(urwim.ViewWidget):
         self._commands = commands
         self.dir_name = os.getcwd()
         self.header = urwim.Header(self.dir_name)
-        self.content = urwim.SimpleListWalker([])
+        self.content = urwim.VirtualListWalker([])
         self.content.extend(self._read_dir(self.dir_name))
         self.listbox = urwim.ListWidget(self.content, readonly=True)
         self.last_position = 0
         self.logger = logging.getLogger('FileBrowser')
         callbacks = {
             'u': self._go_back,
-            'enter': lambda: self._toggle_dir(self.content.get_focus()[0]),
+            'enter': lambda: self._toggle_dir(self.content.focus_item),
             'R': lambda: self.change_dir('.'),
             'C': self._enter_selected_dir,
-            'a': lambda: self._commands.add_to_playlist(self.content.get_focus()[0].path),
-            'r': lambda: self._commands.replace_playlist(self.content.get_focus()[0].path),
+            'a': lambda: self._commands.add_to_playlist(self.content.focus_item.path),
+            'r': lambda: self._commands.replace_playlist(self.content.focus_item.path),
             'B': lambda: self._commands.add_bookmark(self.dir_name),
         }
         super().__init__(self.listbox,
@@ -88,7 +88,7 @@ class FileBrowser(urwim.ViewWidget):
 
     def _enter_selected_dir(self) -> None:
         self.last_position = self.listbox.focus_position
-        path = self.content.get_focus()[0].path
+        path = self.content.focus_item.path
         self.change_dir(path)
         try:
             self.listbox.focus_position = 0
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+
+import re
+
+_numbers = re.compile(r'(\d+)')
+
+def natural_sort_key(name: str) -> tuple[str, str]:
+    '''Key ordering numbers in a name by value, so "Track 2" goes before "Track 10"; case is ignored'''
+    # Each number is replaced with \0, its length and its digits, so numbers
+    # compare by value and go before text; keys are plain strings, which are
+    # much cheaper to compare than tuples of parts. Name itself breaks the ties
+    parts = _numbers.split(name.casefold())
+    for i in range(1, len(parts), 2):
+        digits = parts[i].lstrip('0') or '0'
+        parts[i] = '\0' + chr(len(digits)) + digits
+    return ''.join(parts), name
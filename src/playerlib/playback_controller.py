@@ -2,38 +2,61 @@
 
 import logging
 import re
-from time import gmtime, strftime
 
 from playerlib.backends.backend_factory import *
+from playerlib.playlist.play_order import *
 from urwim import clamp, App, rdb, RdbObject
 
 class PlaybackController:
 
     def __init__(self, config):
-        self.backend = BackendFactory(config, self.next, self.update_current_state).create()
+        self.backend = BackendFactory(config, self._track_finished, self.update_current_state).create()
         self.current_track = None
+        self.play_order = PlayOrder()
         self.logger = logging.getLogger('PlaybackController')
         rdb['volume'] = RdbObject(100, min_value=0, max_value=100)
         rdb.subscribe('volume', self._volume_change)
+        rdb['shuffle'] = RdbObject(0, min_value=0, max_value=1)
+        rdb.subscribe('shuffle', self._shuffle_change)
+        rdb['repeat'] = RdbObject('off', choices=PlayOrder.repeat_modes)
+        rdb.subscribe('repeat', self._repeat_change)
 
     def _volume_change(self, new):
         self.backend.set_volume(new)
 
+    def _shuffle_change(self, new):
+        self.play_order.shuffle = bool(new)
+
+    def _repeat_change(self, new):
+        self.play_order.repeat = new
+
     def update_current_state(self, pos):
         if pos < 0 or not self.current_track: return
         app = App()
         diff = pos - self.current_track.offset
         if diff >= self.current_track.length and self.current_track.path == self.current_track.playlist_entry.next.track.path:
-            self.set_next_track_playing()
+            self._cue_track_finished()
         elif diff < 0 and self.current_track.path == self.current_track.playlist_entry.prev.track.path:
             self.set_prev_track_playing()
         if app.command_panel.selectable() or pos - self.current_track.offset < 0: return
         with app.draw_lock:
             app.command_panel.set_caption('{} : {} / {}'.format(
                 self.current_track.title,
-                strftime(self.current_track.time_format, gmtime(pos - self.current_track.offset)),
+                self.current_track.elapsed_string(pos),
                 self.current_track.length_string))
 
+    def _cue_track_finished(self):
+        # File goes on with the next track of the cue sheet; if it's not the
+        # one to be played, e.g. with shuffle, the chosen one is started instead
+        entry = self.current_track.playlist_entry
+        upcoming = self.play_order.next(entry, finished=True)
+        if upcoming is entry.next:
+            self.set_next_track_playing()
+        elif upcoming is None:
+            self.stop()
+        else:
+            self.play_track(upcoming.track)
+
     def play_track(self, track):
         if not track:
             raise RuntimeError('No track!')
@@ -42,6 +65,7 @@ class PlaybackController:
         self.current_track = track
         self.backend.play_track(self.current_track)
         self.current_track.play()
+        self.play_order.play(self.current_track.playlist_entry)
         rdb['track'] = self.current_track
 
     def set_next_track_playing(self):
@@ -49,6 +73,7 @@ class PlaybackController:
         last_track.stop()
         self.current_track = self.current_track.playlist_entry.next.track
         self.current_track.play()
+        self.play_order.play(self.current_track.playlist_entry)
         rdb['track'] = self.current_track
 
     def set_prev_track_playing(self):
@@ -56,6 +81,7 @@ class PlaybackController:
         last_track.stop()
         self.current_track = self.current_track.playlist_entry.prev.track
         self.current_track.play()
+        self.play_order.play(self.current_track.playlist_entry)
         rdb['track'] = self.current_track
 
     def pause(self):
@@ -72,16 +98,20 @@ class PlaybackController:
         self.current_track = None
         rdb['track'] = self.current_track
 
-    def next(self):
+    def _track_finished(self):
+        self.next(finished=True)
+
+    def next(self, finished=False):
         try:
-            self.logger.info(f'Playing {self.current_track.playlist_entry.next}')
-            self.play_track(self.current_track.playlist_entry.next.track)
+            entry = self.play_order.next(self.current_track.playlist_entry, finished)
+            self.logger.info(f'Playing {entry}')
+            self.play_track(entry.track)
         except:
             self.stop()
 
     def prev(self):
         try:
-            self.play_track(self.current_track.playlist_entry.prev.track)
+            self.play_track(self.play_order.prev(self.current_track.playlist_entry).track)
         except:
             self.stop()
 
@@ -17,7 +17,10 @@ class Player:
 
     default_config = {
         'backend': {'name': 'mplayer', 'path': '/usr/bin/mplayer'},
+        'tracks_reader': {'workers': 4, 'processes': False, 'read_tags': True},
         'bookmarks': {'path': '~/.config/player/bookmarks.json'},
+        'metadata_cache': {'path': '~/.local/share/player/metadata_cache.db'},
+        'playlist': {'lazy_metadata': True},
         'keys_mapping': {
             'h': ':seek -10',
             'l': ':seek +10',
@@ -62,7 +65,7 @@ class Player:
 
         urwim.read_persistent_data(self.runtime_dir + '/history.json')
         context.playback_controller = PlaybackController(context.config)
-        context.playlist = Playlist(context.playback_controller.play_track)
+        context.playlist = Playlist(context.playback_controller.play_track, context.config, context.playback_controller.play_order)
         context.file_browser = FileBrowser(commands)
         context.bookmarks = Bookmarks(context.config, commands)
         context.track_info = TrackInfo()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import copy
 import urwim
 
-class Entry(urwim.ListBoxEntry):
+class Entry(urwim.ListItem):
+
+    __slots__ = ('track', 'line', 'prev', 'next')
 
     def __init__(self, track, line, prev=None):
         self.track = track
@@ -15,6 +18,30 @@ class Entry(urwim.ListBoxEntry):
         if prev:
             prev.next = self
 
+    def link(self, prev, next):
+        '''Puts entry between prev and next; only their links are changed'''
+        self.prev = prev
+        self.next = next
+        if prev: prev.next = self
+        if next: next.prev = self
+
+    def unlink(self):
+        if self.prev: self.prev.next = self.next
+        if self.next: self.next.prev = self.prev
+        self.prev = None
+        self.next = None
+
+    def set_line(self, line):
+        self.line = line
+        if self.track.state == self.track.State.PLAYING: self.set_playing()
+        elif self.track.state == self.track.State.PAUSED: self.set_paused()
+        else: self.set_stopped()
+
+    def __deepcopy__(self, memo):
+        # Used by clipboard; links are left out, otherwise whole playlist
+        # would be copied with each yank and delete
+        return Entry(copy.copy(self.track), self.line)
+
     def set_playing(self):
         self.update(['▸ ', self.line], 'dir', 'dir_focused')
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+from playerlib.track.string_pool import *
+from playerlib.track.track import *
+from .playlist_format_interface import *
+
+class JsonPlaylist(PlaylistFormatInterface):
+    '''Playlist with a JSON object per track in each line, so it's written and read as a stream;
+    playlists saved as a single JSON list are read as well'''
+
+    extensions: list[str] = ['.json', '.jsonl']
+
+    # Encoder's encode, unlike json.dump, uses the C encoder
+    _encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+    def _track_from_dict(self, d: dict[str, Any]) -> Track:
+        # Tracks are created and interned while decoding, so decoded dicts
+        # and duplicated strings don't pile up
+        return string_pool.intern_track(Track(d))
+
+    def write(self, f: TextIO, tracks: Iterable[Track]) -> None:
+        encode = self._encode
+        f.writelines(encode(t.to_dict()) + '\n' for t in tracks)
+
+    def _read_list(self, text: str) -> list[Track]:
+        try: return json.loads(text, object_hook=self._track_from_dict)
+        except ValueError as e: raise RuntimeError('Bad playlist: {}'.format(e))
+
+    def iter_read(self, f: TextIO, directory: str | None = None) -> Iterator[Track]:
+        first = True
+        for number, line in enumerate(f, start=1):
+            if not line.strip(): continue
+            if first and line.lstrip().startswith('['):
+                # Previous format, whole file is a single list
+                yield from self._read_list(line + f.read())
+                return
+            first = False
+            try: d = json.loads(line)
+            except ValueError as e: raise RuntimeError('Bad playlist line {}: {}'.format(number, e))
+            yield self._track_from_dict(d)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+from typing import Iterable, Iterator, TextIO
+
+from playerlib.track.track import *
+from .playlist_format_interface import *
+
+class M3uPlaylist(PlaylistFormatInterface):
+    '''Extended M3U; length, artist and title are taken from #EXTINF lines'''
+
+    extensions: list[str] = ['.m3u', '.m3u8']
+
+    def write(self, f: TextIO, tracks: Iterable[Track]) -> None:
+        f.write('#EXTM3U\n')
+        for path, track in self._iter_files(tracks):
+            if track:
+                f.write('#EXTINF:{},{}\n'.format(int(track.length), self._track_name(track)))
+            f.write(path + '\n')
+
+    def _parse_extinf(self, value: str) -> tuple:
+        # Duration can be followed by attributes, e.g. #EXTINF:-1 tvg-id="x",Name
+        duration, _, name = value.partition(',')
+        try: length = float(duration.split()[0])
+        except (ValueError, IndexError): length = None
+        artist, title = self._split_name(name)
+        return length, title, artist
+
+    def iter_read(self, f: TextIO, directory: str | None = None) -> Iterator[Track]:
+        extinf = ()
+        for line in f:
+            line = line.strip().lstrip('\ufeff')
+            if not line: continue
+            if line.startswith('#'):
+                if line.startswith('#EXTINF:'):
+                    extinf = self._parse_extinf(line[8:])
+                continue
+            yield self._create_track(line, directory, *extinf)
+            extinf = ()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import os
+import re
+from typing import IO, Iterable, Iterator
+from urllib.parse import unquote, urlparse
+
+from playerlib.track.string_pool import *
+from playerlib.track.track import *
+
+class PlaylistFormatInterface:
+
+    extensions: list[str] = []
+
+    _url = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
+
+    def write(self, f: IO, tracks: Iterable[Track]) -> None:
+        raise NotImplementedError('Not implemented!')
+
+    def iter_read(self, f: IO, directory: str | None = None) -> Iterator[Track]:
+        '''Yields tracks while reading; tracks without metadata are placeholders, relative paths are resolved against directory'''
+        raise NotImplementedError('Not implemented!')
+
+    def _open(self, filename: str, mode: str) -> IO:
+        # Paths which are not valid UTF-8 are kept as they are
+        return open(filename, mode, encoding='utf-8', errors='surrogateescape')
+
+    def save(self, filename: str, tracks: Iterable[Track]) -> None:
+        with self._open(filename, 'w') as f:
+            self.write(f, tracks)
+
+    def iter_load(self, filename: str) -> Iterator[Track]:
+        with self._open(filename, 'r') as f:
+            yield from self.iter_read(f, os.path.dirname(os.path.abspath(filename)))
+
+    def _resolve_path(self, path: str, directory: str | None) -> str:
+        if path.startswith('file://'):
+            return unquote(urlparse(path).path, errors='surrogateescape')
+        if directory is None or self._url.match(path) or os.path.isabs(path): return path
+        return os.path.normpath(os.path.join(directory, path))
+
+    def _track_name(self, track: Track) -> str:
+        if track.artist: return '{} - {}'.format(track.artist, track.title)
+        return track.title or ''
+
+    def _split_name(self, name: str) -> tuple[str | None, str | None]:
+        '''Gives artist and title from name written by _track_name'''
+        artist, separator, title = name.strip().partition(' - ')
+        if not separator: return None, artist or None
+        return artist or None, title or None
+
+    def _create_track(self, path: str, directory: str | None, length: float | None = None,
+            title: str | None = None, artist: str | None = None, album: str | None = None,
+            index: str | None = None) -> Track:
+        path = self._resolve_path(path, directory)
+        # Without length there's not enough to show the track, so it's read again
+        if length is None or length < 0:
+            return Track.placeholder(path)
+        track = Track()
+        track.path = path
+        track.title = title if title else os.path.basename(path)
+        track.artist = artist
+        track.album = album
+        track.index = index
+        track.set_length(length)
+        return string_pool.intern_track(track)
+
+    def _file_track(self, group: list[Track]) -> Track | None:
+        if len(group) != 1 or group[0].offset or group[0].pending: return None
+        return group[0]
+
+    def _iter_files(self, tracks: Iterable[Track]) -> Iterator[tuple[str, Track | None]]:
+        '''Yields path and track of each file; for files split by cue sheets and placeholders track is None,
+        as formats can't describe parts of files and placeholders have no metadata yet, so they're read
+        again when loading'''
+        path, group = None, []
+        for track in tracks:
+            if group and track.path != path:
+                yield path, self._file_track(group)
+                group = []
+            path = track.path
+            group.append(track)
+        if group:
+            yield path, self._file_track(group)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import os
+
+from .json_playlist import *
+from .m3u_playlist import *
+from .playlist_format_interface import *
+from .pls_playlist import *
+from .xspf_playlist import *
+
+class PlaylistFormats:
+    '''Maps lowercase file extensions to playlist formats; JSON lines is used for other files'''
+
+    def __init__(self) -> None:
+        self._default = JsonPlaylist()
+        self._extensions = {}
+        for playlist_format in (self._default, M3uPlaylist(), PlsPlaylist(), XspfPlaylist()):
+            for extension in playlist_format.extensions:
+                self._extensions[extension.lower()] = playlist_format
+
+    def find(self, filename: str) -> PlaylistFormatInterface:
+        return self._extensions.get(os.path.splitext(filename)[1].lower(), self._default)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import re
+from typing import Iterable, Iterator, TextIO
+
+from playerlib.track.track import *
+from .playlist_format_interface import *
+
+class PlsPlaylist(PlaylistFormatInterface):
+    '''PLS playlist; entry is yielded when next one begins, so keys of an entry are expected to be together'''
+
+    extensions: list[str] = ['.pls']
+
+    _key = re.compile(r'^(File|Title|Length)(\d+)$', re.IGNORECASE)
+
+    def write(self, f: TextIO, tracks: Iterable[Track]) -> None:
+        f.write('[playlist]\n')
+        number = 0
+        for number, (path, track) in enumerate(self._iter_files(tracks), start=1):
+            f.write('File{}={}\n'.format(number, path))
+            if track:
+                f.write('Title{}={}\nLength{}={}\n'.format(number, self._track_name(track), number, int(track.length)))
+        f.write('NumberOfEntries={}\nVersion=2\n'.format(number))
+
+    def _create_entry_track(self, entry: dict[str, str], directory: str | None) -> Track:
+        try: length = float(entry['length'])
+        except (KeyError, ValueError): length = None
+        artist, title = self._split_name(entry.get('title', ''))
+        return self._create_track(entry['file'], directory, length, title, artist)
+
+    def iter_read(self, f: TextIO, directory: str | None = None) -> Iterator[Track]:
+        number, entry = None, {}
+        for line in f:
+            key, separator, value = line.strip().lstrip('\ufeff').partition('=')
+            match = self._key.match(key.strip()) if separator else None
+            if not match: continue
+            if match.group(2) != number:
+                if 'file' in entry: yield self._create_entry_track(entry, directory)
+                number, entry = match.group(2), {}
+            entry[match.group(1).lower()] = value.strip()
+        if 'file' in entry: yield self._create_entry_track(entry, directory)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import pathlib
+import xml.etree.ElementTree as ElementTree
+from typing import IO, Iterable, Iterator, TextIO
+from urllib.parse import quote, unquote
+from xml.sax.saxutils import escape
+
+from playerlib.track.track import *
+from .playlist_format_interface import *
+
+class XspfPlaylist(PlaylistFormatInterface):
+    '''XSPF playlist; it's parsed incrementally and each track element is dropped once it's read'''
+
+    extensions: list[str] = ['.xspf']
+
+    _namespace = 'http://xspf.org/ns/0/'
+
+    def _open(self, filename: str, mode: str) -> IO:
+        # Parser reads bytes, so encoding declared in the file is used
+        if mode == 'r': return open(filename, 'rb')
+        return super()._open(filename, mode)
+
+    def _location(self, path: str) -> str:
+        if self._url.match(path): return path
+        if not path.startswith('/'): return quote(path, errors='surrogateescape')
+        return pathlib.PurePosixPath(path).as_uri()
+
+    def _track_element(self, path: str, track: Track | None) -> str:
+        elements = [('location', self._location(path))]
+        if track:
+            elements += [('title', track.title), ('creator', track.artist), ('album', track.album)]
+            # Index 0 means there's none
+            if str(track.index).isdigit() and int(track.index): elements.append(('trackNum', track.index))
+            elements.append(('duration', int(track.length * 1000)))
+        return '    <track>{}</track>\n'.format(''.join(
+            '<{0}>{1}</{0}>'.format(name, escape(str(value))) for name, value in elements if value is not None))
+
+    def write(self, f: TextIO, tracks: Iterable[Track]) -> None:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<playlist version="1" xmlns="{}">\n  <trackList>\n'.format(
+            self._namespace))
+        f.writelines(self._track_element(path, track) for path, track in self._iter_files(tracks))
+        f.write('  </trackList>\n</playlist>\n')
+
+    def _create_element_track(self, element: ElementTree.Element, directory: str | None) -> Track | None:
+        values = {child.tag.rpartition('}')[2]: (child.text or '').strip() for child in element}
+        location = values.get('location')
+        if not location: return None
+        if not self._url.match(location): location = unquote(location, errors='surrogateescape')
+        try: length = int(values['duration']) / 1000
+        except (KeyError, ValueError): length = None
+        return self._create_track(location, directory, length, values.get('title') or None,
+            values.get('creator') or None, values.get('album') or None, values.get('trackNum') or None)
+
+    def iter_read(self, f: IO, directory: str | None = None) -> Iterator[Track]:
+        track_tag = '{{{}}}track'.format(self._namespace)
+        try:
+            for _, element in ElementTree.iterparse(f, events=('end',)):
+                if element.tag != track_tag: continue
+                track = self._create_element_track(element, directory)
+                element.clear()
+                if track: yield track
+        except ElementTree.ParseError as e:
+            raise RuntimeError('Bad playlist: {}'.format(e))
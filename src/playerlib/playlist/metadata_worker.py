@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from itertools import islice
+from typing import Any, Callable, Iterable
+
+class MetadataWorker:
+    '''Reads metadata of placeholder entries in a background thread, in batches which read can split between
+    workers; entries which are visible go first'''
+
+    batch_size: int = 32
+
+    read:    Callable[[list[str]], Iterable[Any]]
+    update:  Callable[[Any, Any], None]
+    visible: Callable[[], Iterable[Any]]
+    idle:    Callable[[], None] | None
+    redraw:  Callable[[], None] | None
+    logger:  logging.Logger
+
+    def __init__(self, read, update, visible, idle=None, redraw=None) -> None:
+        self.read = read
+        self.update = update
+        self.visible = visible
+        self.idle = idle
+        self.redraw = redraw
+        self.logger = logging.getLogger('MetadataWorker')
+        # Dict is used as an ordered set
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def add(self, entries: Iterable[Any]) -> None:
+        with self._condition:
+            for entry in entries:
+                self._pending[entry] = None
+            self._condition.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='MetadataWorker', daemon=True)
+                self._thread.start()
+
+    def clear(self) -> None:
+        with self._condition:
+            self._pending.clear()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _visible(self) -> Iterable[Any]:
+        # Called outside of the UI thread, so the list may change meanwhile
+        try: return list(self.visible())
+        except Exception: return []
+
+    def _next_batch(self) -> list[Any]:
+        batch = [e for e in self._visible() if e in self._pending][:self.batch_size]
+        for entry in batch:
+            del self._pending[entry]
+        for entry in list(islice(self._pending, self.batch_size - len(batch))):
+            del self._pending[entry]
+            batch.append(entry)
+        return batch
+
+    def _wait_for_batch(self) -> list[Any]:
+        with self._condition:
+            if self._pending: return self._next_batch()
+        if self.idle: self.idle()
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            return self._next_batch()
+
+    def _process(self, entries: list[Any]) -> None:
+        results = iter(())
+        try:
+            results = iter(self.read([e.track.path for e in entries]))
+        except Exception as e:
+            self.logger.warning('Cannot read metadata: {}'.format(e))
+        for entry in entries:
+            try:
+                result = next(results, None)
+            except Exception as e:
+                self.logger.warning('Cannot read {}: {}'.format(entry.track.path, e))
+                result = None
+            self.update(entry, result)
+        # Screen is redrawn once for the whole batch
+        if self.redraw: self.redraw()
+
+    def _run(self) -> None:
+        while True:
+            self._process(self._wait_for_batch())
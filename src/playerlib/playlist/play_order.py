@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import random
+from typing import Any, Iterable, Sequence
+
+class PlayOrder:
+    '''Decides which playlist entry is played next: in playlist order or shuffled, with repeat modes.
+    Shuffled order is a permutation kept up to date as entries are added and removed; entries
+    before the current position are the history, entries after it are yet to be played'''
+
+    repeat_modes: tuple[str, ...] = ('off', 'all', 'one')
+
+    entries: Sequence[Any]
+    repeat:  str
+
+    def __init__(self, rng: random.Random | None = None) -> None:
+        self.entries = []
+        self.repeat = 'off'
+        self._rng = rng if rng else random.Random()
+        self._shuffle = False
+        self._order = []
+        self._index = {}
+        self._current = -1
+        # Removed entries of the history are replaced with None, so there's
+        # no need to move others; they're dropped once there's enough of them
+        self._removed = 0
+
+    @property
+    def shuffle(self) -> bool:
+        return self._shuffle
+
+    @shuffle.setter
+    def shuffle(self, value: bool) -> None:
+        if value and not self._shuffle:
+            # Nothing is played yet in the new order, except the current entry
+            self.reset()
+        self._shuffle = bool(value)
+
+    def _restart(self, playing: Any) -> None:
+        self._current = -1
+        if playing is not None and playing in self._index:
+            self._swap(0, self._index[playing])
+            self._current = 0
+
+    def _swap(self, i: int, j: int) -> None:
+        order, index = self._order, self._index
+        order[i], order[j] = order[j], order[i]
+        if order[i] is not None: index[order[i]] = i
+        if order[j] is not None: index[order[j]] = j
+
+    def _compact(self) -> None:
+        # Current entry may be removed too, so its place is kept and the
+        # history before it is counted, not looked up by the current entry
+        current = self._current
+        history = sum(e is not None for e in self._order[:current]) if current >= 0 else -1
+        self._order = [e for i, e in enumerate(self._order) if e is not None or i == current]
+        self._index = {e: i for i, e in enumerate(self._order) if e is not None}
+        self._current = history
+        self._removed = int(current >= 0 and self._order[history] is None)
+
+    def add(self, entries: Iterable[Any]) -> None:
+        '''Puts entries at random positions among the ones yet to be played'''
+        order, index = self._order, self._index
+        for entry in entries:
+            order.append(entry)
+            index[entry] = len(order) - 1
+            self._swap(len(order) - 1, self._rng.randint(self._current + 1, len(order) - 1))
+
+    def remove(self, entry: Any) -> None:
+        position = self._index.pop(entry, None)
+        if position is None: return
+        last = len(self._order) - 1
+        if position > self._current:
+            # Order of the entries yet to be played stays random after
+            # moving the last one in place of the removed one
+            self._swap(position, last)
+            self._order.pop()
+            return
+        self._order[position] = None
+        self._removed += 1
+        if self._removed > len(self._order) // 2:
+            self._compact()
+
+    def reset(self) -> None:
+        '''Shuffles all entries again, e.g. after they all have changed; history is left with the current entry only'''
+        playing = self._order[self._current] if self._current >= 0 else None
+        self._order = list(self.entries)
+        self._rng.shuffle(self._order)
+        self._index = {e: i for i, e in enumerate(self._order)}
+        self._removed = 0
+        self._restart(playing)
+
+    def play(self, entry: Any) -> None:
+        '''Notes that entry is being played; if it's yet to be played, it becomes the last one of the history'''
+        position = self._index.get(entry)
+        if position is None: return
+        if position > self._current:
+            self._current += 1
+            self._swap(self._current, position)
+        else:
+            self._current = position
+
+    def _next_shuffled(self, entry: Any) -> Any:
+        # Entries removed from the history are there again after going back
+        # to an earlier entry, so they're skipped
+        position = self._current + 1
+        while position < len(self._order) and self._order[position] is None:
+            position += 1
+        if position < len(self._order):
+            return self._order[position]
+        if self.repeat != 'all' or not self._order: return None
+        # Whole permutation is played, so there's a new one; current entry
+        # goes to its history, so it's not played twice in a row
+        self.reset()
+        self.play(entry)
+        return self._order[self._current + 1] if self._current + 1 < len(self._order) else entry
+
+    def _prev_shuffled(self) -> Any:
+        position = self._current - 1
+        while position >= 0 and self._order[position] is None:
+            position -= 1
+        return self._order[position] if position >= 0 else None
+
+    def next(self, entry: Any, finished: bool = False) -> Any:
+        '''Entry to be played after given one; finished is set when it ended by itself, not skipped'''
+        if finished and self.repeat == 'one': return entry
+        if self._shuffle: return self._next_shuffled(entry)
+        if entry.next is not None: return entry.next
+        if self.repeat == 'all' and self.entries: return self.entries[0]
+        return None
+
+    def prev(self, entry: Any) -> Any:
+        if self._shuffle: return self._prev_shuffled()
+        if entry.prev is not None: return entry.prev
+        if self.repeat == 'all' and self.entries: return self.entries[-1]
+        return None
@@ -1,40 +1,69 @@
 #!/usr/bin/env python3
 
-import json
+import copy
 import logging
-import os
 import time
 import urwim
-from typing import Any, Callable
+from array import array
+from itertools import compress
+from typing import Any, Callable, Iterable, Iterator
 
+from playerlib.track.string_pool import *
 from playerlib.track.track import *
+from playerlib.track.track_table import *
 from playerlib.track.tracks_reader import *
 from .entry import *
+from .formats.playlist_formats import *
+from .metadata_worker import *
+from .play_order import *
 
 class Playlist(urwim.ViewWidget):
 
-    play_callback: Callable[[Track], None]
-    content:       urwim.SimpleListWalker
-    listbox:       urwim.ListWidget
-    header:        urwim.Header
-    tracks_reader: TracksReader
-    logger:        logging.Logger
+    batch_size:     int = 256
+    batch_interval: float = 0.2
 
-    def __init__(self, play_callback: Callable[[Track], None]):
+    play_callback:   Callable[[Track], None]
+    content:         urwim.VirtualListWalker
+    listbox:         urwim.ListWidget
+    header:          urwim.Header
+    tracks_reader:   TracksReader
+    table:           TrackTable
+    rows:            array
+    metadata_worker: MetadataWorker
+    play_order:      PlayOrder
+    lazy_metadata:   bool
+    logger:          logging.Logger
+
+    def __init__(self, play_callback: Callable[[Track], None], config: Any = None, play_order: PlayOrder | None = None):
         self.play_callback = play_callback
-        self.content = urwim.SimpleListWalker([])
+        self.content = urwim.VirtualListWalker([])
+        self.play_order = play_order if play_order else PlayOrder()
+        self.play_order.entries = self.content
 
         self.listbox = urwim.ListWidget(
             self.content,
-            on_delete=lambda x: self._relink_playlist(),
-            on_paste=lambda x: self._on_paste(x))
+            on_delete=lambda x, position: self._on_delete(x, position),
+            on_paste=lambda x, position: self._on_paste(x, position))
 
         self.header = urwim.Header('Unnamed playlist')
-        self.tracks_reader = TracksReader()
+        self.tracks_reader = TracksReader(config)
+        self.table = TrackTable()
+        # Table rows of entries in content, in the same order, so sorting,
+        # filtering and totals don't need to go through entries
+        self.rows = array('l')
+        self._unfiltered = None
+        self._unfiltered_rows = None
+        self.metadata_worker = MetadataWorker(
+            read=lambda paths: self.tracks_reader.iter_read_metadata(paths),
+            update=self._fill_placeholder,
+            visible=self._visible_entries,
+            idle=lambda: self.tracks_reader.flush(),
+            redraw=lambda: urwim.redraw())
+        self.lazy_metadata = self._get_lazy_metadata(config)
         self.logger = logging.getLogger('Playlist')
 
         callbacks = {
-            'enter': lambda: self.play_callback(self.listbox.focus.track)
+            'enter': lambda: self.play_callback(self.content.focus_item.track)
         }
 
         super().__init__(
@@ -43,59 +72,231 @@ class Playlist(urwim.ViewWidget):
             callbacks=callbacks,
             header=self.header)
 
+    def _get_lazy_metadata(self, config: Any) -> bool:
+        try: return config.playlist.lazy_metadata
+        except: return False
+
     def _get_track_string(self, track: Track) -> str:
-        if track.title:
-            return '{}. {} - {} {}'.format(
-                track.index if track.index else '?',
-                track.artist if track.artist else '?',
-                track.title,
-                time.strftime('%H:%M:%S', time.gmtime(int(track.length))))
-        else:
-            return '{} {}'.format(os.path.basename(track.path), time.strftime('%H:%M:%S', time.gmtime(int(track.length))))
+        return track.line
 
-    def _add_track(self, track: Track) -> None:
+    def _attach(self, track: Track) -> Track:
+        # Track has a single row, so the same one added again is copied
+        if track.table is not None:
+            track = copy.copy(track)
+        track.attach(self.table)
+        return track
+
+    def add_tracks(self, tracks: list[Track]) -> None:
+        '''Appends tracks at once; entries are built and linked first, then list is changed and redrawn once'''
         last = self.content[-1] if len(self.content) > 0 else None
-        self.content.append(Entry(track, self._get_track_string(track), prev=last))
+        entries = []
+        rows = array('l')
+        for track in tracks:
+            track = self._attach(track)
+            rows.append(track.row)
+            last = Entry(track, self._get_track_string(track), prev=last)
+            entries.append(last)
+        if self._unfiltered is not None:
+            self._unfiltered.extend(entries)
+            self._unfiltered_rows.extend(rows)
+        self.rows.extend(rows)
+        self.listbox.extend(entries)
+        self.play_order.add(entries)
+        pending = [e for e in entries if e.track.pending]
+        if pending:
+            self.metadata_worker.add(pending)
+
+    def _visible_entries(self) -> list[Entry]:
+        return [self.content[i] for i in self.listbox.visible_range()]
 
-    def add_to_playlist(self, path: str, clear_and_play: bool = False) -> None:
-        tracks = self.tracks_reader.read(path)
-        if not tracks or len(tracks) == 0:
+    def _fill_placeholder(self, entry: Entry, tracks: list[Track] | None) -> None:
+        # Called from the metadata worker thread, so shown entry is changed
+        # only when it's not being drawn
+        with urwim.draw_lock():
+            track = entry.track
+            # Entry could be deleted or playlist cleared while it was read
+            if track.table is not self.table: return
+            if tracks:
+                track.update(tracks[0])
+            else:
+                track.update(pending=False)
+            entry.set_line(self._get_track_string(track))
+            if tracks and len(tracks) > 1:
+                # File with embedded cue sheet
+                self._insert_after(entry, tracks[1:])
+
+    def _insert_after(self, entry: Entry, tracks: list[Track]) -> None:
+        # Called with draw lock held
+        entries = []
+        rows = array('l')
+        last = entry
+        for track in tracks:
+            track = self._attach(track)
+            rows.append(track.row)
+            new = Entry(track, self._get_track_string(track))
+            new.link(last, last.next)
+            entries.append(new)
+            last = new
+        for content, content_rows in ((self.content, self.rows), (self._unfiltered, self._unfiltered_rows)):
+            if content is None: continue
+            try: index = content_rows.index(entry.track.row)
+            except ValueError: continue
+            content[index + 1:index + 1] = entries
+            content_rows[index + 1:index + 1] = rows
+        self.play_order.add(entries)
+
+    def _add_track(self, track: Track) -> None:
+        self.add_tracks([track])
+
+    def _add_in_batches(self, tracks: Iterable[Track]) -> None:
+        batch = []
+        last_update = time.monotonic()
+        for track in tracks:
+            batch.append(track)
+            if len(batch) >= self.batch_size or time.monotonic() - last_update >= self.batch_interval:
+                self.add_tracks(batch)
+                batch = []
+                last_update = time.monotonic()
+        if batch:
+            self.add_tracks(batch)
+
+    def add_to_playlist(self, path: str, clear_and_play: bool = False, recursive: bool = False) -> None:
+        tracks = self.tracks_reader.iter_tracks(path, recursive=recursive, placeholders=self.lazy_metadata)
+        first = next(tracks, None)
+        if first is None:
             raise RuntimeError('No music files to play!')
         if clear_and_play:
             self.clear()
-        for f in tracks:
-            self._add_track(f)
+        self._add_track(first)
         if clear_and_play:
             try:
                 self.listbox.focus_position = 0
-                self.play_callback(self.listbox.focus.track)
+                self.play_callback(first)
             except: pass
+        self._add_in_batches(tracks)
+
+    def _all_entries(self) -> list[Entry]:
+        return self._unfiltered if self._unfiltered is not None else list(self.content)
+
+    def _all_rows(self) -> array:
+        return self._unfiltered_rows if self._unfiltered_rows is not None else self.rows
+
+    def sort(self, keys: list[str]) -> None:
+        '''Sorts playlist by given track attributes, e.g. artist, album, index'''
+        entries, rows = self._all_entries(), self._all_rows()
+        positions = self.table.sort(rows, keys)
+        entries = list(map(entries.__getitem__, positions))
+        rows = array('l', map(rows.__getitem__, positions))
+        if self._unfiltered is not None:
+            self._unfiltered, self._unfiltered_rows = entries, rows
+            shown = list(map(set(self.rows).__contains__, rows))
+            self.content[:] = list(compress(entries, shown))
+            self.rows = array('l', compress(rows, shown))
+        else:
+            self.content[:] = entries
+            self.rows = rows
+        self._relink_playlist()
+
+    def filter(self, pattern: str) -> None:
+        '''Shows only tracks with title, artist, album or path containing pattern; empty pattern shows all'''
+        entries, rows = self._all_entries(), self._all_rows()
+        if pattern:
+            positions = self.table.filter(rows, pattern)
+            self._unfiltered, self._unfiltered_rows = entries, rows
+            self.content[:] = list(map(entries.__getitem__, positions))
+            self.rows = array('l', map(rows.__getitem__, positions))
+        else:
+            self._unfiltered, self._unfiltered_rows = None, None
+            self.content[:] = entries
+            self.rows = rows
+        self._relink_playlist()
+        self.play_order.reset()
+
+    def total_length(self) -> float:
+        return self.table.total_length(self.rows)
+
+    def remaining_length(self, track: Track | None) -> float:
+        '''Length of the tracks from the given one until the end of the playlist'''
+        if track is None or track.table is not self.table: return self.total_length()
+        try: position = self.rows.index(track.row)
+        except ValueError: return self.total_length()
+        return self.table.total_length(self.rows[position:])
 
     def save_playlist(self, filename: str) -> None:
-        tracks = [t.track.to_dict() for t in self.content]
-        with open(filename, 'w') as f:
-            json.dump(tracks, f, indent=1)
+        '''Saves playlist in format given by file extension: M3U, M3U8, PLS, XSPF or own JSON lines one'''
+        PlaylistFormats().find(filename).save(filename, (e.track for e in self._all_entries()))
         self.header.text = filename
 
+    def _read_missing_metadata(self, tracks: Iterable[Track]) -> Iterator[Track]:
+        for track in tracks:
+            # Without lazy metadata tracks lacking it in playlist file are
+            # read right away; otherwise they're filled in later
+            if not track.pending or self.lazy_metadata:
+                yield track
+                continue
+            read = self.tracks_reader.read_metadata(track.path)
+            if read:
+                yield from read
+            else:
+                track.update(pending=False)
+                yield track
+
     def load_playlist(self, filename: str) -> None:
-        with open(filename, 'r') as f:
-            raw_tracks = json.load(f)
-        for t in raw_tracks:
-            self._add_track(Track(t))
+        # Entries are added while the file is being read
+        tracks = PlaylistFormats().find(filename).iter_load(filename)
+        self._add_in_batches(self._read_missing_metadata(tracks))
         self.header.text = filename
 
     def clear(self) -> None:
+        self.metadata_worker.clear()
+        self._unfiltered, self._unfiltered_rows = None, None
         self.content[:] = []
+        self.rows = array('l')
+        self.play_order.reset()
+        # Played track can outlive the playlist, so tracks keep the table
+        # they're attached to and the new ones get a new one
+        self.table = TrackTable()
+        # Strings are shared by tracks which are just removed, so there's
+        # no point in keeping them
+        string_pool.clear()
 
     def _relink_playlist(self) -> None:
+        # Walks whole playlist, so it's only for changes of the whole order;
+        # single entries are linked with Entry.link and Entry.unlink
         prev = None
         for e in self.content:
             e.prev = prev
             if prev: prev.next = e
             prev = e
-        self.content[-1].next = None
+        if prev: prev.next = None
+
+    def _on_delete(self, entry: Entry, position: int) -> None:
+        del self.rows[position]
+        if self._unfiltered is not None:
+            # Only shown position is known, so unfiltered one is looked up
+            position = self._unfiltered_rows.index(entry.track.row)
+            del self._unfiltered[position]
+            del self._unfiltered_rows[position]
+        entry.unlink()
+        self.play_order.remove(entry)
+        # Deleted entry goes to the clipboard, and its track may be still
+        # played, so it keeps its metadata, but its row is freed
+        entry.track.detach()
 
-    def _on_paste(self, entry: Entry) -> None:
+    def _on_paste(self, entry: Entry, position: int) -> None:
+        # Entry comes from the clipboard, so its track is a copy which is
+        # not attached to any table
+        entry.track.attach(self.table)
         entry.set_stopped()
-        self._relink_playlist()
+        entry.link(
+            self.content[position - 1] if position > 0 else None,
+            self.content[position + 1] if position + 1 < len(self.content) else None)
+        self.rows.insert(position, entry.track.row)
+        if self._unfiltered is not None:
+            index = self._unfiltered_rows.index(entry.prev.track.row) + 1 if entry.prev else 0
+            self._unfiltered.insert(index, entry)
+            self._unfiltered_rows.insert(index, entry.track.row)
+        self.play_order.add([entry])
+        if entry.track.pending:
+            self.metadata_worker.add([entry])
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable
+
+def _mtime(path: str) -> int | None:
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+class MetadataCache:
+    '''Persistent cache of tags read from music files and of parsed cue sheets; entries are validated by file size and mtime'''
+
+    version: int = 3
+
+    hits:    int
+    misses:  int
+    evicted: int
+    logger:  logging.Logger
+
+    def __init__(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_cuesheets = []
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.logger = logging.getLogger('MetadataCache')
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self._lock, self._connection as c:
+            c.execute('PRAGMA journal_mode = WAL')
+            if c.execute('PRAGMA user_version').fetchone()[0] != self.version:
+                self.logger.info('Recreating cache with version {}'.format(self.version))
+                c.execute('DROP TABLE IF EXISTS tags')
+                c.execute('DROP TABLE IF EXISTS cuesheets')
+                c.execute('PRAGMA user_version = {}'.format(self.version))
+            c.execute('CREATE TABLE IF NOT EXISTS tags (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, tags TEXT)')
+            c.execute('CREATE TABLE IF NOT EXISTS cuesheets (path TEXT PRIMARY KEY, mtime INTEGER, files TEXT, cuesheet TEXT)')
+
+    def get(self, path: str, size: int, mtime: int) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime, tags FROM tags WHERE path = ?', (path,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[0] != size or row[1] != mtime:
+                self._connection.execute('DELETE FROM tags WHERE path = ?', (path,))
+                self.evicted += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[2])
+
+    def put(self, path: str, size: int, mtime: int, tags: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append((path, size, mtime, json.dumps(tags)))
+
+    def get_cuesheet(self, path: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._connection.execute('SELECT mtime, files, cuesheet FROM cuesheets WHERE path = ?', (path,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            files = json.loads(row[1])
+            if row[0] != _mtime(path) or any(_mtime(f) != mtime for f, mtime in files.items()):
+                self._connection.execute('DELETE FROM cuesheets WHERE path = ?', (path,))
+                self.evicted += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[2])
+
+    def put_cuesheet(self, path: str, files: Iterable[str], cuesheet: dict[str, Any]) -> None:
+        files = {f: _mtime(f) for f in files}
+        with self._lock:
+            self._pending_cuesheets.append((path, _mtime(path), json.dumps(files), json.dumps(cuesheet, separators=(',', ':'))))
+
+    def flush(self) -> None:
+        with self._lock, self._connection as c:
+            c.executemany('INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?)', self._pending)
+            c.executemany('INSERT OR REPLACE INTO cuesheets VALUES (?, ?, ?, ?)', self._pending_cuesheets)
+            self._pending = []
+            self._pending_cuesheets = []
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted}
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
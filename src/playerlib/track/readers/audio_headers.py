@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import mmap
+import os
+import struct
+
+# Pure-Python readers of audio lengths; each of them reads only the headers
+# (and for Ogg, the last page) of a memory-mapped file. All of them return
+# None if the file cannot be handled, so the caller can fall back to taglib
+
+_ogg_search_size = 65536
+_mp3_search_size = 65536
+
+_mp3_bitrates = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+_mp3_sample_rates = {
+    3: [44100, 48000, 32000],  # MPEG 1
+    2: [22050, 24000, 16000],  # MPEG 2
+    0: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+def _skip_id3v2(data):
+    if data[0:3] != b'ID3' or len(data) < 10: return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def flac_length(data):
+    offset = _skip_id3v2(data)
+    if data[offset:offset + 4] != b'fLaC': return None
+    block = offset + 4
+    if data[block] & 0x7f != 0: return None  # STREAMINFO has to be the first block
+    info, = struct.unpack_from('>Q', data, block + 4 + 10)
+    sample_rate = info >> 44
+    total_samples = info & 0xfffffffff
+    if not sample_rate or not total_samples: return None
+    return total_samples / sample_rate
+
+def wav_length(data):
+    if data[0:4] != b'RIFF' or data[8:12] != b'WAVE': return None
+    offset = 12
+    byte_rate = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size, = struct.unpack_from('<I', data, offset + 4)
+        if chunk_id == b'fmt ':
+            byte_rate, = struct.unpack_from('<I', data, offset + 16)
+        elif chunk_id == b'data':
+            if not byte_rate: return None
+            # Size may be bogus for files written by streaming encoders
+            return min(chunk_size, len(data) - offset - 8) / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+def _ogg_granule_rate(data):
+    # Packet of the first page starts right after the segment table
+    packet = 27 + data[26]
+    if data[packet:packet + 7] == b'\x01vorbis':
+        rate, = struct.unpack_from('<I', data, packet + 12)
+        return rate, 0
+    elif data[packet:packet + 8] == b'OpusHead':
+        pre_skip, = struct.unpack_from('<H', data, packet + 10)
+        return 48000, pre_skip
+    return None, 0
+
+def ogg_length(data):
+    if data[0:4] != b'OggS': return None
+    rate, pre_skip = _ogg_granule_rate(data)
+    if not rate: return None
+    end = len(data)
+    start = max(0, end - _ogg_search_size)
+    while True:
+        page = data.rfind(b'OggS', start, end)
+        if page < 0: return None
+        granule, = struct.unpack_from('<q', data, page + 6)
+        if granule > 0:
+            return max(granule - pre_skip, 0) / rate
+        end = page
+
+def _mp3_frame_header(data, offset):
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xff or b1 & 0xe0 != 0xe0: return None
+    version = (b1 >> 3) & 3
+    layer = 4 - ((b1 >> 1) & 3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = _mp3_bitrates[(1 if version == 3 else 2, layer)][bitrate_index]
+    sample_rate = _mp3_sample_rates[version][sample_rate_index]
+    if layer == 1: samples = 384
+    elif layer == 2 or version == 3: samples = 1152
+    else: samples = 576
+    mono = b3 >> 6 == 3
+    return version, layer, bitrate, sample_rate, samples, mono
+
+def mp3_length(data):
+    start = _skip_id3v2(data)
+    offset = data.find(b'\xff', start, start + _mp3_search_size)
+    header = None
+    while 0 <= offset < len(data) - 4:
+        header = _mp3_frame_header(data, offset)
+        if header: break
+        offset = data.find(b'\xff', offset + 1, start + _mp3_search_size)
+    if not header: return None
+    version, layer, bitrate, sample_rate, samples, mono = header
+    if version == 3: side_info = 17 if mono else 32
+    else: side_info = 9 if mono else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b'Xing', b'Info'):
+        flags, = struct.unpack_from('>I', data, xing + 4)
+        if flags & 1:
+            frames, = struct.unpack_from('>I', data, xing + 8)
+            return frames * samples / sample_rate
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI':
+        frames, = struct.unpack_from('>I', data, vbri + 14)
+        return frames * samples / sample_rate
+    # No VBR header, so it's assumed to be CBR
+    end = len(data) - (128 if data[-128:-125] == b'TAG' else 0)
+    return (end - offset) * 8 / (bitrate * 1000)
+
+_readers = {
+    '.flac': flac_length,
+    '.wav': wav_length,
+    '.ogg': ogg_length,
+    '.opus': ogg_length,
+    '.mp3': mp3_length,
+}
+
+def read_length(path):
+    '''Returns length in seconds or None if it cannot be read from the headers'''
+    reader = _readers.get(os.path.splitext(path)[1].lower())
+    if not reader: return None
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            length = reader(data)
+    except (OSError, ValueError, IndexError, struct.error):
+        return None
+    return int(length) if length is not None else None
@@ -5,6 +5,8 @@ from .tracks_reader_interface import *
 
 class CdaudioReader(TracksReaderInterface):
 
+    schemes = ['cdda']
+
     def read(self, path):
         if path != 'cdda://': return None
         try:
@@ -19,8 +21,7 @@ class CdaudioReader(TracksReaderInterface):
             track.path = path
             track.title = 'CD Audio track' # TODO: read tags from FreeDB
             track.index = cdda_track.number
-            track.length = cdda_track.seconds
-            track.length_string, track.time_format = self._format_seconds_and_get_format_string(track.length)
+            track.set_length(cdda_track.seconds)
             try:
                 track.offset = tracks[-1].offset + tracks[-1].length
             except:
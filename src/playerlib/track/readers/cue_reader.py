@@ -1,32 +1,72 @@
 #!/usr/bin/env python3
 
-import logging
 import os
-import re
 
 from cueparser import *
+from playerlib.track.string_pool import *
 from playerlib.track.track import *
+from .file_reader import FileReader, read_length
 from .tracks_reader_interface import *
 
 class CueReader(TracksReaderInterface):
 
-    def __init__(self):
-        self._parser = CueParser()
+    extensions = ['.cue']
 
-    def read(self, path):
-        if not path.endswith('.cue'): return None
-        cuesheet = self._parser.parse(path, use_taglib=True)
-        tracks = []
-        for t in cuesheet.tracks:
-            new_track = Track()
-            new_track.path = os.path.join(os.path.dirname(path), t.file)
-            new_track.artist = cuesheet.performer
-            new_track.album = cuesheet.title
-            new_track.title = t.title
-            new_track.index = str(t.index)
-            new_track.length = t.length
-            new_track.length_string, new_track.time_format = self._format_seconds_and_get_format_string(t.length)
-            new_track.offset = t.offset
-            tracks.append(new_track)
-        return tracks
+    def __init__(self, encodings=None, cache=None):
+        self._parser = CueParser(encodings, lambda path: read_length(self._resolve_audio_path(path)))
+        self._cache = cache
+
+    def _resolve_audio_path(self, path):
+        # FILE often names the file which was ripped, e.g. album.wav, while
+        # it was encoded later to album.flac, so it's looked up by its stem
+        if os.path.exists(path): return path
+        stem = os.path.splitext(path)[0]
+        for extension in FileReader.extensions:
+            candidate = stem + extension
+            if os.path.exists(candidate): return candidate
+        return path
+
+    def _create_track(self, cuesheet, audio_path, title, index, length, offset):
+        new_track = Track()
+        new_track.path = audio_path
+        new_track.artist = cuesheet['performer']
+        new_track.album = cuesheet['title']
+        new_track.title = title
+        new_track.index = str(index)
+        new_track.set_length(length)
+        new_track.offset = offset
+        return string_pool.intern_track(new_track)
+
+    def _iter_parse(self, path):
+        parent_dir = os.path.dirname(path)
+        parsed = CueParser.CueSheet()
+        cuesheet = {'performer': None, 'title': None, 'tracks': []}
+        audio_paths = {}
+        # Playlist shows lengths of all tracks right away, so they're not
+        # resolved lazily; audio file is opened only for the last track of it
+        for t in self._parser.iter_tracks(path, use_taglib=True, lazy_lengths=False, cuesheet=parsed):
+            cuesheet['performer'], cuesheet['title'] = parsed.performer, parsed.title
+            if t.file not in audio_paths:
+                audio_paths[t.file] = self._resolve_audio_path(os.path.join(parent_dir, t.file))
+            raw_track = [audio_paths[t.file], t.title, t.index, t.length, t.offset]
+            cuesheet['tracks'].append(raw_track)
+            yield self._create_track(cuesheet, *raw_track)
+        cuesheet['performer'], cuesheet['title'] = parsed.performer, parsed.title
+        if self._cache:
+            self._cache.put_cuesheet(path, {t[0] for t in cuesheet['tracks']}, cuesheet)
 
+    def _iter_read(self, path):
+        cuesheet = self._cache.get_cuesheet(path) if self._cache else None
+        if cuesheet is None:
+            yield from self._iter_parse(path)
+            return
+        for raw_track in cuesheet['tracks']:
+            yield self._create_track(cuesheet, *raw_track)
+
+    def iter_read(self, path):
+        if not path.lower().endswith('.cue'): return None
+        return self._iter_read(path)
+
+    def read(self, path):
+        tracks = self.iter_read(path)
+        return list(tracks) if tracks is not None else None
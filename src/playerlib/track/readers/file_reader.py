@@ -2,35 +2,156 @@
 
 import os
 import taglib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
 
+from cueparser import *
+from playerlib.track.string_pool import *
 from playerlib.track.track import *
+from . import audio_headers
 from .tracks_reader_interface import *
 
+def read_length(path):
+    '''Reads length from headers of the file, falling back to taglib for formats which are not supported'''
+    length = audio_headers.read_length(path)
+    return length if length is not None else taglib.File(path).length
+
+def read_length_only(path):
+    '''Same as read_tags, but without opening the file with taglib if possible'''
+    return {'title': None, 'artist': None, 'album': None, 'index': 0, 'length': read_length(path), 'cuesheet': None}
+
+def read_tags(path):
+    '''Reads tags with taglib; defined at module level so it can be run in a worker process'''
+    tags = taglib.File(path)
+    result = {'title': None, 'artist': None, 'album': None, 'index': 0, 'length': tags.length, 'cuesheet': None}
+    try: result['title'] = ', '.join(tags.tags['TITLE'])
+    except KeyError: pass
+    try: result['artist'] = ', '.join(tags.tags['ARTIST'])
+    except KeyError: pass
+    try: result['album'] = ', '.join(tags.tags['ALBUM'])
+    except KeyError: pass
+    try: result['index'] = tags.tags['TRACKNUMBER'][0]
+    except KeyError: pass
+    try: result['cuesheet'] = '\n'.join(tags.tags['CUESHEET'])
+    except KeyError: pass
+    return result
+
+def read_or_none(read, path):
+    '''Gives None if file cannot be read, so other files read with Executor.map are not dropped'''
+    try: return read(path)
+    except Exception: return None
+
 class FileReader(TracksReaderInterface):
 
     extensions = [
         '.mp3', '.flac', '.m4a', '.wma', '.ogg', '.ape', '.alac', '.mpc', '.wav', '.wv'
     ]
 
+    _extensions = frozenset(extensions)
+
+    def __init__(self, cache=None, read_tags=True):
+        self._cache = cache
+        self._read_tags = read_tags
+        self._cue_parser = CueParser()
+
     def _is_music_file(self, path):
-        for e in self.extensions:
-            if path.endswith(e): return True
-        return False
+        return os.path.splitext(path)[1].lower() in self._extensions
 
-    def read(self, path):
-        if not self._is_music_file(path): return None
+    def _stat(self, path):
+        if not self._cache: return None
+        try: return os.stat(path)
+        except OSError: return None
+
+    def _get_cached_tags(self, path, stat):
+        if not stat: return None
+        return self._cache.get(path, stat.st_size, stat.st_mtime_ns)
+
+    def _put_tags(self, path, stat, tags):
+        if stat: self._cache.put(path, stat.st_size, stat.st_mtime_ns, tags)
+
+    def _get_tags(self, path):
+        # Lengths are cheap to read, so they're not cached; entries in
+        # the cache always have full tags
+        if not self._read_tags: return read_length_only(path)
+        stat = self._stat(path)
+        tags = self._get_cached_tags(path, stat)
+        if tags is None:
+            tags = read_tags(path)
+            self._put_tags(path, stat, tags)
+        return tags
+
+    def _get_tags_in_processes(self, paths, executor, read):
+        # Cache is not shared with worker processes, so it's checked here
+        # and only tags of the files not found in it are read by the pool
+        stats = [self._stat(p) for p in paths]
+        cached = [self._get_cached_tags(p, s) for p, s in zip(paths, stats)]
+        results = executor.map(read, [p for p, tags in zip(paths, cached) if tags is None])
+        for path, stat, tags in zip(paths, stats, cached):
+            if tags is None:
+                tags = next(results)
+                if tags is not None: self._put_tags(path, stat, tags)
+            yield tags
+
+    def _iter_tags(self, paths, executor, wrap=lambda read: read):
+        if executor is None:
+            return map(wrap(self._get_tags), paths)
+        if not self._read_tags:
+            return executor.map(wrap(read_length_only), paths)
+        if isinstance(executor, ProcessPoolExecutor):
+            return self._get_tags_in_processes(paths, executor, wrap(read_tags))
+        return executor.map(wrap(self._get_tags), paths)
+
+    def _create_track(self, path, tags):
         track = Track()
         track.path = path
-        tags = taglib.File(path)
-        try: track.title = ', '.join(tags.tags['TITLE'])
-        except KeyError: track.title = os.path.basename(path)
-        try: track.artist = ', '.join(tags.tags['ARTIST'])
-        except KeyError: pass
-        try: track.album = ', '.join(tags.tags['ALBUM'])
-        except KeyError: pass
-        try: track.index = tags.tags['TRACKNUMBER'][0]
-        except KeyError: pass
-        track.length = tags.length
-        track.length_string, track.time_format = self._format_seconds_and_get_format_string(track.length)
-        return [track]
+        track.title = tags['title'] if tags['title'] else os.path.basename(path)
+        track.artist = tags['artist']
+        track.album = tags['album']
+        track.index = tags['index']
+        track.set_length(tags['length'])
+        return string_pool.intern_track(track)
+
+    def _create_tracks_from_cuesheet(self, path, tags):
+        # Embedded cue sheet describes the file it's embedded in, so FILE
+        # commands are ignored and the file is not opened again
+        cuesheet = self._cue_parser.parse_string(tags['cuesheet'])
+        tracks = []
+        for i, t in enumerate(cuesheet.tracks):
+            track = Track()
+            track.path = path
+            track.title = t.title if t.title else '{} ({})'.format(os.path.basename(path), t.index)
+            track.artist = t.performer or cuesheet.performer or tags['artist']
+            track.album = cuesheet.title or tags['album']
+            track.index = str(t.index)
+            track.offset = t.offset
+            is_last = i == len(cuesheet.tracks) - 1
+            track.set_length(tags['length'] - t.offset if is_last else cuesheet.tracks[i + 1].offset - t.offset)
+            tracks.append(string_pool.intern_track(track))
+        return tracks
+
+    def _create_tracks(self, path, tags):
+        if tags.get('cuesheet'):
+            tracks = self._create_tracks_from_cuesheet(path, tags)
+            if tracks: return tracks
+        return [self._create_track(path, tags)]
+
+    def create_placeholder(self, path):
+        '''Track with only path set; rest of metadata is to be filled in later with read'''
+        return Track.placeholder(path)
+
+    def read(self, path):
+        if not self._is_music_file(path): return None
+        return self._create_tracks(path, self._get_tags(path))
+
+    def iter_many(self, paths: list[str], executor: Executor | None = None):
+        '''Yields tracks for all music files from paths, possibly reading them in parallel; order of paths is kept'''
+        paths = [p for p in paths if self._is_music_file(p)]
+        for path, tags in zip(paths, self._iter_tags(paths, executor)):
+            yield from self._create_tracks(path, tags)
 
+    def iter_read_many(self, paths: list[str], executor: Executor | None = None):
+        '''Yields tracks of each of music files from paths, possibly reading them in parallel; None is yielded
+        for files which cannot be read'''
+        tags = self._iter_tags(paths, executor, lambda read: partial(read_or_none, read))
+        for path, t in zip(paths, tags):
+            yield self._create_tracks(path, t) if t is not None else None
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 
-from time import gmtime, strftime
-
 class TracksReaderInterface:
 
-    def _format_seconds_and_get_format_string(self, seconds):
-        time_format = '%H:%M:%S' if seconds >= 3600 else '%M:%S'
-        return strftime(time_format, gmtime(seconds)), time_format
+    schemes:    list[str] = []
+    extensions: list[str] = []
 
     def read(self, filename):
         raise NotImplementedError('Not implemented!')
 
+    def iter_read(self, filename):
+        '''Same as read, but returns an iterator; readers which can stream tracks should override it'''
+        tracks = self.read(filename)
+        return iter(tracks) if tracks is not None else None
+
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import time
+from importlib.metadata import entry_points
+from typing import Any, Iterable, Iterator
+
+from playerlib.track.readers.tracks_reader_interface import *
+
+class ReadersRegistry:
+    '''Maps URL schemes and lowercase file extensions to readers'''
+
+    entry_points_group: str = 'player.tracks_readers'
+
+    logger: logging.Logger
+
+    def __init__(self) -> None:
+        self._schemes = {}
+        self._extensions = {}
+        self._timings = {}
+        self.logger = logging.getLogger('ReadersRegistry')
+
+    def register(self, reader: TracksReaderInterface) -> None:
+        for scheme in reader.schemes:
+            self._schemes[scheme] = reader
+        for extension in reader.extensions:
+            self._extensions[extension.lower()] = reader
+
+    def load_entry_points(self) -> None:
+        '''Registers readers provided by other packages in the player.tracks_readers group'''
+        for entry_point in entry_points(group=self.entry_points_group):
+            try:
+                self.register(entry_point.load()())
+                self.logger.info('Registered reader: {}'.format(entry_point.name))
+            except Exception as e:
+                self.logger.warning('Cannot load reader {}: {}'.format(entry_point.name, e))
+
+    def find(self, path: str) -> TracksReaderInterface | None:
+        scheme, separator, _ = path.partition('://')
+        if separator:
+            return self._schemes.get(scheme)
+        return self._extensions.get(os.path.splitext(path)[1].lower())
+
+    def timed(self, reader: TracksReaderInterface, tracks: Iterable[Any]) -> Iterator[Any]:
+        timing = self._timings.setdefault(reader.__class__.__name__, {'calls': 0, 'tracks': 0, 'seconds': 0.0})
+        timing['calls'] += 1
+        tracks = iter(tracks)
+        while True:
+            start = time.perf_counter()
+            try:
+                track = next(tracks)
+            except StopIteration:
+                return
+            finally:
+                timing['seconds'] += time.perf_counter() - start
+            timing['tracks'] += 1
+            yield track
+
+    @property
+    def timings(self) -> dict[str, dict[str, float]]:
+        return self._timings
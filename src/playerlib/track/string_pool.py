@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import sys
+import threading
+
+class StringPool:
+    '''Keeps a single copy of equal strings, e.g. paths, artists and albums repeated across tracks'''
+
+    # Track attributes which often repeat; titles rarely do, so they're skipped
+    track_fields: tuple[str, ...] = ('path', 'artist', 'album', 'performer', 'index', 'length_string', 'time_format')
+
+    hits:        int
+    saved_bytes: int
+
+    def __init__(self) -> None:
+        self._strings = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.saved_bytes = 0
+
+    def intern(self, value):
+        if not isinstance(value, str): return value
+        interned = self._strings.setdefault(value, value)
+        if interned is not value:
+            with self._lock:
+                self.hits += 1
+                self.saved_bytes += sys.getsizeof(value)
+        return interned
+
+    def intern_track(self, track):
+        for name in self.track_fields:
+            setattr(track, name, self.intern(getattr(track, name)))
+        return track
+
+    def clear(self) -> None:
+        self._strings.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {'strings': len(self._strings), 'hits': self.hits, 'saved_bytes': self.saved_bytes}
+
+string_pool = StringPool()
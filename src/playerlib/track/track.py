@@ -1,6 +1,39 @@
 #!/usr/bin/env python3
 
-from typing import Dict
+import os
+from functools import lru_cache
+from operator import attrgetter
+from time import gmtime, strftime
+from typing import Any, Dict
+
+@lru_cache(maxsize=8192)
+def format_time(seconds: int, time_format: str = '%H:%M:%S') -> str:
+    '''Formats whole seconds; same values are formatted over and over, so results are cached'''
+    return strftime(time_format, gmtime(seconds))
+
+def length_format(seconds: float) -> str:
+    return '%H:%M:%S' if seconds >= 3600 else '%M:%S'
+
+def _displayed(name: str) -> property:
+    # Attribute shown in the playlist line; setting it drops the cached line
+    slot = '_' + name
+    def set(self, value):
+        setattr(self, slot, value)
+        self._line = None
+    return property(attrgetter(slot), set)
+
+def _column(name: str, position: int) -> property:
+    # Attribute kept in a TrackTable row once track is attached to it, or
+    # in the track itself otherwise; it can be shown, so cached line is dropped
+    def get(self):
+        values = self._values
+        return values[position] if values is not None else self.table.get(self.row, name)
+    def set(self, value):
+        values = self._values
+        if values is not None: values[position] = value
+        else: self.table.set(self.row, name, value)
+        self._line = None
+    return property(get, set)
 
 class Track:
 
@@ -9,29 +42,130 @@ class Track:
         PLAYING = 1
         PAUSED = 2
 
+    # Attributes which are saved in playlists
+    fields = ('path', 'offset', 'length', 'index', 'title', 'artist', 'album', 'performer', 'pending',
+        'length_string', 'time_format')
+
+    # Attributes copied by update(), e.g. when placeholder is read
+    metadata_fields = ('offset', 'length', 'index', 'title', 'artist', 'album', 'performer', 'pending',
+        'length_string', 'time_format')
+
+    # Attributes kept in a TrackTable once track is attached to it
+    table_fields = ('path', 'offset', 'length', 'index', 'title', 'artist', 'album')
+
+    __slots__ = ('performer', 'length_string', 'time_format', '_pending', 'state', 'playlist_entry', '_line',
+        '_values', 'table', 'row')
+
+    path = _column('path', 0)
+    offset = _column('offset', 1)
+    length = _column('length', 2)
+    index = _column('index', 3)
+    title = _column('title', 4)
+    artist = _column('artist', 5)
+    album = _column('album', 6)
+    pending = _displayed('pending')
+
     def __init__(self, dictionary=None) -> None:
-        self.path = None
-        self.offset = 0
-        self.length = 0
-        self.index = 0
-        self.title = None
-        self.artist = None
-        self.album = None
-        self.performer = None
         self.state = self.State.STOPPED
         self.playlist_entry = None
-        if dictionary:
-            self._from_dict(dictionary)
+        self._line = None
+        self._values = [None] * len(self.table_fields)
+        self.table = None
+        self.row = None
+        self._from_dict(dictionary if dictionary else {})
+
+    def attach(self, table: Any) -> None:
+        '''Moves metadata kept in columns to a new row of table'''
+        self.row = table.append(self)
+        self.table = table
+        self._values = None
 
-    def to_dict(self) -> Dict[str, str]:
-        d = self.__dict__.copy()
-        del d['state']
-        del d['playlist_entry']
-        return d
+    def detach(self) -> None:
+        '''Takes metadata back from table and frees its row'''
+        if self.table is None: return
+        self._values = [self.table.get(self.row, name) for name in self.table_fields]
+        self.table.remove(self.row)
+        self.table = None
+        self.row = None
 
-    def _from_dict(self, d: Dict[str, str]) -> None:
-        for k, v in d.items():
-            setattr(self, k, v)
+    def __copy__(self) -> 'Track':
+        # Copy is not attached to any table
+        return Track(self.to_dict())
+
+    @classmethod
+    def placeholder(cls, path: str) -> 'Track':
+        '''Track with only path set; rest of metadata is to be filled in later'''
+        track = cls()
+        track.path = path
+        track.title = os.path.basename(path)
+        track.pending = True
+        track.length_string = '--:--'
+        return track
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'offset': self.offset,
+            'length': self.length,
+            'index': self.index,
+            'title': self.title,
+            'artist': self.artist,
+            'album': self.album,
+            'performer': self.performer,
+            'pending': self.pending,
+            'length_string': self.length_string,
+            'time_format': self.time_format,
+        }
+
+    def _from_dict(self, d: Dict[str, Any]) -> None:
+        # Unknown keys are ignored, missing ones get default values
+        get = d.get
+        self.path = get('path')
+        self.offset = get('offset', 0)
+        self.length = get('length', 0)
+        self.index = get('index', 0)
+        self.title = get('title')
+        self.artist = get('artist')
+        self.album = get('album')
+        self.performer = get('performer')
+        self.pending = get('pending', False)
+        self.length_string = get('length_string', '00:00')
+        self.time_format = get('time_format', '%M:%S')
+
+    def set_length(self, length: float) -> None:
+        self.length = length
+        self.time_format = length_format(length)
+        self.length_string = format_time(int(length), self.time_format)
+
+    def update(self, other: 'Track | None' = None, **values: Any) -> None:
+        '''Copies metadata from other track (e.g. when placeholder is read) and sets given values'''
+        if other is not None:
+            for name in self.metadata_fields:
+                setattr(self, name, getattr(other, name))
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def _format_line(self) -> str:
+        if self.pending:
+            return '{} --:--:--'.format(os.path.basename(self.path))
+        length = format_time(int(self.length))
+        if self.title:
+            return '{}. {} - {} {}'.format(
+                self.index if self.index else '?',
+                self.artist if self.artist else '?',
+                self.title,
+                length)
+        return '{} {}'.format(os.path.basename(self.path), length)
+
+    @property
+    def line(self) -> str:
+        '''Playlist line; it's formatted once and kept until one of displayed fields is changed'''
+        if self._line is None:
+            self._line = self._format_line()
+        return self._line
+
+    def elapsed_string(self, position: float) -> str:
+        return format_time(int(position - self.offset), self.time_format)
 
     def play(self) -> None:
         self.state = self.State.PLAYING
@@ -53,4 +187,3 @@ class Track:
 
     def __repr__(self) -> str:
         return str(self.to_dict())
-
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import re
+from array import array
+from itertools import compress
+from typing import Any, Iterable, Sequence
+
+from playerlib.natural_sort import *
+from playerlib.track.track import *
+
+class TrackTable:
+    '''Columnar store of metadata of tracks attached to it; sorting, filtering and totals work on whole columns'''
+
+    # Paths and titles are rarely repeated, so rows just refer to them;
+    # other values are kept once and rows hold their ids. Index is kept as
+    # it was read, e.g. '3/12', and its number is taken only for sorting
+    object_columns: tuple[str, ...] = ('path', 'title')
+    value_columns:  tuple[str, ...] = ('artist', 'album', 'index')
+    number_columns: tuple[str, ...] = ('length', 'offset')
+    string_columns: tuple[str, ...] = ('path', 'title', 'artist', 'album')
+
+    _index = re.compile(r'\d+')
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        # Id 0 is None; ids are counted, so values no longer used are
+        # dropped and their ids are reused, same as rows of removed tracks
+        self._values = [None]
+        self._ids = {None: 0}
+        self._refs = array('L', [0])
+        self._free_ids = []
+        self._columns = {name: [] for name in self.object_columns}
+        self._columns.update({name: array('I') for name in self.value_columns})
+        self._columns.update({name: array('d') for name in self.number_columns})
+        self._free_rows = []
+
+    def __len__(self) -> int:
+        return len(self._columns['path']) - len(self._free_rows)
+
+    def _value_id(self, value: Any) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            if self._free_ids:
+                value_id = self._free_ids.pop()
+                self._values[value_id] = value
+            else:
+                value_id = len(self._values)
+                self._values.append(value)
+                self._refs.append(0)
+            self._ids[value] = value_id
+        self._refs[value_id] += 1
+        return value_id
+
+    def _release(self, value_id: int) -> None:
+        if value_id == 0: return
+        self._refs[value_id] -= 1
+        if self._refs[value_id]: return
+        del self._ids[self._values[value_id]]
+        self._values[value_id] = None
+        self._free_ids.append(value_id)
+
+    def _row_values(self, track: Track) -> list[tuple[str, Any]]:
+        values = [(name, getattr(track, name)) for name in self.object_columns]
+        values += [(name, self._value_id(getattr(track, name))) for name in self.value_columns]
+        values += [(name, getattr(track, name) or 0) for name in self.number_columns]
+        return values
+
+    def append(self, track: Track) -> int:
+        '''Adds a row with track metadata and returns its number; rows of removed tracks are reused'''
+        columns = self._columns
+        if self._free_rows:
+            row = self._free_rows.pop()
+            for name, value in self._row_values(track):
+                columns[name][row] = value
+            return row
+        for name, value in self._row_values(track):
+            columns[name].append(value)
+        return len(columns['path']) - 1
+
+    def remove(self, row: int) -> None:
+        columns = self._columns
+        for name in self.object_columns:
+            columns[name][row] = None
+        for name in self.value_columns:
+            self._release(columns[name][row])
+            columns[name][row] = 0
+        for name in self.number_columns:
+            columns[name][row] = 0
+        self._free_rows.append(row)
+
+    def get(self, row: int, column: str) -> Any:
+        value = self._columns[column][row]
+        return self._values[value] if column in self.value_columns else value
+
+    def set(self, row: int, column: str, value: Any) -> None:
+        values = self._columns[column]
+        if column in self.value_columns:
+            old = values[row]
+            values[row] = self._value_id(value)
+            self._release(old)
+        elif column in self.number_columns:
+            values[row] = value or 0
+        else:
+            values[row] = value
+
+    def _index_value(self, index: Any) -> int:
+        # Index comes from tags, so it can be anything like '3/12'
+        if isinstance(index, int): return index
+        match = self._index.search(str(index)) if index else None
+        return int(match.group(0)) if match else 0
+
+    def _sort_values(self, column: str, rows: Sequence[int]) -> array:
+        if column not in self._columns:
+            raise RuntimeError('cannot sort by {}; possible keys: {}'.format(
+                column, ', '.join(self.string_columns + ('index',) + self.number_columns)))
+        column_values = self._columns[column]
+        if column in self.number_columns:
+            return array(column_values.typecode, map(column_values.__getitem__, rows))
+        # Each distinct value is ranked once, then rows are compared by
+        # ranks, which are plain integers
+        if column in self.value_columns:
+            keys = array('I', map(column_values.__getitem__, rows))
+            values = self._values.__getitem__
+        else:
+            keys = list(map(column_values.__getitem__, rows))
+            values = lambda value: value
+        sort_key = self._index_value if column == 'index' else lambda value: natural_sort_key(value or '')
+        ranks = {k: rank for rank, k in enumerate(sorted(set(keys), key=lambda k: sort_key(values(k))))}
+        return array('L', map(ranks.__getitem__, keys))
+
+    def sort(self, rows: Sequence[int], keys: Iterable[str]) -> list[int]:
+        '''Returns positions in rows ordered by given columns; first key is the most significant one'''
+        positions = list(range(len(rows)))
+        # Sort is stable, so sorting by each key, starting from the least
+        # significant one, gives order by all of them
+        for key in reversed(list(keys)):
+            positions.sort(key=self._sort_values(key, rows).__getitem__)
+        return positions
+
+    def filter(self, rows: Sequence[int], pattern: str) -> list[int]:
+        '''Returns positions in rows with title, artist, album or path containing pattern; case is ignored'''
+        pattern = pattern.casefold()
+        contains = lambda value: isinstance(value, str) and pattern in value.casefold()
+        matching_ids = set(compress(range(len(self._values)), map(contains, self._values)))
+        matching = array('b', bytes(len(rows)))
+        for name in self.string_columns:
+            column = self._columns[name]
+            test = matching_ids.__contains__ if name in self.value_columns else contains
+            for position in compress(range(len(rows)), map(test, map(column.__getitem__, rows))):
+                matching[position] = 1
+        return list(compress(range(len(rows)), matching))
+
+    def total_length(self, rows: Iterable[int] | None = None) -> float:
+        lengths = self._columns['length']
+        if rows is None: return sum(lengths)
+        return sum(map(lengths.__getitem__, rows))
@@ -1,47 +1,169 @@
 #!/usr/bin/env python3
 
-import fnmatch
+import logging
+import multiprocessing
 import os
-import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from playerlib.natural_sort import *
 from playerlib.track.readers.cdaudio_reader import *
 from playerlib.track.readers.cue_reader import *
 from playerlib.track.readers.file_reader import *
+from playerlib.track.metadata_cache import *
+from playerlib.track.readers_registry import *
+from playerlib.track.string_pool import *
 from playerlib.track.track import *
 
 class TracksReader:
 
-    def __init__(self):
+    def __init__(self, config=None):
+        self._cache = self._create_cache(config)
+        self._executor = self._create_executor(config)
+        self._max_depth = self._get_max_depth(config)
         self._cdaudio_reader = CdaudioReader()
-        self._cue_reader = CueReader()
-        self._file_reader = FileReader()
-        self._readers = [self._cdaudio_reader, self._cue_reader, self._file_reader]
-
-    def _predicate(self, f):
-        if f[0].isdigit():
-            a = re.search('[0-9]*.[0-9]+', f).group(0)
-            return a.zfill(9)
-        return f
-
-    def _handle_dir(self, path):
-        cue_files = fnmatch.filter([os.path.join(path, x) for x in os.listdir(path)], '*.cue')
-        if len(cue_files) == 0:
-            tracks = []
-            for f in sorted(os.listdir(path), key=self._predicate):
-                if not os.path.isfile(os.path.join(path, f)): continue
-                track = self._file_reader.read(os.path.join(path, f))
-                if track: tracks.append(track[0])
-            if len(tracks):
-                return tracks
-        tracks = []
+        self._cue_reader = CueReader(self._get_cue_encodings(config), self._cache)
+        self._file_reader = FileReader(self._cache, self._get_read_tags(config))
+        self._registry = ReadersRegistry()
+        for reader in (self._cdaudio_reader, self._cue_reader, self._file_reader):
+            self._registry.register(reader)
+        self._registry.load_entry_points()
+        self.logger = logging.getLogger('TracksReader')
+
+    def _create_cache(self, config):
+        try: path = config.metadata_cache.path
+        except: return None
+        return MetadataCache(path)
+
+    def _create_executor(self, config):
+        try: workers = config.tracks_reader.workers
+        except: return None
+        if workers <= 1: return None
+        try: processes = config.tracks_reader.processes
+        except: processes = False
+        if processes:
+            # Other threads are running by then, so forking could copy locks
+            # they hold; worker processes are started from scratch instead
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='TracksReader')
+
+    def _get_cue_encodings(self, config):
+        try: return config.tracks_reader.cue_encodings
+        except: return None
+
+    def _get_read_tags(self, config):
+        try: return config.tracks_reader.read_tags
+        except: return True
+
+    def _get_max_depth(self, config):
+        try: return config.tracks_reader.max_depth
+        except: return 16
+
+    def _handle_dir_files(self, files, placeholders):
+        files_by_reader = {}
+        for f in files:
+            reader = self._registry.find(f)
+            if reader: files_by_reader.setdefault(reader, []).append(f)
+        cue_files = files_by_reader.pop(self._cue_reader, [])
+        music_files = files_by_reader.pop(self._file_reader, [])
+        # Cue sheets go first, so music files they refer to are known and are
+        # not opened again; only the remaining ones are read
+        covered = set()
         for cue in cue_files:
-            tracks.extend(self._cue_reader.read(cue))
-        return tracks
+            for track in self._registry.timed(self._cue_reader, self._cue_reader.iter_read(cue)):
+                covered.add(os.path.normpath(track.path))
+                yield track
+        music_files = [f for f in music_files if os.path.normpath(f) not in covered]
+        if placeholders:
+            yield from map(self._file_reader.create_placeholder, music_files)
+        else:
+            yield from self._registry.timed(self._file_reader, self._file_reader.iter_many(music_files, self._executor))
+        for reader, paths in files_by_reader.items():
+            for path in paths:
+                yield from self._registry.timed(reader, reader.iter_read(path))
+
+    def _scan_dir(self, path, visited):
+        stat = os.stat(path)
+        if (stat.st_dev, stat.st_ino) in visited:
+            self.logger.warning('Skipping already visited dir (symlink loop?): {}'.format(path))
+            return None
+        visited.add((stat.st_dev, stat.st_ino))
+        with os.scandir(path) as it:
+            return sorted(it, key=lambda e: natural_sort_key(e.name))
+
+    def _iter_dir(self, path, depth, max_depth, visited, placeholders):
+        try:
+            entries = self._scan_dir(path, visited)
+        except OSError as e:
+            # Dir given by user is reported; subdirs which cannot be read
+            # are skipped, so the rest of them is still read
+            if depth == 0: raise
+            self.logger.warning('Skipping dir which cannot be read: {}: {}'.format(path, e))
+            return
+        if entries is None: return
+        # DirEntry.is_file/is_dir use d_type, so there's no stat per entry,
+        # except for symlinks
+        yield from self._handle_dir_files([e.path for e in entries if e.is_file()], placeholders)
+        if depth >= max_depth: return
+        for entry in entries:
+            if entry.is_dir():
+                yield from self._iter_dir(entry.path, depth + 1, max_depth, visited, placeholders)
+
+    def _read_file(self, path):
+        reader = self._registry.find(path)
+        if reader is None: return None
+        tracks = reader.iter_read(path)
+        return list(self._registry.timed(reader, tracks)) if tracks is not None else None
+
+    def _iter_file(self, path):
+        reader = self._registry.find(path)
+        if reader is None: return iter([])
+        return self._registry.timed(reader, reader.iter_read(path) or [])
+
+    def flush(self):
+        if self._cache:
+            self._cache.flush()
+
+    def _log_stats(self):
+        self.logger.info('Readers: {}'.format(self._registry.timings))
+        self.logger.info('String pool: {}'.format(string_pool.stats))
+        if self._cache:
+            self.flush()
+            self.logger.info('Metadata cache: {}'.format(self._cache.stats))
+
+    def iter_tracks(self, path, recursive=False, placeholders=False):
+        '''Yields tracks from path; with placeholders, music files in dirs are not opened and pending tracks are yielded'''
+        try:
+            if os.path.isdir(path):
+                yield from self._iter_dir(path, 0, self._max_depth if recursive else 0, set(), placeholders)
+            else:
+                yield from self._iter_file(path)
+        finally:
+            self._log_stats()
+
+    def read_metadata(self, path):
+        '''Reads tracks from file for which a placeholder was created'''
+        return self._read_file(path)
+
+    def iter_read_metadata(self, paths):
+        '''Yields tracks of each file for which a placeholder was created, in order of paths; music files are
+        read by workers, if there are any, and None is yielded for files which cannot be read'''
+        readers = [self._registry.find(p) for p in paths]
+        music_files = [p for p, reader in zip(paths, readers) if reader is self._file_reader]
+        read = self._registry.timed(self._file_reader, self._file_reader.iter_read_many(music_files, self._executor))
+        for path, reader in zip(paths, readers):
+            if reader is self._file_reader:
+                tracks = next(read)
+            else:
+                try: tracks = self._read_file(path)
+                except Exception: tracks = None
+            if tracks is None:
+                self.logger.warning('Cannot read {}'.format(path))
+            yield tracks
 
     def read(self, path):
         if os.path.isdir(path):
-            return self._handle_dir(path)
-        for reader in self._readers:
-            tracks = reader.read(path)
-            if tracks is not None: return tracks
-
+            return list(self.iter_tracks(path))
+        try:
+            return self._read_file(path)
+        finally:
+            self._log_stats()
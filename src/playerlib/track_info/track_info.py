@@ -3,7 +3,6 @@
 import logging
 import os
 import urwim
-from time import gmtime, strftime
 
 class TrackInfo(urwim.ViewWidget):
 
@@ -25,8 +24,7 @@ class TrackInfo(urwim.ViewWidget):
             urwim.Text('Album: {}'.format(track.album)),
             urwim.Text('Title: {}'.format(track.title)),
             urwim.Text('Index: {}'.format(track.index)),
-            urwim.Text('Length: {}'.format(
-                strftime('%M:%S', gmtime(track.length)))),
+            urwim.Text('Length: {}'.format(track.length_string)),
         ]
 
     def selectable(self):
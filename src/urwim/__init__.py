@@ -7,6 +7,7 @@ from .config import read_config
 from .footer import *
 from .header import *
 from .helpers import *
+from .list_item import *
 from .list_widget import *
 from .listbox_entry import *
 from .pdb import pdb, read_persistent_data
@@ -14,6 +15,7 @@ from .rdb import rdb, RdbObject
 from .tabs_container import *
 from .vertical_box import *
 from .view_widget import *
+from .virtual_list_walker import *
 
 # FIXME
 from urwid import Text, SimpleListWalker, ListBox
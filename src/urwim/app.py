@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import asyncio
+import contextlib
 import logging
 import signal
 import threading
@@ -117,3 +118,8 @@ def redraw():
     if app.exitting: return
     app.draw_screen()
 
+def draw_lock():
+    '''Lock held while screen is drawn; there's nothing to lock without an app'''
+    app = App._instance
+    if app is None: return contextlib.nullcontext()
+    return app.draw_lock
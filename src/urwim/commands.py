@@ -27,7 +27,9 @@ class Commands:
 
     def set(self, key: str, value: str) -> None:
         old_value = urwim.rdb[key]
-        if '+' in value:
+        if isinstance(old_value, str):
+            new_value = value
+        elif '+' in value:
             new_value = old_value + int(value[1:])
         elif '-' in value:
             new_value = old_value - int(value[1:])
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from .listbox_entry import *
+
+class ListItem:
+    '''Row of VirtualListWalker; unlike ListBoxEntry it's not a widget, widget is built when row is shown'''
+
+    __slots__ = ('_display', '_widget')
+
+    _display: tuple
+    _widget:  ListBoxEntry | None
+
+    def __init__(
+        self,
+        text: str,
+        unfocused: str | None = None,
+        focused: str | None = None
+    ) -> None:
+        self._widget = None
+        self.update(text, unfocused, focused)
+
+    @property
+    def text(self) -> str:
+        '''Has to be implemented by subclass; used for searching in ListBox'''
+        raise NotImplementedError('text property not implemented by item')
+
+    def update(
+        self,
+        text: str,
+        unfocused: str | None = None,
+        focused: str | None = None
+    ) -> None:
+        self._display = (text, unfocused, focused)
+        if self._widget is not None:
+            self._widget.update(text, unfocused, focused)
+
+    def selectable(self) -> bool:
+        return True
+
+    @property
+    def widget(self) -> ListBoxEntry:
+        if self._widget is None:
+            self._widget = ListBoxEntry(*self._display)
+        return self._widget
+
+    def drop_widget(self) -> None:
+        self._widget = None
@@ -1,32 +1,46 @@
 #!/usr/bin/env python3
 
 import urwid
-from typing import Any, Callable
+import urwim.app
+from typing import Any, Callable, Iterable
 
 from .clipboard import *
 from .helpers import *
 from .widget import *
 
-type Callback = Callable[[Any], None] | None
+type DeleteCallback = Callable[[Any, int], None] | None
+type PasteCallback = Callable[[Any, int], None] | None
 
 class ListWidget(urwid.ListBox, Widget):
 
     _readonly:  bool
-    _on_delete: Callback
-    _on_paste:  Callback
+    _on_delete: DeleteCallback
+    _on_paste:  PasteCallback
+    _size:      tuple[int, int] | None
 
     def __init__(
         self,
         content: Any,
         readonly: bool = False,
-        on_delete: Callback = None,
-        on_paste: Callback = None
+        on_delete: DeleteCallback = None,
+        on_paste: PasteCallback = None
     ) -> None:
         self._readonly = readonly
         self._on_delete = on_delete
         self._on_paste = on_paste
+        self._size = None
         super().__init__(content)
 
+    def render(self, size: tuple[int, int], focus: bool = False):
+        self._size = size
+        return super().render(size, focus)
+
+    def visible_range(self) -> range:
+        '''Positions of entries shown on last render; assumes each entry takes a single row'''
+        if self._size is None or len(self.body) == 0: return range(0)
+        start = max(self.focus_position - self.offset_rows, 0)
+        return range(start, min(start + self._size[1], len(self.body)))
+
     def _try_to_scroll(self, key: int) -> bool | None:
         try:
             if key == 5:
@@ -104,11 +118,18 @@ class ListWidget(urwid.ListBox, Widget):
         if self.readonly:
             raise RuntimeError('list is readonly')
 
+    def extend(self, entries: Iterable[Any]) -> None:
+        '''Appends entries with a single change of the list and redraws once'''
+        with urwim.app.draw_lock():
+            self.body.extend(entries)
+        urwim.app.redraw()
+
     def delete(self) -> None:
         self._writeable_check()
-        deleted = self.body[self.focus_position]
-        del self.body[self.focus_position]
-        if self._on_delete: self._on_delete(deleted)
+        position = self.focus_position
+        deleted = self.body[position]
+        del self.body[position]
+        if self._on_delete: self._on_delete(deleted, position)
         clipboard_set(deleted)
 
     def yank(self) -> None:
@@ -119,14 +140,16 @@ class ListWidget(urwid.ListBox, Widget):
     def paste_after(self) -> None:
         self._writeable_check()
         entry = clipboard_get()
-        self.body.insert(self.focus_position + 1 if self.focus_position else 0, entry)
-        if self._on_paste: self._on_paste(entry)
+        position = self.focus_position + 1 if self.focus_position else 0
+        self.body.insert(position, entry)
+        if self._on_paste: self._on_paste(entry, position)
 
     def paste_before(self) -> None:
         self._writeable_check()
         entry = clipboard_get()
-        self.body.insert(self.focus_position - 1 if self.focus_position else 0, entry)
-        if self._on_paste: self._on_paste(entry)
+        position = self.focus_position - 1 if self.focus_position else 0
+        self.body.insert(position, entry)
+        if self._on_paste: self._on_paste(entry, position)
 
     @property
     def searchable_list(self):
@@ -4,11 +4,12 @@ import logging
 
 class RdbObject:
 
-    def __init__(self, value, min_value=None, max_value=None, readonly=False):
+    def __init__(self, value, min_value=None, max_value=None, readonly=False, choices=None):
         self._value = value
         self._min = min_value
         self._max = max_value
         self._readonly = readonly
+        self._choices = choices
 
     @property
     def value(self):
@@ -21,6 +22,9 @@ class RdbObject:
             if value < self._min: raise RuntimeError('exceeded constraints')
         if self._max is not None:
             if value > self._max: raise RuntimeError('exceeded constraints')
+        if self._choices is not None:
+            if value not in self._choices:
+                raise RuntimeError('possible values: {}'.format(', '.join(map(str, self._choices))))
         self._value = value
 
 
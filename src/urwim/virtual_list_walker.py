@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import urwid
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from .list_item import *
+
+class VirtualListWalker(urwid.SimpleListWalker):
+    '''List of ListItems which builds row widgets only for rows being shown; at most cache_size of them are kept'''
+
+    cache_size: int = 512
+
+    _cached: OrderedDict[int, ListItem]
+
+    def __init__(self, contents: Iterable[ListItem], cache_size: int | None = None) -> None:
+        super().__init__(contents)
+        if cache_size: self.cache_size = cache_size
+        # Items with built widgets, least recently shown first
+        self._cached = OrderedDict()
+
+    def _widget(self, position: int) -> Any:
+        item = self[position]
+        key = id(item)
+        if key in self._cached:
+            self._cached.move_to_end(key)
+        else:
+            self._cached[key] = item
+            if len(self._cached) > self.cache_size:
+                self._cached.popitem(last=False)[1].drop_widget()
+        return item.widget
+
+    def _forget(self, items: Iterable[ListItem], kept: Iterable[ListItem] = ()) -> None:
+        # Removed items may be kept elsewhere, e.g. in the clipboard, so
+        # they don't keep widgets, and cache holds only items in the list
+        kept = set(map(id, kept))
+        for item in items:
+            if id(item) not in kept and self._cached.pop(id(item), None) is not None:
+                item.drop_widget()
+
+    def __delitem__(self, index: int | slice) -> None:
+        self._forget(self[index] if isinstance(index, slice) else [self[index]])
+        super().__delitem__(index)
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            self._forget(self[index], value)
+        else:
+            self._forget([self[index]], [value])
+        super().__setitem__(index, value)
+
+    def pop(self, index: int = -1) -> ListItem:
+        self._forget([self[index]])
+        return super().pop(index)
+
+    def remove(self, item: ListItem) -> None:
+        self._forget([item])
+        super().remove(item)
+
+    def clear(self) -> None:
+        for item in self._cached.values():
+            item.drop_widget()
+        self._cached.clear()
+        super().clear()
+
+    def get_focus(self):
+        try: return self._widget(self.focus), self.focus
+        except (IndexError, KeyError, TypeError): return None, None
+
+    def get_next(self, position: int):
+        try:
+            position = self.next_position(position)
+            return self._widget(position), position
+        except (IndexError, KeyError): return None, None
+
+    def get_prev(self, position: int):
+        try:
+            position = self.prev_position(position)
+            return self._widget(position), position
+        except (IndexError, KeyError): return None, None
+
+    @property
+    def focus_item(self) -> ListItem:
+        return self[self.focus]
+
+    @property
+    def cached(self) -> int:
+        return len(self._cached)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+import struct
+import tempfile
+import wave
+from unittest import TestCase
+from unittest.mock import patch
+from playerlib.track.readers.audio_headers import *
+from playerlib.track.readers.file_reader import FileReader
+
+def flac_data(sample_rate, total_samples, id3=False):
+    info = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = bytes(10) + struct.pack('>Q', info) + bytes(16)
+    data = b'fLaC' + bytes([0x80, 0, 0, 34]) + streaminfo
+    if id3: data = b'ID3\x04\x00\x00\x00\x00\x00\x0a' + bytes(10) + data
+    return data
+
+def ogg_page(granule, packet=b''):
+    return b'OggS' + bytes(2) + struct.pack('<q', granule) + bytes(12) + bytes([1, len(packet)]) + packet
+
+def vorbis_data(sample_rate, total_samples):
+    header = b'\x01vorbis' + struct.pack('<IBI', 0, 2, sample_rate) + bytes(16)
+    return ogg_page(0, header) + bytes(1000) + ogg_page(total_samples // 2) + bytes(1000) + ogg_page(total_samples) + bytes(100)
+
+def opus_data(pre_skip, total_samples):
+    header = b'OpusHead' + struct.pack('<BBHI', 1, 2, pre_skip, 44100) + bytes(3)
+    return ogg_page(0, header) + bytes(1000) + ogg_page(total_samples + pre_skip) + ogg_page(-1)
+
+def mp3_frame_header(bitrate_index=9, sample_rate_index=0):
+    # MPEG 1 Layer III, stereo; bitrate index 9 is 128kbps
+    return bytes([0xff, 0xfb, (bitrate_index << 4) | (sample_rate_index << 2), 0x00])
+
+def mp3_xing_data(frames, tag=b'Xing'):
+    frame = mp3_frame_header() + bytes(32) + tag + struct.pack('>II', 1, frames)
+    return b'ID3\x04\x00\x00\x00\x00\x00\x0a' + bytes(10) + frame + bytes(400)
+
+def mp3_vbri_data(frames):
+    frame = mp3_frame_header() + bytes(32) + b'VBRI' + struct.pack('>HHHII', 1, 0, 75, 0, frames)
+    return frame + bytes(400)
+
+def mp3_cbr_data(seconds):
+    return bytes(5) + mp3_frame_header() + bytes(128000 // 8 * seconds - 4) + b'TAG' + bytes(125)
+
+class AudioHeadersTests(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _create_file(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_can_read_flac_length(self):
+        self.assertEqual(flac_length(flac_data(44100, 44100 * 200)), 200)
+        self.assertEqual(flac_length(flac_data(96000, 96000 * 61 + 10, id3=True)), 61 + 10 / 96000)
+
+    def test_can_read_wav_length(self):
+        path = os.path.join(self.dir.name, 'file.wav')
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(bytes(8000 * 4 * 3))
+        self.assertEqual(read_length(path), 3)
+
+    def test_can_read_ogg_length(self):
+        self.assertEqual(ogg_length(vorbis_data(44100, 44100 * 90)), 90)
+        self.assertEqual(ogg_length(opus_data(312, 48000 * 30)), 30)
+
+    def test_can_read_mp3_length(self):
+        self.assertEqual(mp3_length(mp3_xing_data(1000)), 1000 * 1152 / 44100)
+        self.assertEqual(mp3_length(mp3_xing_data(1000, b'Info')), 1000 * 1152 / 44100)
+        self.assertEqual(mp3_length(mp3_vbri_data(2000)), 2000 * 1152 / 44100)
+        self.assertEqual(mp3_length(mp3_cbr_data(2)), 2)
+
+    def test_read_length_dispatches_by_extension(self):
+        self.assertEqual(read_length(self._create_file('a.FLAC', flac_data(44100, 44100 * 200))), 200)
+        self.assertEqual(read_length(self._create_file('a.opus', opus_data(0, 48000 * 10))), 10)
+        self.assertEqual(read_length(self._create_file('a.mp3', mp3_xing_data(1000))), 26)
+        self.assertEqual(read_length(self._create_file('a.m4a', bytes(100))), None)
+
+    def test_read_length_returns_none_for_malformed_files(self):
+        self.assertEqual(read_length(self._create_file('empty.flac', b'')), None)
+        self.assertEqual(read_length(self._create_file('bad.flac', b'fLaC' + bytes(5))), None)
+        self.assertEqual(read_length(self._create_file('bad.ogg', b'OggS' + bytes(100))), None)
+        self.assertEqual(read_length(self._create_file('bad.mp3', bytes(1000))), None)
+        self.assertEqual(read_length(self._create_file('bad.wav', b'RIFF' + bytes(4) + b'WAVE')), None)
+        self.assertEqual(read_length(os.path.join(self.dir.name, 'missing.mp3')), None)
+
+    def test_file_reader_falls_back_to_taglib(self):
+        flac = self._create_file('file.flac', flac_data(44100, 44100 * 200))
+        m4a = self._create_file('file.m4a', bytes(100))
+        sut = FileReader(read_tags=False)
+        with patch('taglib.File') as taglib_file_mock:
+            taglib_file_mock.return_value.length = 123
+            tracks = list(sut.iter_many([flac, m4a]))
+            taglib_file_mock.assert_called_once_with(m4a)
+        self.assertEqual([t.title for t in tracks], ['file.flac', 'file.m4a'])
+        self.assertEqual([t.length for t in tracks], [200, 123])
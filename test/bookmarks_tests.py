@@ -82,6 +82,19 @@ class BookmarksTests(TestCase):
             sut.handle_input('3')
             self.commands_mock.error.assert_called_once_with('no such bookmark: 3')
 
+    def test_can_cut_and_paste_bookmark(self):
+        with patch('os.path.exists') as exists_mock, \
+                patch('builtins.open') as open_mock, \
+                patch('json.dump') as json_dump_mock:
+            exists_mock.return_value = False
+            sut = self.Bookmarks(self.config_mock, self.commands_mock)
+            sut.add('/path1')
+            sut.add('/path2')
+            sut.listbox.delete()
+            json_dump_mock.assert_called_with(['/path2'], ANY)
+            sut.listbox.paste_after()
+            json_dump_mock.assert_called_with(['/path1', '/path2'], ANY)
+
     def test_should_not_add_same_bookmark_twice(self):
         # TODO
         pass
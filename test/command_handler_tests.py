@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 from unittest import TestCase
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from playerlib.context import *
 
@@ -15,8 +15,10 @@ class CommandHandlerTests(TestCase):
         self.app_instance.command_handler = self.command_handler_mock
         self.app_instance.command_panel = self.command_panel_mock
         self.app_instance.window = self.window_mock
+        self.app_instance.draw_lock = MagicMock()
         self.app_mock = Mock()
         self.app_mock.return_value = self.app_instance
+        self.app_mock._instance = self.app_instance
 
         patch('urwim.asynchronous', lambda x: x).start()
         patch('urwim.App', self.app_mock).start()
@@ -57,6 +59,34 @@ class CommandHandlerTests(TestCase):
         self.sut(':replace_playlist some_file')
         self.context.playlist.add_to_playlist.assert_called_once_with('some_file', clear_and_play=True)
 
+        self.context.playlist.add_to_playlist.reset_mock()
+        self.sut(':add_to_playlist_recursive some_dir')
+        self.context.playlist.add_to_playlist.assert_called_once_with('some_dir', recursive=True)
+
+        self.context.playlist.add_to_playlist.reset_mock()
+        self.sut(':replace_playlist_recursive some_dir')
+        self.context.playlist.add_to_playlist.assert_called_once_with('some_dir', clear_and_play=True, recursive=True)
+
+        self.sut(':sort_playlist')
+        self.context.playlist.sort.assert_called_once_with(['artist', 'album', 'index'])
+
+        self.context.playlist.sort.reset_mock()
+        self.sut(':sort_playlist album title')
+        self.context.playlist.sort.assert_called_once_with(['album', 'title'])
+
+        self.sut(':filter_playlist maiden')
+        self.context.playlist.filter.assert_called_once_with('maiden')
+
+        self.context.playlist.filter.reset_mock()
+        self.sut(':filter_playlist')
+        self.context.playlist.filter.assert_called_once_with('')
+
+        self.context.playlist.total_length.return_value = 3725
+        self.context.playlist.remaining_length.return_value = 65
+        self.sut(':playlist_length')
+        self.context.playlist.remaining_length.assert_called_once_with(self.context.playback_controller.current_track)
+        self.command_panel_mock.info.assert_called_once_with('Total: 01:02:05, remaining: 00:01:05')
+
 
     def test_can_execute_playback_controller_commands(self):
         self.sut(':pause')
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import Mock, MagicMock, patch, mock_open
 from cueparser.cueparser import *
@@ -11,9 +13,7 @@ class CueParserTests(TestCase):
 
     def test_can_parse_simple_album_data(self):
         lines = ['REM GENRE Heavy Metal', 'PERFORMER "Iron Maiden"', 'TITLE "The Number of the Beast"', 'FILE "album.flac" WAVE']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('some/path')
         self.assertEqual(cuesheet.title, 'The Number of the Beast')
@@ -23,9 +23,7 @@ class CueParserTests(TestCase):
     def test_can_parse_tracks(self):
         lines = ['FILE "album.flac" WAVE', '  TRACK 01 AUDIO', '    TITLE "Invaders"', '    PERFORMER "Iron Maiden"', '    INDEX 01 00:00:00',
                  '  TRACK 02 AUDIO', '    TITLE "Children of the Damned"', '    PERFORMER "Iron Maiden"', '    INDEX 01 03:23:00']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('path')
         self.assertEqual(len(cuesheet.tracks), 2)
@@ -45,18 +43,14 @@ class CueParserTests(TestCase):
     def test_should_ignore_track_tags_if_no_track_given(self):
         lines = ['    TITLE "Invaders"', '    PERFORMER "Iron Maiden"', '    INDEX 01 00:00:00',
                  '    TITLE "Children of the Damned"', '    PERFORMER "Iron Maiden"', '    INDEX 01 03:23:00']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('path')
         self.assertEqual(len(cuesheet.tracks), 0)
 
     def test_should_ignore_trailing_whitespaces(self):
         lines = ['REM GENRE Heavy Metal  ', 'PERFORMER "Iron Maiden"   ', 'TITLE "The Number of the Beast"  \t', 'FILE "album.flac" WAVE      ']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('path')
         self.assertEqual(cuesheet.title, 'The Number of the Beast')
@@ -67,9 +61,7 @@ class CueParserTests(TestCase):
         lines = ['  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
                  '  TRACK 02 AUDIO', '    INDEX 01 03:23:00',
                  '  TRACK 03 AUDIO', '    INDEX 01 05:24:00']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('path')
         self.assertEqual(len(cuesheet.tracks), 3)
@@ -84,9 +76,7 @@ class CueParserTests(TestCase):
         lines = ['FILE "file1.ape"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
                  '  TRACK 02 AUDIO', '    INDEX 01 03:23:00',
                  'FILE "file2.ape"', '  TRACK 03 AUDIO', '    INDEX 01 00:00:00']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('builtins.open', m):
             cuesheet = self.sut.parse('path')
         self.assertEqual(len(cuesheet.tracks), 3)
@@ -107,9 +97,7 @@ class CueParserTests(TestCase):
         lines = ['FILE "file1.ape"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
                  '  TRACK 02 AUDIO', '    INDEX 01 03:23:00',
                  'FILE "file2.ape"', '  TRACK 03 AUDIO', '    INDEX 01 00:00:00']
-        m = mock_open(read_data='\n'.join(lines))
-        m.return_value.__iter__ = lambda self: self
-        m.return_value.__next__ = lambda self: next(iter(self.readline, ''))
+        m = mock_open(read_data='\n'.join(lines).encode())
         with patch('taglib.File') as taglib_mock, patch('builtins.open', m):
             file1, file2 = Mock(), Mock()
             file1.length = 300
@@ -130,3 +118,159 @@ class CueParserTests(TestCase):
         self.assertEqual(track3.offset, 0)
         self.assertEqual(track3.length, 400)
 
+    def test_uses_given_length_reader_instead_of_taglib(self):
+        lines = ['FILE "file1.flac"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
+                 '  TRACK 02 AUDIO', '    INDEX 01 03:23:00']
+        length_reader = Mock(return_value=300)
+        sut = CueParser(length_reader=length_reader)
+        with patch('taglib.File') as taglib_mock:
+            cuesheet = sut.parse_string('\n'.join(lines), '/dir', use_taglib=True)
+            taglib_mock.assert_not_called()
+        length_reader.assert_called_once_with('/dir/file1.flac')
+        self.assertEqual([t.length for t in cuesheet.tracks], [203, 97])
+
+
+    def test_accepts_any_indentation(self):
+        lines = ['FILE "album.flac" WAVE', '\tTRACK 01 AUDIO', 'TITLE "Invaders"', '      INDEX   01   00:00:00',
+                 ' TRACK 02 AUDIO', '\t\tTITLE\t"Children of the Damned"', '\tINDEX 01 03:23:00']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        with patch('builtins.open', m):
+            cuesheet = self.sut.parse('path')
+        self.assertEqual(len(cuesheet.tracks), 2)
+        self.assertEqual(cuesheet.tracks[0].title, 'Invaders')
+        self.assertEqual(cuesheet.tracks[0].length, 203)
+        self.assertEqual(cuesheet.tracks[1].title, 'Children of the Damned')
+        self.assertEqual(cuesheet.tracks[1].offset, 203)
+
+    def test_can_parse_extended_commands(self):
+        lines = ['REM GENRE "Heavy Metal"', 'REM DATE 1982', 'REM COMMENT "ExactAudioCopy v1.0"', 'FILE "album.flac" WAVE',
+                 '  TRACK 01 AUDIO', '    FLAGS DCP PRE', '    ISRC GBAYE0000351', '    INDEX 01 00:00:00',
+                 '  TRACK 02 AUDIO', '    INDEX 00 03:21:00', '    INDEX 01 03:23:00']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        with patch('builtins.open', m):
+            cuesheet = self.sut.parse('path')
+        self.assertEqual(cuesheet.genre, 'Heavy Metal')
+        self.assertEqual(cuesheet.date, '1982')
+        self.assertEqual(len(cuesheet.rem), 3)
+        track1 = cuesheet.tracks[0]
+        track2 = cuesheet.tracks[1]
+        self.assertEqual(track1.flags, ['DCP', 'PRE'])
+        self.assertEqual(track1.isrc, 'GBAYE0000351')
+        self.assertEqual(track1.pregap, None)
+        self.assertEqual(track1.length, 203)
+        self.assertEqual(track2.pregap, 201)
+        self.assertEqual(track2.offset, 203)
+
+    def test_should_skip_malformed_lines(self):
+        lines = ['FILE "album.flac" WAVE', '  TRACK 01 AUDIO', '    INDEX 01 00:xx:00', '    INDEX 01',
+                 '  TRACK 02 AUDIO', '    INDEX 01 03:23:00']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        with patch('builtins.open', m):
+            cuesheet = self.sut.parse('path')
+        self.assertEqual(len(cuesheet.tracks), 2)
+        self.assertEqual(cuesheet.tracks[0].offset, 0)
+        self.assertEqual(cuesheet.tracks[1].offset, 203)
+
+    def test_decodes_utf8_file(self):
+        lines = ['PERFORMER "Mötley Crüe"', 'TITLE "Łódź"']
+        m = mock_open(read_data='\n'.join(lines).encode('utf-8'))
+        with patch('builtins.open', m):
+            cuesheet = self.sut.parse('path')
+        m.assert_called_once_with('path', 'rb')
+        self.assertEqual(cuesheet.performer, 'Mötley Crüe')
+        self.assertEqual(cuesheet.title, 'Łódź')
+        self.assertEqual(cuesheet.encoding, 'utf-8')
+
+    def test_decodes_file_with_bom(self):
+        for encoding, expected in (('utf-8-sig', 'utf-8-sig'), ('utf-16', 'utf-16')):
+            m = mock_open(read_data='TITLE "Łódź"\n'.encode(encoding))
+            with patch('builtins.open', m):
+                cuesheet = self.sut.parse('path')
+            self.assertEqual(cuesheet.title, 'Łódź')
+            self.assertEqual(cuesheet.encoding, expected)
+
+    def test_falls_back_to_legacy_encodings(self):
+        m = mock_open(read_data='TITLE "Łódź"\n'.encode('windows-1250'))
+        with patch('builtins.open', m):
+            cuesheet = self.sut.parse('path')
+        self.assertEqual(cuesheet.title, 'Łódź')
+        self.assertEqual(cuesheet.encoding, 'windows-1250')
+
+    def test_raises_if_file_cannot_be_decoded(self):
+        self.sut = CueParser(encodings=['ascii'])
+        m = mock_open(read_data='TITLE "Łódź"\n'.encode('windows-1250'))
+        with patch('builtins.open', m):
+            self.assertRaises(RuntimeError, self.sut.parse, 'path')
+
+    def test_does_not_hide_missing_file(self):
+        self.assertRaises(FileNotFoundError, self.sut.parse, '/nonexistent/path.cue')
+
+    def test_lengths_of_audio_files_are_cached_between_parses(self):
+        lines = ['FILE "file1.ape"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
+                 '  TRACK 02 AUDIO', '    INDEX 01 03:23:00']
+        with tempfile.TemporaryDirectory() as d:
+            open(os.path.join(d, 'file1.ape'), 'w').close()
+            with patch('taglib.File') as taglib_mock:
+                taglib_mock.return_value.length = 300
+                for i in range(3):
+                    m = mock_open(read_data='\n'.join(lines).encode())
+                    with patch('builtins.open', m):
+                        cuesheet = self.sut.parse(os.path.join(d, 'album.cue'), use_taglib=True)
+                    self.assertEqual(cuesheet.tracks[1].length, 97)
+                taglib_mock.assert_called_once()
+
+    def test_can_resolve_lengths_lazily(self):
+        lines = ['FILE "file1.ape"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
+                 '  TRACK 02 AUDIO', '    INDEX 01 03:23:00',
+                 'FILE "file2.ape"', '  TRACK 03 AUDIO', '    INDEX 01 00:00:00']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        with patch('taglib.File') as taglib_mock, patch('builtins.open', m):
+            file1, file2 = Mock(), Mock()
+            file1.length = 300
+            file2.length = 400
+            taglib_mock.side_effect = [file1, file2]
+            cuesheet = self.sut.parse('/path', use_taglib=True, lazy_lengths=True)
+            self.assertEqual(len(cuesheet.tracks), 3)
+            self.assertNotIn('_length', repr(cuesheet.tracks[1]))
+            self.assertNotIn('length', repr(cuesheet.tracks[1]))
+            taglib_mock.assert_not_called()
+            self.assertEqual(cuesheet.tracks[0].length, 203)
+            taglib_mock.assert_not_called()
+            self.assertEqual(cuesheet.tracks[1].length, 97)
+            self.assertIn("'length': 97", repr(cuesheet.tracks[1]))
+            self.assertEqual(cuesheet.tracks[2].length, 400)
+            self.assertEqual(cuesheet.tracks[2].length, 400)
+            self.assertEqual(taglib_mock.call_count, 2)
+
+    def test_iter_tracks_yields_track_as_soon_as_its_length_is_known(self):
+        lines = ['PERFORMER "Iron Maiden"', 'FILE "album.flac" WAVE', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
+                 '  TRACK 02 AUDIO', '    INDEX 01 03:23:00', '  TRACK 03 AUDIO', '    INDEX 01 05:24:00']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        cuesheet = CueParser.CueSheet()
+        with patch('builtins.open', m):
+            tracks = self.sut.iter_tracks('path', cuesheet=cuesheet)
+            track1 = next(tracks)
+            self.assertEqual(track1.index, 1)
+            self.assertEqual(track1.length, 203)
+            self.assertEqual(len(cuesheet.tracks), 1)
+            self.assertEqual(cuesheet.performer, 'Iron Maiden')
+            track2 = next(tracks)
+            self.assertEqual(track2.index, 2)
+            self.assertEqual(track2.length, 121)
+            track3 = next(tracks)
+            self.assertEqual(track3.index, 3)
+            self.assertRaises(StopIteration, next, tracks)
+        self.assertEqual(cuesheet.tracks, [track1, track2, track3])
+        self.assertEqual(cuesheet.encoding, 'utf-8')
+
+    def test_iter_tracks_yields_last_track_in_file_when_file_changes(self):
+        lines = ['FILE "file1.ape"', '  TRACK 01 AUDIO', '    INDEX 01 00:00:00',
+                 'FILE "file2.ape"', '  TRACK 02 AUDIO', '    INDEX 01 00:00:00', '  TRACK 03 AUDIO']
+        m = mock_open(read_data='\n'.join(lines).encode())
+        with patch('taglib.File') as taglib_mock, patch('builtins.open', m):
+            taglib_mock.return_value.length = 300
+            tracks = self.sut.iter_tracks('/path', use_taglib=True)
+            track1 = next(tracks)
+            self.assertEqual(track1.length, 300)
+            taglib_mock.assert_called_once_with('/file1.ape')
+            self.assertEqual([t.index for t in tracks], [2, 3])
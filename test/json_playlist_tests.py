@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import io
+from unittest import TestCase
+from playerlib.playlist.formats.json_playlist import *
+
+class JsonPlaylistTests(TestCase):
+
+    def setUp(self):
+        self.sut = JsonPlaylist()
+
+    def _create_track(self, title, index):
+        return Track({'path': '/music/{}.mp3'.format(title), 'title': title, 'index': index, 'length': 100.5})
+
+    def test_writes_a_track_per_line(self):
+        tracks = [self._create_track('Zażółć', 1), self._create_track('two', 2)]
+        f = io.StringIO()
+        self.sut.write(f, iter(tracks))
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Zażółć', lines[0])
+        self.assertEqual([Track(json.loads(l)).to_dict() for l in lines], [t.to_dict() for t in tracks])
+
+    def test_reads_tracks_written(self):
+        tracks = [self._create_track(str(i), i) for i in range(5)]
+        f = io.StringIO()
+        self.sut.write(f, tracks)
+        f.seek(0)
+        self.assertEqual([t.to_dict() for t in self.sut.iter_read(f)], [t.to_dict() for t in tracks])
+
+    def test_reads_tracks_one_by_one(self):
+        f = io.StringIO('{"title": "one"}\n\n{"title": "two"}\nnot json\n')
+        tracks = self.sut.iter_read(f)
+        self.assertEqual(next(tracks).title, 'one')
+        self.assertEqual(next(tracks).title, 'two')
+        with self.assertRaisesRegex(RuntimeError, 'line 4'):
+            next(tracks)
+
+    def test_reads_playlist_saved_as_json_list(self):
+        tracks = [self._create_track(str(i), i) for i in range(3)]
+        f = io.StringIO(json.dumps([t.to_dict() for t in tracks], indent=1))
+        self.assertEqual([t.to_dict() for t in self.sut.iter_read(f)], [t.to_dict() for t in tracks])
+
+    def test_reads_nothing_from_empty_file(self):
+        self.assertEqual(list(self.sut.iter_read(io.StringIO(''))), [])
+
+    def test_read_strings_are_shared(self):
+        f = io.StringIO('{"artist": "Artist", "title": "one"}\n{"artist": "Artist", "title": "two"}\n')
+        first, second = self.sut.iter_read(f)
+        self.assertIs(first.artist, second.artist)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from playerlib.track.metadata_cache import *
+from playerlib.track.readers.cue_reader import *
+from playerlib.track.readers.file_reader import *
+
+class MetadataCacheTests(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'cache.db')
+        self.sut = MetadataCache(self.path)
+        self.tags = {'title': 'title', 'artist': 'artist', 'album': 'album', 'index': '1', 'length': 120}
+
+    def tearDown(self):
+        self.sut.close()
+        self.dir.cleanup()
+
+    def test_returns_none_and_counts_miss_for_unknown_path(self):
+        self.assertEqual(self.sut.get('/some/file.mp3', 10, 20), None)
+        self.assertEqual(self.sut.stats, {'hits': 0, 'misses': 1, 'evicted': 0})
+
+    def test_returns_stored_tags_after_flush(self):
+        self.sut.put('/some/file.mp3', 10, 20, self.tags)
+        self.sut.flush()
+        self.assertEqual(self.sut.get('/some/file.mp3', 10, 20), self.tags)
+        self.assertEqual(self.sut.stats, {'hits': 1, 'misses': 0, 'evicted': 0})
+
+    def test_evicts_entry_if_size_or_mtime_changed(self):
+        self.sut.put('/some/file.mp3', 10, 20, self.tags)
+        self.sut.flush()
+        self.assertEqual(self.sut.get('/some/file.mp3', 11, 20), None)
+        self.assertEqual(self.sut.get('/some/file.mp3', 10, 20), None)
+        self.assertEqual(self.sut.stats, {'hits': 0, 'misses': 2, 'evicted': 1})
+
+    def test_entries_are_persistent(self):
+        self.sut.put('/some/file.mp3', 10, 20, self.tags)
+        self.sut.close()
+        self.sut = MetadataCache(self.path)
+        self.assertEqual(self.sut.get('/some/file.mp3', 10, 20), self.tags)
+
+    def _create_file(self, name, content=''):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_returns_stored_cuesheet_if_files_not_modified(self):
+        cue = self._create_file('album.cue')
+        audio = self._create_file('album.flac')
+        cuesheet = {'performer': 'Artist', 'title': 'Album', 'tracks': [[audio, 'Title', 1, 100, 0]]}
+        self.sut.put_cuesheet(cue, [audio], cuesheet)
+        self.sut.flush()
+        self.assertEqual(self.sut.get_cuesheet(cue), cuesheet)
+        self.assertEqual(self.sut.stats, {'hits': 1, 'misses': 0, 'evicted': 0})
+
+    def test_evicts_cuesheet_if_referenced_file_modified(self):
+        cue = self._create_file('album.cue')
+        audio = self._create_file('album.flac')
+        self.sut.put_cuesheet(cue, [audio], {'performer': None, 'title': None, 'tracks': []})
+        self.sut.flush()
+        os.utime(audio, ns=(0, 0))
+        self.assertEqual(self.sut.get_cuesheet(cue), None)
+        self.assertEqual(self.sut.get_cuesheet(cue), None)
+        self.assertEqual(self.sut.stats, {'hits': 0, 'misses': 2, 'evicted': 1})
+
+    def test_cue_reader_does_not_parse_cuesheet_on_cache_hit(self):
+        cue = self._create_file('album.cue', 'PERFORMER "Artist"\nTITLE "Album"\nFILE "album.flac" WAVE\n'
+            '  TRACK 01 AUDIO\n    TITLE "One"\n    INDEX 01 00:00:00\n'
+            '  TRACK 02 AUDIO\n    TITLE "Two"\n    INDEX 01 01:40:00\n')
+        audio = self._create_file('album.flac')
+        cue_reader = CueReader(cache=self.sut)
+        with patch('taglib.File') as taglib_file_mock:
+            taglib_file_mock.return_value.length = 300
+            first = cue_reader.read(cue)
+            self.sut.flush()
+            with patch.object(cue_reader._parser, 'parse') as parse_mock:
+                second = cue_reader.read(cue)
+                parse_mock.assert_not_called()
+        for tracks in (first, second):
+            self.assertEqual([t.path for t in tracks], [audio, audio])
+            self.assertEqual([t.title for t in tracks], ['One', 'Two'])
+            self.assertEqual([t.artist for t in tracks], ['Artist', 'Artist'])
+            self.assertEqual([t.album for t in tracks], ['Album', 'Album'])
+            self.assertEqual([t.index for t in tracks], ['1', '2'])
+            self.assertEqual([t.offset for t in tracks], [0, 100])
+            self.assertEqual([t.length for t in tracks], [100, 200])
+
+    def test_file_reader_does_not_call_taglib_on_cache_hit(self):
+        music_file = os.path.join(self.dir.name, 'file.mp3')
+        with open(music_file, 'w') as f:
+            f.write('data')
+        file_reader = FileReader(self.sut)
+        with patch('taglib.File') as taglib_file_mock:
+            taglib_file_mock.return_value.tags = {'TITLE': ['title']}
+            taglib_file_mock.return_value.length = 120
+            first = file_reader.read(music_file)
+            self.sut.flush()
+            second = file_reader.read(music_file)
+            taglib_file_mock.assert_called_once_with(music_file)
+        self.assertEqual(first[0].title, 'title')
+        self.assertEqual(second[0].title, 'title')
+        self.assertEqual(second[0].length, 120)
+        self.assertEqual(self.sut.stats, {'hits': 1, 'misses': 1, 'evicted': 0})
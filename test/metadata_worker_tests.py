@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from playerlib.playlist.metadata_worker import *
+
+class MetadataWorkerTests(TestCase):
+
+    def setUp(self):
+        self.read_mock = Mock()
+        self.update_mock = Mock()
+        self.visible_mock = Mock(return_value=[])
+        self.idle_mock = Mock()
+        self.redraw_mock = Mock()
+        self.sut = MetadataWorker(self.read_mock, self.update_mock, self.visible_mock, self.idle_mock, self.redraw_mock)
+
+    def _create_entries(self, nr_of_entries):
+        entries = []
+        for i in range(nr_of_entries):
+            entry = Mock()
+            entry.track.path = '/file{}.mp3'.format(i)
+            entries.append(entry)
+        return entries
+
+    def test_starts_single_thread_on_first_add(self):
+        with patch('threading.Thread') as thread_mock:
+            self.sut.add(self._create_entries(2))
+            self.sut.add(self._create_entries(2))
+            thread_mock.assert_called_once()
+            thread_mock.return_value.start.assert_called_once()
+        self.assertEqual(self.sut.pending, 4)
+
+    def test_reads_entries_in_order_of_adding(self):
+        entries = self._create_entries(3)
+        with patch('threading.Thread'):
+            self.sut.add(entries)
+        self.assertEqual(self.sut._wait_for_batch(), entries)
+        self.assertEqual(self.sut.pending, 0)
+
+    def test_visible_entries_are_read_first(self):
+        entries = self._create_entries(10)
+        self.visible_mock.return_value = [entries[7], entries[8]]
+        self.sut.batch_size = 4
+        with patch('threading.Thread'):
+            self.sut.add(entries)
+        self.assertEqual(self.sut._wait_for_batch(), [entries[7], entries[8], entries[0], entries[1]])
+        self.assertEqual(self.sut._wait_for_batch(), entries[2:6])
+        self.assertEqual(self.sut.pending, 2)
+
+    def test_passes_read_tracks_to_update_and_redraws_once(self):
+        entries = self._create_entries(2)
+        self.read_mock.return_value = iter([['track0'], ['track1']])
+        self.sut._process(entries)
+        self.read_mock.assert_called_once_with(['/file0.mp3', '/file1.mp3'])
+        self.assertEqual([c.args for c in self.update_mock.call_args_list], [(entries[0], ['track0']), (entries[1], ['track1'])])
+        self.redraw_mock.assert_called_once()
+
+    def test_passes_none_to_update_if_files_cannot_be_read(self):
+        entries = self._create_entries(2)
+        self.read_mock.side_effect = OSError('Could not read file')
+        self.sut._process(entries)
+        self.assertEqual([c.args for c in self.update_mock.call_args_list], [(entries[0], None), (entries[1], None)])
+
+    def test_can_be_cleared(self):
+        with patch('threading.Thread'):
+            self.sut.add(self._create_entries(3))
+        self.sut.clear()
+        self.assertEqual(self.sut.pending, 0)
+
+    def test_reads_placeholders_in_background(self):
+        entries = self._create_entries(3)
+        self.read_mock.side_effect = lambda paths: [[path] for path in paths]
+        done = threading.Event()
+        self.update_mock.side_effect = lambda entry, tracks: done.set() if entry is entries[-1] else None
+        self.sut.add(entries)
+        self.assertTrue(done.wait(5))
+        self.assertEqual([c.args for c in self.update_mock.call_args_list], [(e, [e.track.path]) for e in entries])
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+from unittest import TestCase
+from playerlib.natural_sort import *
+
+class NaturalSortTests(TestCase):
+
+    def test_orders_numbers_by_value(self):
+        names = ['Track 10.mp3', 'Track 2.mp3', 'Track 1.mp3']
+        self.assertEqual(sorted(names, key=natural_sort_key), ['Track 1.mp3', 'Track 2.mp3', 'Track 10.mp3'])
+
+    def test_handles_multiple_numbers_in_name(self):
+        names = ['CD2/Track 1', 'CD1/Track 10', 'CD10/Track 1', 'CD1/Track 9']
+        self.assertEqual(sorted(names, key=natural_sort_key), ['CD1/Track 9', 'CD1/Track 10', 'CD2/Track 1', 'CD10/Track 1'])
+
+    def test_names_starting_with_number_go_before_other_names(self):
+        names = ['some music.mp3', '3-02 - test.mp3', '1-intro.mp3', '03 - some_file.mp3', '3-01 - test.mp3', '2']
+        self.assertEqual(sorted(names, key=natural_sort_key),
+            ['1-intro.mp3', '2', '03 - some_file.mp3', '3-01 - test.mp3', '3-02 - test.mp3', 'some music.mp3'])
+
+    def test_ignores_case(self):
+        self.assertEqual(sorted(['b', 'A', 'a', 'B'], key=natural_sort_key), ['A', 'a', 'B', 'b'])
+
+    def test_is_total_for_names_differing_only_in_zero_padding(self):
+        self.assertEqual(sorted(['01', '1', '001'], key=natural_sort_key), ['001', '01', '1'])
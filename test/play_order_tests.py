@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import random
+from unittest import TestCase
+from playerlib.playlist.play_order import *
+
+class FakeEntry:
+
+    def __init__(self, name):
+        self.name = name
+        self.prev = None
+        self.next = None
+
+    def __repr__(self):
+        return self.name
+
+class PlayOrderTests(TestCase):
+
+    def setUp(self):
+        self.sut = PlayOrder(random.Random(42))
+        self.entries = []
+        self._add_entries(10)
+
+    def _add_entries(self, count):
+        new = [FakeEntry(str(len(self.entries) + i)) for i in range(count)]
+        for entry in new:
+            if self.entries:
+                entry.prev = self.entries[-1]
+                self.entries[-1].next = entry
+            self.entries.append(entry)
+        self.sut.entries = self.entries
+        self.sut.add(new)
+        return new
+
+    def _play_all(self, first):
+        played = [first]
+        self.sut.play(first)
+        while True:
+            entry = self.sut.next(played[-1])
+            if entry is None: return played
+            self.sut.play(entry)
+            played.append(entry)
+
+    def test_plays_in_playlist_order_by_default(self):
+        self.assertEqual(self._play_all(self.entries[0]), self.entries)
+
+    def test_repeat_all_goes_back_to_first_entry(self):
+        self.sut.repeat = 'all'
+        self.assertIs(self.sut.next(self.entries[-1]), self.entries[0])
+        self.assertIs(self.sut.prev(self.entries[0]), self.entries[-1])
+
+    def test_repeat_one_replays_only_finished_entry(self):
+        self.sut.repeat = 'one'
+        self.assertIs(self.sut.next(self.entries[3], finished=True), self.entries[3])
+        self.assertIs(self.sut.next(self.entries[3]), self.entries[4])
+
+    def test_shuffle_plays_each_entry_once(self):
+        self.sut.shuffle = True
+        played = self._play_all(self.entries[5])
+        self.assertEqual(played[0], self.entries[5])
+        self.assertEqual(sorted(played, key=self.entries.index), self.entries)
+        self.assertNotEqual(played, self.entries[5:] + self.entries[:5])
+
+    def test_shuffle_prev_goes_through_history(self):
+        self.sut.shuffle = True
+        played = self._play_all(self.entries[0])
+        for expected in reversed(played[:-1]):
+            entry = self.sut.prev(played[-1])
+            self.assertIs(entry, expected)
+            self.sut.play(entry)
+            played.pop()
+        self.assertIsNone(self.sut.prev(played[0]))
+
+    def test_shuffle_with_repeat_all_starts_new_order(self):
+        self.sut.shuffle = True
+        self.sut.repeat = 'all'
+        self.sut.play(self.entries[0])
+        played = [self.entries[0]]
+        for _ in range(25):
+            played.append(self.sut.next(played[-1]))
+            self.sut.play(played[-1])
+        self.assertTrue(all(a is not b for a, b in zip(played, played[1:])))
+        self.assertEqual(sorted(set(played), key=self.entries.index), self.entries)
+
+    def test_shuffle_plays_added_entries(self):
+        self.sut.shuffle = True
+        self.sut.play(self.entries[0])
+        for _ in range(4):
+            self.sut.play(self.sut.next(self.entries[0]))
+        new = self._add_entries(5)
+        played = self._play_all(self.sut._order[self.sut._current])
+        for entry in new:
+            self.assertIn(entry, played)
+        self.assertEqual(len(played), 11)
+
+    def test_shuffle_skips_removed_entries(self):
+        self.sut.shuffle = True
+        played = [self.entries[0]]
+        self.sut.play(played[0])
+        for _ in range(3):
+            played.append(self.sut.next(played[-1]))
+            self.sut.play(played[-1])
+        upcoming = self.sut.next(played[-1])
+        self.sut.remove(upcoming)
+        self.sut.remove(played[1])
+        self.assertIsNot(self.sut.next(played[-1]), upcoming)
+        self.assertIs(self.sut.prev(played[-1]), played[2])
+        self.sut.play(played[2])
+        self.assertIs(self.sut.prev(played[2]), played[0])
+
+    def test_history_is_kept_after_removing_current_entry(self):
+        self.sut.shuffle = True
+        played = [self.entries[0]]
+        self.sut.play(played[0])
+        for _ in range(7):
+            played.append(self.sut.next(played[-1]))
+            self.sut.play(played[-1])
+        unplayed = [e for e in self.entries if e not in played]
+        # Removing so many entries makes the history compacted
+        for entry in [played[-1]] + unplayed + played[1:5]:
+            self.sut.remove(entry)
+        self.assertIsNone(self.sut.next(played[-1]))
+        self.assertIs(self.sut.prev(played[-1]), played[6])
+        self.sut.play(played[6])
+        self.assertIs(self.sut.prev(played[6]), played[5])
+        self.sut.play(played[5])
+        self.assertIs(self.sut.prev(played[5]), played[0])
+
+    def test_history_before_current_entry_can_be_removed(self):
+        self.sut.shuffle = True
+        played = self._play_all(self.entries[0])
+        # Removing so many entries makes the history compacted
+        for entry in played[:7]:
+            self.sut.remove(entry)
+        self.assertIsNone(self.sut.next(played[-1]))
+        self.assertIs(self.sut.prev(played[-1]), played[-2])
+        self.sut.play(played[-2])
+        self.assertIs(self.sut.prev(played[-2]), played[-3])
+        self.sut.play(played[-3])
+        self.assertIsNone(self.sut.prev(played[-3]))
+
+    def test_played_entries_can_be_removed_without_shuffle(self):
+        played = self._play_all(self.entries[0])
+        for entry in played[:-1]:
+            self.sut.remove(entry)
+        self.assertEqual(self.sut._order, [played[-1]])
+        self.assertEqual(self.sut._current, 0)
+
+    def test_enabling_shuffle_keeps_current_entry(self):
+        self.sut.play(self.entries[3])
+        self.sut.shuffle = True
+        played = self._play_all(self.sut.next(self.entries[3]))
+        self.assertNotIn(self.entries[3], played)
+        self.assertEqual(len(played), 9)
+
+    def test_reset_keeps_current_entry_in_history(self):
+        self.sut.shuffle = True
+        self.sut.play(self.entries[3])
+        del self.entries[5:]
+        self.sut.reset()
+        played = self._play_all(self.sut.next(self.entries[3]))
+        self.assertEqual(sorted(played, key=self.entries.index), self.entries[:3] + self.entries[4:])
@@ -32,6 +32,13 @@ class PlaybackControllerTests(TestCase):
         self.backend = Mock()
         self.sut.backend = self.backend
 
+    def _create_track(self, title, offset, length, path='/path'):
+        from playerlib.track.track import Track
+        track = Track({'title': title, 'offset': offset, 'path': path})
+        track.set_length(length)
+        track.playlist_entry = Mock()
+        return track
+
     def test_play_will_raise_exception_when_no_track_given(self):
         self.assertRaises(RuntimeError, self.sut.play_track, None)
 
@@ -125,6 +132,18 @@ class PlaybackControllerTests(TestCase):
         self.sut.next()
         self.backend.play_track.assert_called_with(next_track)
 
+    def test_finished_track_is_played_again_with_repeat_one(self):
+        from urwim import rdb
+        track = Mock()
+        track.playlist_entry.track = track
+        self.sut.current_track = track
+        rdb['repeat'] = 'one'
+        self.sut._track_finished()
+        self.backend.play_track.assert_called_with(track)
+        self.sut.next()
+        self.backend.play_track.assert_called_with(track.playlist_entry.next.track)
+        rdb['repeat'] = 'off'
+
     def test_prev_will_stop_if_no_track_and_current_track_playing(self):
         track = Mock()
         track.playlist_entry = Mock()
@@ -153,12 +172,7 @@ class PlaybackControllerTests(TestCase):
 
 
     def test_can_update_current_track_time_position(self):
-        self.current_track_mock.offset = 0
-        self.current_track_mock.length = 20
-        self.current_track_mock.length_string = '00:20'
-        self.current_track_mock.time_format = '%M:%S'
-        self.current_track_mock.title = 'Some Title'
-        self.sut.current_track = self.current_track_mock
+        self.sut.current_track = self._create_track('Some Title', 0, 20)
 
         self.sut.update_current_state(1)
         self.command_panel_mock.set_caption.assert_called_once_with('Some Title : 00:01 / 00:20')
@@ -178,19 +192,8 @@ class PlaybackControllerTests(TestCase):
 
 
     def test_can_go_to_next_track(self):
-        self.current_track_mock.offset = 0
-        self.current_track_mock.length = 32
-        self.current_track_mock.title = 'Some Title'
-        self.current_track_mock.path = '/path'
-        self.current_track_mock.length_string = '00:32'
-        self.current_track_mock.time_format = '%M:%S'
-        next_track_mock = Mock()
-        next_track_mock.offset = 32
-        next_track_mock.length = 21
-        next_track_mock.title = 'Some Other Title'
-        next_track_mock.path = '/path'
-        next_track_mock.length_string = '00:21'
-        next_track_mock.time_format = '%M:%S'
+        self.current_track_mock = self._create_track('Some Title', 0, 32)
+        next_track_mock = self._create_track('Some Other Title', 32, 21)
         self.current_track_mock.playlist_entry.next.track = next_track_mock
         self.sut.current_track = self.current_track_mock
 
@@ -208,19 +211,8 @@ class PlaybackControllerTests(TestCase):
 
 
     def test_can_go_to_prev_track(self):
-        self.current_track_mock.offset = 21
-        self.current_track_mock.length = 32
-        self.current_track_mock.title = 'Some Title'
-        self.current_track_mock.path = '/path'
-        self.current_track_mock.length_string = '00:32'
-        self.current_track_mock.time_format = '%M:%S'
-        prev_track_mock = Mock()
-        prev_track_mock.offset = 0
-        prev_track_mock.length = 21
-        prev_track_mock.title = 'Some Other Title'
-        prev_track_mock.path = '/path'
-        prev_track_mock.length_string = '00:21'
-        prev_track_mock.time_format = '%M:%S'
+        self.current_track_mock = self._create_track('Some Title', 21, 32)
+        prev_track_mock = self._create_track('Some Other Title', 0, 21)
         self.current_track_mock.playlist_entry.prev.track = prev_track_mock
         self.sut.current_track = self.current_track_mock
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import io
+from unittest import TestCase
+from playerlib.playlist.formats.playlist_formats import *
+
+class PlaylistFormatsTests(TestCase):
+
+    def setUp(self):
+        self.sut = PlaylistFormats()
+
+    def _create_track(self, path, title='Title', artist='Artist', index='1', length=100.0, offset=0):
+        track = Track()
+        track.path = path
+        track.title = title
+        track.artist = artist
+        track.album = 'Album'
+        track.index = index
+        track.offset = offset
+        track.set_length(length)
+        return track
+
+    def _tracks(self):
+        return [
+            self._create_track('/music/a & b.mp3', title='Zażółć <1>'),
+            self._create_track('/music/c.flac', artist=None, index='2/12', length=3700),
+            self._create_track('/music/album.flac', index='1', length=50),
+            self._create_track('/music/album.flac', index='2', length=60, offset=50),
+            self._create_track('http://radio/stream', length=0),
+        ]
+
+    def _write(self, playlist_format, tracks):
+        f = io.StringIO()
+        playlist_format.write(f, tracks)
+        return f.getvalue()
+
+    def _roundtrip(self, extension):
+        playlist_format = self.sut.find('list' + extension)
+        text = self._write(playlist_format, self._tracks())
+        f = io.BytesIO(text.encode('utf-8')) if extension == '.xspf' else io.StringIO(text)
+        return list(playlist_format.iter_read(f, '/music'))
+
+    def _assert_tracks(self, tracks, with_album):
+        self.assertEqual([t.path for t in tracks],
+            ['/music/a & b.mp3', '/music/c.flac', '/music/album.flac', 'http://radio/stream'])
+        self.assertEqual([t.pending for t in tracks], [False, False, True, False])
+        self.assertEqual((tracks[0].title, tracks[0].artist, tracks[0].length), ('Zażółć <1>', 'Artist', 100))
+        self.assertEqual((tracks[1].title, tracks[1].artist, tracks[1].length_string), ('Title', None, '01:01:40'))
+        self.assertEqual(tracks[0].album, 'Album' if with_album else None)
+
+    def test_finds_format_by_extension(self):
+        self.assertIsInstance(self.sut.find('/dir/list.M3U8'), M3uPlaylist)
+        self.assertIsInstance(self.sut.find('list.m3u'), M3uPlaylist)
+        self.assertIsInstance(self.sut.find('list.pls'), PlsPlaylist)
+        self.assertIsInstance(self.sut.find('list.xspf'), XspfPlaylist)
+        self.assertIsInstance(self.sut.find('list.json'), JsonPlaylist)
+        self.assertIsInstance(self.sut.find('list'), JsonPlaylist)
+
+    def test_m3u_keeps_metadata_and_file_split_by_cue_sheet_is_read_again(self):
+        self._assert_tracks(self._roundtrip('.m3u8'), with_album=False)
+
+    def test_pls_keeps_metadata_and_file_split_by_cue_sheet_is_read_again(self):
+        self._assert_tracks(self._roundtrip('.pls'), with_album=False)
+
+    def test_xspf_keeps_metadata_and_file_split_by_cue_sheet_is_read_again(self):
+        tracks = self._roundtrip('.xspf')
+        self._assert_tracks(tracks, with_album=True)
+        self.assertEqual([t.index for t in tracks[:2]], ['1', None])
+
+    def test_placeholders_are_read_again(self):
+        tracks = [Track.placeholder('/music/a.mp3'), self._create_track('/music/b.mp3', index=0)]
+        for extension in ('.m3u8', '.pls', '.xspf'):
+            playlist_format = self.sut.find('list' + extension)
+            text = self._write(playlist_format, tracks)
+            f = io.BytesIO(text.encode('utf-8')) if extension == '.xspf' else io.StringIO(text)
+            read = list(playlist_format.iter_read(f, '/music'))
+            self.assertEqual([t.pending for t in read], [True, False], extension)
+            self.assertNotIn('trackNum', text)
+
+    def test_m3u_paths_are_resolved(self):
+        m3u = '\ufeff#EXTM3U\n#EXTINF:-1 tvg-id="x",Radio\nhttp://radio\n#EXTINF:5,Song\n../a.mp3\nfile:///b%20c.mp3\n'
+        tracks = list(M3uPlaylist().iter_read(io.StringIO(m3u), '/music/dir'))
+        self.assertEqual([t.path for t in tracks], ['http://radio', '/music/a.mp3', '/b c.mp3'])
+        self.assertEqual([t.pending for t in tracks], [True, False, True])
+        self.assertEqual((tracks[1].title, tracks[1].length), ('Song', 5))
+
+    def test_pls_entries_are_read_one_by_one(self):
+        pls = '[playlist]\nFile1=a.mp3\nTitle1=A - B\nLength1=10\nFile2=/b.mp3\nLength2=-1\nNumberOfEntries=2\n'
+        tracks = PlsPlaylist().iter_read(io.StringIO(pls), '/music')
+        first = next(tracks)
+        self.assertEqual((first.path, first.artist, first.title, first.length), ('/music/a.mp3', 'A', 'B', 10))
+        second = next(tracks)
+        self.assertEqual((second.path, second.pending), ('/b.mp3', True))
+        self.assertEqual(list(tracks), [])
+
+    def test_xspf_relative_locations_are_resolved(self):
+        xspf = ('<?xml version="1.0"?><playlist version="1" xmlns="http://xspf.org/ns/0/"><trackList>'
+            '<track><location>sub/a%20b.ogg</location><duration>1500</duration></track>'
+            '<track><title>No location</title></track>'
+            '</trackList></playlist>')
+        tracks = list(XspfPlaylist().iter_read(io.BytesIO(xspf.encode()), '/music'))
+        self.assertEqual([(t.path, t.title, t.length) for t in tracks], [('/music/sub/a b.ogg', 'a b.ogg', 1.5)])
+
+    def test_bad_xspf_raises_runtime_error(self):
+        with self.assertRaises(RuntimeError):
+            list(XspfPlaylist().iter_read(io.BytesIO(b'<playlist><trackList>'), '/music'))
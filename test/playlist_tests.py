@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 
+import copy
+import json
+import os
+import urwid
 from unittest import TestCase
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, call, mock_open, patch
 from playerlib.playlist.playlist import *
 
 class PlaylistTests(TestCase):
@@ -14,7 +18,7 @@ class PlaylistTests(TestCase):
         self.sut.tracks_reader = self.tracks_reader_mock
 
     def _create_track(self, title=None, artist=None, index=0, length=0):
-        track = Mock()
+        track = Track()
         track.title = title
         track.artist = artist
         track.index = index
@@ -42,34 +46,34 @@ class PlaylistTests(TestCase):
 
     def test_should_be_able_to_add_tracks_to_playlist(self):
         track = self._create_track()
-        self.tracks_reader_mock.read.return_value = [track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track])
         self.sut.add_to_playlist('some_path')
         self.assertEqual(len(self.sut.content), 1)
-        self.tracks_reader_mock.read.return_value = [track, track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track, track])
         self.sut.add_to_playlist('some_path')
         self.assertEqual(len(self.sut.content), 3)
 
     def test_should_properly_handle_track_without_title(self):
         track = self._create_track(title=None)
-        self.tracks_reader_mock.read.return_value = [track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track])
         self.sut.add_to_playlist('some_path')
         self.assertEqual(len(self.sut.content), 1)
         self.assertEqual(self.sut.content[0].line, 'some_path 00:00:00')
 
     def test_should_properly_handle_track_with_title(self):
         track = self._create_track(title='some title')
-        self.tracks_reader_mock.read.return_value = [track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track])
         self.sut.add_to_playlist('some_path')
         self.assertEqual(len(self.sut.content), 1)
         self.assertEqual(self.sut.content[0].line, '?. ? - some title 00:00:00')
 
     def test_should_raise_exception_if_no_tracks_from_tracks_reader(self):
-        self.tracks_reader_mock.read.return_value = []
+        self.tracks_reader_mock.iter_tracks.return_value = iter([])
         self.assertRaises(Exception, self.sut.add_to_playlist, 'some_path')
 
     def test_can_clear_playlist(self):
         track = self._create_track(title='some title')
-        self.tracks_reader_mock.read.return_value = [track, track, track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track, track, track])
         self.sut.add_to_playlist('some_path')
         self.sut.clear()
         self.assertEqual(len(self.sut.content), 0)
@@ -77,31 +81,286 @@ class PlaylistTests(TestCase):
 
     def test_can_replace_playlist(self):
         track = self._create_track(title='some title')
-        self.tracks_reader_mock.read.return_value = [track, track, track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track, track, track])
         self.sut.add_to_playlist('some_path')
         track2 = self._create_track(title='some other title')
-        self.tracks_reader_mock.read.return_value = [track2, track2]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track2, track2])
         self.sut.add_to_playlist('some_path', clear_and_play=True)
         self.assertEqual(len(self.sut.content), 2)
         self.assertEqual(self.sut.content[0].track, track2)
-        self.assertEqual(self.sut.content[1].track, track2)
+        self.assertEqual(self.sut.content[1].track.to_dict(), track2.to_dict())
         self.error_handler_mock.assert_not_called()
 
+    def test_replace_playlist_starts_playing_first_track_before_reading_next_ones(self):
+        track1 = self._create_track(title='title 1')
+        track2 = self._create_track(title='title 2')
+        def tracks():
+            yield track1
+            self.play_callback_mock.assert_called_once_with(track1)
+            yield track2
+        self.tracks_reader_mock.iter_tracks.return_value = tracks()
+        self.sut.add_to_playlist('some_path', clear_and_play=True)
+        self.assertEqual(len(self.sut.content), 2)
+        self.assertEqual(self.sut.content[0].next, self.sut.content[1])
+        self.assertEqual(self.sut.content[1].prev, self.sut.content[0])
+
+    def test_tracks_are_added_in_batches(self):
+        self.sut.batch_size = 4
+        self.sut.batch_interval = 3600
+        tracks = [self._create_track(title=str(i)) for i in range(10)]
+        self.tracks_reader_mock.iter_tracks.return_value = iter(tracks)
+        with patch.object(self.sut.content, 'extend', wraps=self.sut.content.extend) as extend_mock:
+            self.sut.add_to_playlist('some_path')
+            self.assertEqual([len(c.args[0]) for c in extend_mock.call_args_list], [1, 4, 4, 1])
+        self.assertEqual([e.track for e in self.sut.content], tracks)
+        for prev, next in zip(self.sut.content, self.sut.content[1:]):
+            self.assertEqual(prev.next, next)
+            self.assertEqual(next.prev, prev)
+
+    def test_tracks_are_added_with_single_list_change_and_redraw_under_draw_lock(self):
+        tracks = [self._create_track(title=str(i)) for i in range(10)]
+        modified_mock = Mock()
+        urwid.connect_signal(self.sut.content, 'modified', modified_mock)
+        lock_mock = MagicMock()
+        lock_mock.__enter__.side_effect = lambda: modified_mock.assert_not_called()
+        lock_mock.__exit__.side_effect = lambda *args: modified_mock.assert_called_once()
+        with patch('urwim.app.draw_lock', return_value=lock_mock), patch('urwim.app.redraw') as redraw_mock:
+            self.sut.add_tracks(tracks)
+        modified_mock.assert_called_once()
+        lock_mock.__exit__.assert_called_once()
+        redraw_mock.assert_called_once()
+        self.assertEqual([e.track for e in self.sut.content], tracks)
+        self._assert_linked()
+
+    def _create_placeholder(self, path):
+        track = Track()
+        track.path = path
+        track.title = os.path.basename(path)
+        track.pending = True
+        return track
+
+    def _create_read_track(self, title, offset=0, length=100):
+        track = Track()
+        track.title = title
+        track.artist = 'Artist'
+        track.index = '1'
+        track.offset = offset
+        track.length = length
+        track.length_string, track.time_format = '01:40', '%M:%S'
+        return track
+
+    def test_placeholders_are_passed_to_metadata_worker(self):
+        self.sut.lazy_metadata = True
+        tracks = [self._create_placeholder('/dir/a.mp3'), self._create_placeholder('/dir/b.mp3')]
+        self.tracks_reader_mock.iter_tracks.return_value = iter(tracks)
+        with patch.object(self.sut.metadata_worker, 'add') as add_mock:
+            self.sut.add_to_playlist('/dir')
+            self.assertEqual([e.track for c in add_mock.call_args_list for e in c.args[0]], tracks)
+        self.tracks_reader_mock.iter_tracks.assert_called_once_with('/dir', recursive=False, placeholders=True)
+        self.assertEqual([e.line for e in self.sut.content], ['a.mp3 --:--:--', 'b.mp3 --:--:--'])
+
+    def test_placeholder_is_filled_with_read_metadata(self):
+        placeholder = self._create_placeholder('/dir/a.mp3')
+        self.tracks_reader_mock.iter_tracks.return_value = iter([placeholder])
+        with patch.object(self.sut.metadata_worker, 'add'):
+            self.sut.add_to_playlist('/dir')
+        entry = self.sut.content[0]
+        lock_mock = MagicMock()
+        lock_mock.__enter__.side_effect = lambda: self.assertEqual(entry.line, 'a.mp3 --:--:--')
+        lock_mock.__exit__.side_effect = lambda *args: self.assertEqual(entry.line, '1. Artist - Title 00:01:40')
+        with patch('urwim.draw_lock', return_value=lock_mock):
+            self.sut._fill_placeholder(entry, [self._create_read_track('Title')])
+        lock_mock.__exit__.assert_called_once()
+        self.assertFalse(placeholder.pending)
+        self.assertEqual(placeholder.title, 'Title')
+        self.assertEqual(placeholder.length_string, '01:40')
+        self.assertEqual(entry.line, '1. Artist - Title 00:01:40')
+
+    def test_placeholder_of_file_with_embedded_cuesheet_is_split(self):
+        placeholders = [self._create_placeholder('/dir/a.flac'), self._create_placeholder('/dir/b.mp3')]
+        self.tracks_reader_mock.iter_tracks.return_value = iter(placeholders)
+        with patch.object(self.sut.metadata_worker, 'add'):
+            self.sut.add_to_playlist('/dir')
+        read = [self._create_read_track('One'), self._create_read_track('Two', 100, 50)]
+        self.sut._fill_placeholder(self.sut.content[0], read)
+        self.assertEqual([e.track.title for e in self.sut.content], ['One', 'Two', 'b.mp3'])
+        self.assertEqual([e.track.offset for e in self.sut.content], [0, 100, 0])
+        for prev, next in zip(self.sut.content, self.sut.content[1:]):
+            self.assertEqual(prev.next, next)
+            self.assertEqual(next.prev, prev)
+
+    def test_unreadable_placeholder_keeps_file_name_as_title(self):
+        placeholder = self._create_placeholder('/dir/a.mp3')
+        self.tracks_reader_mock.iter_tracks.return_value = iter([placeholder])
+        with patch.object(self.sut.metadata_worker, 'add'):
+            self.sut.add_to_playlist('/dir')
+        self.sut._fill_placeholder(self.sut.content[0], None)
+        self.assertFalse(placeholder.pending)
+        self.assertEqual(self.sut.content[0].line, '?. ? - a.mp3 00:00:00')
+
+    def _add_titled_tracks(self, titles):
+        tracks = []
+        for i, title in enumerate(titles):
+            track = self._create_read_track(title, length=10 * (i + 1))
+            track.path = '/{}.mp3'.format(title)
+            tracks.append(track)
+        self.tracks_reader_mock.iter_tracks.return_value = iter(tracks)
+        self.sut.add_to_playlist('some_path')
+        return tracks
+
+    def _assert_linked(self):
+        for prev, next in zip(self.sut.content, self.sut.content[1:]):
+            self.assertEqual(prev.next, next)
+            self.assertEqual(next.prev, prev)
+        self.assertEqual(self.sut.content[0].prev, None)
+        self.assertEqual(self.sut.content[-1].next, None)
+        self.assertEqual(list(self.sut.rows), [e.track.row for e in self.sut.content])
+        if self.sut._unfiltered is not None:
+            self.assertEqual(list(self.sut._unfiltered_rows), [e.track.row for e in self.sut._unfiltered])
+
+    def test_can_sort_playlist(self):
+        self._add_titled_tracks(['c', 'a', 'b'])
+        self.sut.sort(['title'])
+        self.assertEqual([e.track.title for e in self.sut.content], ['a', 'b', 'c'])
+        self._assert_linked()
+
+    def test_can_filter_playlist_and_show_all_tracks_again(self):
+        self._add_titled_tracks(['abc', 'bcd', 'cde'])
+        self.sut.filter('b')
+        self.assertEqual([e.track.title for e in self.sut.content], ['abc', 'bcd'])
+        self._assert_linked()
+        self._add_titled_tracks(['xyz'])
+        self.assertEqual(self.sut.total_length(), 40)
+        self.sut.filter('')
+        self.assertEqual([e.track.title for e in self.sut.content], ['abc', 'bcd', 'cde', 'xyz'])
+        self._assert_linked()
+
+    def test_delete_and_paste_keep_entries_linked(self):
+        self._add_titled_tracks(['a', 'b', 'c', 'd'])
+        self.sut.listbox.focus_position = 1
+        self.sut.listbox.delete()
+        self.assertEqual([e.track.title for e in self.sut.content], ['a', 'c', 'd'])
+        self._assert_linked()
+        self.sut.listbox.focus_position = 2
+        self.sut.listbox.paste_after()
+        self.assertEqual([e.track.title for e in self.sut.content], ['a', 'c', 'd', 'b'])
+        self._assert_linked()
+        self.sut.listbox.focus_position = 0
+        self.sut.listbox.delete()
+        self.sut.listbox.delete()
+        self.assertEqual([e.track.title for e in self.sut.content], ['d', 'b'])
+        self._assert_linked()
+
+    def test_shuffled_order_follows_playlist_changes(self):
+        self._add_titled_tracks(['a', 'b', 'c', 'd'])
+        self.sut.play_order.shuffle = True
+        self.sut.listbox.focus_position = 1
+        self.sut.listbox.delete()
+        self.sut.listbox.focus_position = 2
+        self.sut.listbox.paste_after()
+        self.sut.listbox.focus_position = 0
+        self.sut.listbox.delete()
+        order = [e for e in self.sut.play_order._order if e is not None]
+        self.assertCountEqual(order, list(self.sut.content))
+        self.sut.filter('c')
+        self.assertEqual(self.sut.play_order._order, list(self.sut.content))
+
+    def test_deleted_entries_free_their_rows(self):
+        self._add_titled_tracks(['a', 'b', 'c', 'd'])
+        self.sut.listbox.focus_position = 1
+        self.sut.listbox.delete()
+        deleted = self.sut.content[1]
+        self.sut.listbox.delete()
+        self.assertEqual(len(self.sut.table), 2)
+        self.assertEqual(self.sut.total_length(), 50)
+        self.assertIsNone(deleted.track.table)
+        self.assertEqual(deleted.track.title, 'c')
+        self.sut.listbox.paste_after()
+        self.assertEqual(len(self.sut.table), 3)
+        self.assertEqual(len(self.sut.table._columns['path']), 4)
+        self.assertEqual(self.sut.total_length(), 80)
+        self._assert_linked()
+
+    def test_copy_of_entry_does_not_contain_linked_entries(self):
+        self._add_titled_tracks(['a', 'b', 'c'])
+        entry = self.sut.content[1]
+        copied = copy.deepcopy(entry)
+        self.assertEqual((copied.prev, copied.next), (None, None))
+        self.assertEqual(copied.track.title, 'b')
+        self.assertIsNot(copied.track, entry.track)
+        self.assertEqual(copied.track.playlist_entry, copied)
+        self.assertEqual(entry.track.playlist_entry, entry)
+
+    def test_pasted_placeholder_is_passed_to_metadata_worker_again(self):
+        placeholders = [self._create_placeholder('/dir/a.mp3'), self._create_placeholder('/dir/b.mp3')]
+        self.tracks_reader_mock.iter_tracks.return_value = iter(placeholders)
+        with patch.object(self.sut.metadata_worker, 'add') as add_mock:
+            self.sut.add_to_playlist('/dir')
+            deleted = self.sut.content[0]
+            self.sut.listbox.delete()
+            self.sut.listbox.paste_after()
+            self.assertIs(add_mock.call_args.args[0][0], self.sut.content[0])
+        self.assertTrue(self.sut.content[0].track.pending)
+        # Deleted entry may be still read, but it's not in the playlist anymore
+        self.sut._fill_placeholder(deleted, [self._create_read_track('One'), self._create_read_track('Two', 100, 50)])
+        self.assertEqual([e.track.title for e in self.sut.content], ['a.mp3', 'b.mp3'])
+
+    def test_pasted_entry_is_put_in_filtered_out_tracks_too(self):
+        self._add_titled_tracks(['ab', 'b', 'c'])
+        self.sut.filter('b')
+        self.sut.listbox.focus_position = 0
+        self.sut.listbox.delete()
+        self.sut.listbox.paste_after()
+        self._assert_linked()
+        self.sut.filter('')
+        self.assertEqual([e.track.title for e in self.sut.content], ['ab', 'b', 'c'])
+        self._assert_linked()
+
+    def test_can_compute_remaining_length(self):
+        tracks = self._add_titled_tracks(['a', 'b', 'c'])
+        self.assertEqual(self.sut.total_length(), 60)
+        self.assertEqual(self.sut.remaining_length(tracks[1]), 50)
+        self.assertEqual(self.sut.remaining_length(None), 60)
+
     def test_can_save_playlist(self):
         track = self._create_track(title='some title')
-        self.tracks_reader_mock.read.return_value = [track]
+        self.tracks_reader_mock.iter_tracks.return_value = iter([track])
         self.sut.add_to_playlist('some_path')
-        track.to_dict.return_value = {'title:' 'some title'}
-        with patch('builtins.open') as open_mock, \
-                patch('json.dump') as json_dump_mock:
+        with patch('builtins.open', mock_open()) as open_mock:
             self.sut.save_playlist('some_filename')
-            args, kwargs = json_dump_mock.call_args
-            self.assertEqual(args[0], [{'title:' 'some title'}])
+            open_mock.assert_called_once_with('some_filename', 'w', encoding='utf-8', errors='surrogateescape')
+            written = ''.join(line for c in open_mock().writelines.call_args_list for line in c.args[0])
+            self.assertEqual(Track(json.loads(written)).to_dict(), track.to_dict())
+        self.assertEqual(self.sut.header.text, 'some_filename')
 
     def test_can_load_playlist(self):
-        with patch('builtins.open') as open_mock, \
-                patch('json.load') as json_load_mock:
-            json_load_mock.return_value = [{'title': 'some title'}]
+        with patch('builtins.open', mock_open(read_data='{"title": "some title"}\n{"title": "other title"}\n')):
+            self.sut.load_playlist('some_filename')
+            self.assertEqual(len(self.sut.content), 2)
+            self.assertEqual(self.sut.content[0].track.title, 'some title')
+            self.assertEqual(self.sut.content[1].track.title, 'other title')
+
+    def test_tracks_without_metadata_in_loaded_playlist_are_read(self):
+        m3u = '#EXTM3U\n#EXTINF:100,Artist - Title\n/dir/a.mp3\n/dir/b.mp3\n/dir/c.mp3\n'
+        self.tracks_reader_mock.read_metadata.side_effect = lambda path: \
+            [self._create_read_track('Read')] if path == '/dir/b.mp3' else None
+        with patch('builtins.open', mock_open(read_data=m3u)):
+            self.sut.load_playlist('/dir/list.m3u')
+        self.tracks_reader_mock.read_metadata.assert_has_calls([call('/dir/b.mp3'), call('/dir/c.mp3')])
+        self.assertEqual([e.line for e in self.sut.content], [
+            '?. Artist - Title 00:01:40', '1. Artist - Read 00:01:40', '?. ? - c.mp3 00:00:00'])
+        self._assert_linked()
+
+    def test_tracks_without_metadata_in_loaded_playlist_are_read_later_with_lazy_metadata(self):
+        self.sut.lazy_metadata = True
+        with patch('builtins.open', mock_open(read_data='/dir/a.mp3\n')), \
+                patch.object(self.sut.metadata_worker, 'add') as add_mock:
+            self.sut.load_playlist('/dir/list.m3u')
+        self.tracks_reader_mock.read_metadata.assert_not_called()
+        self.assertEqual([e.track.path for c in add_mock.call_args_list for e in c.args[0]], ['/dir/a.mp3'])
+
+    def test_can_load_playlist_saved_as_json_list(self):
+        with patch('builtins.open', mock_open(read_data='[{"title": "some title"}]')):
             self.sut.load_playlist('some_filename')
             self.assertEqual(len(self.sut.content), 1)
             self.assertEqual(self.sut.content[0].track.title, 'some title')
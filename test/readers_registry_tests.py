@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from playerlib.track.readers_registry import *
+
+class ReadersRegistryTests(TestCase):
+
+    def setUp(self):
+        self.sut = ReadersRegistry()
+
+    def _create_reader(self, schemes=[], extensions=[]):
+        reader = Mock()
+        reader.schemes = schemes
+        reader.extensions = extensions
+        return reader
+
+    def test_finds_reader_by_extension(self):
+        reader = self._create_reader(extensions=['.flac', '.mp3'])
+        self.sut.register(reader)
+        self.assertEqual(self.sut.find('/some/dir/file.flac'), reader)
+        self.assertEqual(self.sut.find('/some/dir/file.mp3'), reader)
+        self.assertEqual(self.sut.find('/some/dir/file.ogg'), None)
+        self.assertEqual(self.sut.find('/some/dir/file'), None)
+
+    def test_extensions_are_case_insensitive(self):
+        reader = self._create_reader(extensions=['.flac'])
+        self.sut.register(reader)
+        self.assertEqual(self.sut.find('/some/dir/FILE.FLAC'), reader)
+        self.assertEqual(self.sut.find('/some/dir/file.Flac'), reader)
+
+    def test_finds_reader_by_scheme(self):
+        reader = self._create_reader(schemes=['cdda'])
+        self.sut.register(reader)
+        self.assertEqual(self.sut.find('cdda://'), reader)
+        self.assertEqual(self.sut.find('http://some.host/file.flac'), None)
+
+    def test_can_load_readers_from_entry_points(self):
+        reader = self._create_reader(extensions=['.mod'])
+        entry_point = Mock()
+        entry_point.load.return_value.return_value = reader
+        broken_entry_point = Mock()
+        broken_entry_point.load.side_effect = ImportError('no module')
+        with patch('playerlib.track.readers_registry.entry_points') as entry_points_mock:
+            entry_points_mock.return_value = [broken_entry_point, entry_point]
+            self.sut.load_entry_points()
+            entry_points_mock.assert_called_once_with(group='player.tracks_readers')
+        self.assertEqual(self.sut.find('file.mod'), reader)
+
+    def test_measures_time_spent_in_reader(self):
+        reader = self._create_reader(extensions=['.flac'])
+        self.assertEqual(list(self.sut.timed(reader, [1, 2, 3])), [1, 2, 3])
+        self.assertEqual(list(self.sut.timed(reader, [4])), [4])
+        timing = self.sut.timings['Mock']
+        self.assertEqual(timing['calls'], 2)
+        self.assertEqual(timing['tracks'], 4)
+        self.assertGreaterEqual(timing['seconds'], 0)
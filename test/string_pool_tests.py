@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import sys
+from unittest import TestCase
+from playerlib.track.string_pool import *
+from playerlib.track.track import *
+
+class StringPoolTests(TestCase):
+
+    def setUp(self):
+        self.sut = StringPool()
+
+    def _string(self, value):
+        # Built at runtime, so it's not a constant shared by the compiler
+        return ''.join(list(value))
+
+    def test_returns_first_copy_of_equal_strings(self):
+        first, second = self._string('Iron Maiden'), self._string('Iron Maiden')
+        self.assertIsNot(first, second)
+        self.assertIs(self.sut.intern(first), first)
+        self.assertIs(self.sut.intern(second), first)
+
+    def test_reports_saved_bytes(self):
+        for _ in range(3):
+            self.sut.intern(self._string('/music/album.flac'))
+        self.assertEqual(self.sut.stats, {'strings': 1, 'hits': 2, 'saved_bytes': 2 * sys.getsizeof('/music/album.flac')})
+
+    def test_passes_other_values_through(self):
+        self.assertEqual(self.sut.intern(None), None)
+        self.assertEqual(self.sut.intern(12), 12)
+        self.assertEqual(self.sut.stats['strings'], 0)
+
+    def test_can_intern_track(self):
+        tracks = []
+        for title in ('One', 'Two'):
+            track = Track({'path': self._string('/album.flac'), 'artist': self._string('Artist'),
+                'album': self._string('Album'), 'title': self._string(title)})
+            tracks.append(self.sut.intern_track(track))
+        self.assertIs(tracks[0].path, tracks[1].path)
+        self.assertIs(tracks[0].artist, tracks[1].artist)
+        self.assertIs(tracks[0].album, tracks[1].album)
+        self.assertEqual(self.sut.stats['hits'], 3)
+
+    def test_can_be_cleared(self):
+        first = self.sut.intern(self._string('Artist'))
+        self.sut.clear()
+        self.assertIsNot(self.sut.intern(self._string('Artist')), first)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+from unittest import TestCase
+from playerlib.track.track_table import *
+
+class TrackTableTests(TestCase):
+
+    def setUp(self):
+        self.sut = TrackTable()
+
+    def _create_track(self, title, artist=None, album=None, index=0, length=0, path=None):
+        track = Track()
+        track.path = path or '/music/{}.mp3'.format(title)
+        track.title = title
+        track.artist = artist
+        track.album = album
+        track.index = index
+        track.length = length
+        return track
+
+    def _add_tracks(self):
+        return list(map(self.sut.append, [
+            self._create_track('Wrathchild', 'Iron Maiden', 'Killers', '2/10', 174),
+            self._create_track('Holy Diver', 'Dio', 'Holy Diver', '1', 354),
+            self._create_track('The Ides of March', 'Iron Maiden', 'Killers', '1/10', 106),
+            self._create_track('Aces High', 'Iron Maiden', 'Powerslave', 1, 271),
+            self._create_track('untitled', None, None, None, 10),
+        ]))
+
+    def test_returns_row_numbers(self):
+        self.assertEqual(self._add_tracks(), [0, 1, 2, 3, 4])
+        self.assertEqual(self.sut.append(self._create_track('x')), 5)
+        self.assertEqual(len(self.sut), 6)
+
+    def test_strings_are_stored_once(self):
+        self._add_tracks()
+        self.assertEqual(self.sut._values.count('Iron Maiden'), 1)
+        self.assertEqual(self.sut.get(0, 'artist'), 'Iron Maiden')
+        self.assertEqual(self.sut.get(4, 'artist'), None)
+        self.assertEqual(self.sut.get(0, 'index'), '2/10')
+        self.assertEqual(self.sut.get(3, 'index'), 1)
+
+    def test_can_sort_by_multiple_columns(self):
+        rows = self._add_tracks()
+        positions = self.sut.sort(rows, ['artist', 'album', 'index'])
+        self.assertEqual([self.sut.get(rows[p], 'title') for p in positions],
+            ['untitled', 'Holy Diver', 'The Ides of March', 'Wrathchild', 'Aces High'])
+
+    def test_sorts_given_rows_only(self):
+        rows = self._add_tracks()
+        self.assertEqual(self.sut.sort([3, 1, 0], ['length']), [2, 0, 1])
+
+    def test_raises_on_unknown_sort_key(self):
+        rows = self._add_tracks()
+        self.assertRaises(RuntimeError, self.sut.sort, rows, ['genre'])
+
+    def test_can_filter_ignoring_case(self):
+        rows = self._add_tracks()
+        self.assertEqual(self.sut.filter(rows, 'maiden'), [0, 2, 3])
+        self.assertEqual(self.sut.filter(rows, 'HOLY'), [1])
+        self.assertEqual(self.sut.filter([4, 3, 2], 'killers'), [2])
+        self.assertEqual(self.sut.filter(rows, 'nothing'), [])
+
+    def test_can_compute_total_length(self):
+        rows = self._add_tracks()
+        self.assertEqual(self.sut.total_length(), 915)
+        self.assertEqual(self.sut.total_length([0, 2]), 280)
+
+    def test_can_set_value(self):
+        self._add_tracks()
+        self.sut.set(4, 'title', 'Titled')
+        self.sut.set(4, 'length', 20)
+        self.sut.set(1, 'artist', 'Rainbow')
+        self.assertEqual(self.sut.get(4, 'title'), 'Titled')
+        self.assertEqual(self.sut.get(4, 'length'), 20)
+        self.assertEqual(self.sut.get(1, 'artist'), 'Rainbow')
+        self.assertNotIn('Dio', self.sut._values)
+
+    def test_removed_rows_and_values_are_reused(self):
+        rows = self._add_tracks()
+        self.sut.remove(1)
+        self.sut.remove(2)
+        self.assertEqual(len(self.sut), 3)
+        self.assertEqual(self.sut.total_length(), 455)
+        self.assertNotIn('Dio', self.sut._values)
+        self.assertIn('Killers', self.sut._values)
+        self.sut.remove(0)
+        self.assertNotIn('Killers', self.sut._values)
+        size = len(self.sut._values)
+        row = self.sut.append(self._create_track('Rainbow Eyes', 'Rainbow', 'Long Live Rock and Roll'))
+        self.assertIn(row, [0, 1, 2])
+        self.assertEqual(len(self.sut._columns['path']), 5)
+        self.assertEqual(len(self.sut._values), size)
+        self.assertEqual(self.sut.filter(rows, 'rainbow'), [row])
+
+    def test_attached_track_keeps_metadata_in_table(self):
+        track = self._create_track('Wrathchild', 'Iron Maiden', 'Killers', '2/10', 174)
+        track.attach(self.sut)
+        self.assertEqual(track.table, self.sut)
+        self.assertEqual(self.sut.get(track.row, 'title'), 'Wrathchild')
+        track.title = 'Killers'
+        self.assertEqual(self.sut.get(track.row, 'title'), 'Killers')
+        self.assertEqual(track.line, '2/10. Iron Maiden - Killers 00:02:54')
+        track.detach()
+        self.assertEqual(len(self.sut), 0)
+        self.assertEqual((track.title, track.album, track.index, track.length), ('Killers', 'Killers', '2/10', 174))
+
+    def test_can_be_cleared(self):
+        self._add_tracks()
+        self.sut.clear()
+        self.assertEqual(len(self.sut), 0)
+        self.assertEqual(self.sut.total_length(), 0)
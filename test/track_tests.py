@@ -90,3 +90,62 @@ class TrackTests(TestCase):
         track.playlist_entry.set_stopped.assert_called_once()
         track.playlist_entry.set_paused.assert_not_called()
 
+
+    def test_has_no_dict(self):
+        track = Track()
+        self.assertFalse(hasattr(track, '__dict__'))
+        with self.assertRaises(AttributeError):
+            track.some_attribute = 1
+
+    def test_dict_contains_only_saved_fields(self):
+        track = Track()
+        track.playlist_entry = Mock()
+        self.assertEqual(list(track.to_dict().keys()), list(Track.fields))
+
+    def test_created_from_dict_has_defaults_for_missing_keys_and_ignores_unknown_ones(self):
+        track = Track({'path': 'some_path', 'unknown': 1})
+        self.assertEqual(track.path, 'some_path')
+        self.assertEqual(track.offset, 0)
+        self.assertEqual(track.title, None)
+        self.assertEqual(track.pending, False)
+        self.assertEqual(track.length_string, '00:00')
+        self.assertEqual(track.state, Track.State.STOPPED)
+        self.assertEqual(track.to_dict(), Track(track.to_dict()).to_dict())
+
+    def test_set_length_sets_length_string_and_time_format(self):
+        track = Track()
+        track.set_length(100.5)
+        self.assertEqual((track.length, track.length_string, track.time_format), (100.5, '01:40', '%M:%S'))
+        track.set_length(3700)
+        self.assertEqual((track.length_string, track.time_format), ('01:01:40', '%H:%M:%S'))
+
+    def test_line_is_formatted_once_and_kept_until_displayed_field_changes(self):
+        track = Track({'path': '/dir/file.mp3', 'title': 'Title', 'artist': 'Artist', 'index': '2', 'length': 100})
+        self.assertEqual(track.line, '2. Artist - Title 00:01:40')
+        self.assertIs(track.line, track.line)
+        track.album = 'Album'
+        self.assertEqual(track.line, '2. Artist - Title 00:01:40')
+        track.title = 'Other Title'
+        self.assertEqual(track.line, '2. Artist - Other Title 00:01:40')
+        track.update(artist='Other Artist')
+        self.assertEqual(track.line, '2. Other Artist - Other Title 00:01:40')
+        track.set_length(200)
+        self.assertEqual(track.line, '2. Other Artist - Other Title 00:03:20')
+
+    def test_line_of_track_without_title_or_pending_contains_file_name(self):
+        track = Track({'path': '/dir/file.mp3', 'pending': True})
+        self.assertEqual(track.line, 'file.mp3 --:--:--')
+        read = Track({'path': '/dir/file.mp3', 'length': 5})
+        track.update(read)
+        self.assertFalse(track.pending)
+        self.assertEqual(track.line, 'file.mp3 00:00:05')
+
+    def test_elapsed_string_uses_time_format_and_offset(self):
+        track = Track({'offset': 10, 'time_format': '%H:%M:%S'})
+        self.assertEqual(track.elapsed_string(75.9), '00:01:05')
+
+    def test_format_time_caches_results(self):
+        format_time.cache_clear()
+        format_time(61, '%M:%S')
+        self.assertEqual(format_time(61, '%M:%S'), '01:01')
+        self.assertEqual(format_time.cache_info().hits, 1)
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import Mock, MagicMock, patch
 from playerlib.track.tracks_reader import *
@@ -8,6 +10,17 @@ class TracksReaderTests(TestCase):
 
     def setUp(self):
         self.sut = TracksReader()
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _create_files(self, names):
+        for name in names:
+            path = os.path.join(self.dir.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+        return self.dir.name
 
     def _prepare_tagfile(self, taglib_file_mock, nr_of_tracks):
         tracks = []
@@ -39,6 +52,13 @@ class TracksReaderTests(TestCase):
             self.assertEqual(tracks[0].index, '1')
             self.assertEqual(tracks[0].length, 22)
 
+    def test_can_handle_music_file_with_uppercase_extension(self):
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, 1)
+            tracks = self.sut.read('SOME_FILE.FLAC')
+            self.assertEqual(len(tracks), 1)
+            self.assertEqual(tracks[0].path, 'SOME_FILE.FLAC')
+
     def test_can_handle_music_file_with_partial_tags(self):
         with patch('os.path.isfile') as isfile_mock, patch('taglib.File') as taglib_file_mock:
             isfile_mock.return_value = True
@@ -67,52 +87,182 @@ class TracksReaderTests(TestCase):
             self.assertEqual(tracks[0].index, 0)
             self.assertEqual(tracks[0].length, 22)
 
+    def test_can_handle_music_file_with_embedded_cuesheet(self):
+        with patch('taglib.File') as taglib_file_mock:
+            track_tags = Mock()
+            track_tags.tags = {'ARTIST': ['Iron Maiden'], 'ALBUM': ['Killers'], 'CUESHEET': [
+                'FILE "CDImage.wav" WAVE\n  TRACK 01 AUDIO\n    TITLE "The Ides of March"\n    INDEX 01 00:00:00\n'
+                '  TRACK 02 AUDIO\n    TITLE "Wrathchild"\n    INDEX 01 01:46:00\n']}
+            track_tags.length = 300
+            taglib_file_mock.return_value = track_tags
+            tracks = self.sut.read('some_file.flac')
+            taglib_file_mock.assert_called_once_with('some_file.flac')
+        self.assertEqual(len(tracks), 2)
+        self.assertEqual([t.path for t in tracks], ['some_file.flac', 'some_file.flac'])
+        self.assertEqual([t.title for t in tracks], ['The Ides of March', 'Wrathchild'])
+        self.assertEqual([t.artist for t in tracks], ['Iron Maiden', 'Iron Maiden'])
+        self.assertEqual([t.album for t in tracks], ['Killers', 'Killers'])
+        self.assertEqual([t.index for t in tracks], ['1', '2'])
+        self.assertEqual([t.offset for t in tracks], [0, 106])
+        self.assertEqual([t.length for t in tracks], [106, 194])
+
     def test_can_handle_dir_with_music_files(self):
-        with patch('os.path.isfile') as isfile_mock, \
-                patch('os.path.isdir') as isdir_mock, \
-                patch('os.listdir') as listdir_mock, \
-                patch('taglib.File') as taglib_file_mock:
-            isdir_mock.return_value = True
-            isfile_mock.side_effect = [True, True]
+        path = self._create_files(['some_file.mp3', 'some_other_file.mp3'])
+        with patch('taglib.File') as taglib_file_mock:
             self._prepare_tagfile(taglib_file_mock, 4)
-            listdir_mock.return_value = ['some_file.mp3', 'some_other_file.mp3']
-            tracks = self.sut.read('some_dir')
+            tracks = self.sut.read(path)
             self.assertEqual(len(tracks), 2)
-            self.assertEqual(tracks[0].path, 'some_dir/some_file.mp3')
-            self.assertEqual(tracks[1].path, 'some_dir/some_other_file.mp3')
+            self.assertEqual(tracks[0].path, os.path.join(path, 'some_file.mp3'))
+            self.assertEqual(tracks[1].path, os.path.join(path, 'some_other_file.mp3'))
 
     def test_tracks_have_proper_order(self):
-        with patch('os.path.isfile') as isfile_mock, \
-                patch('os.path.isdir') as isdir_mock, \
-                patch('os.listdir') as listdir_mock, \
-                patch('taglib.File') as taglib_file_mock:
-            isdir_mock.return_value = True
-            isfile_mock.side_effect = [True, True, True, True, True, True]
+        path = self._create_files(['03 - some_file.mp3', '2 - some_other_file.mp3', '1 - some_file.mp3', 'some music.mp3', '3-01 - test.mp3', '3-02 - test.mp3'])
+        with patch('taglib.File') as taglib_file_mock:
             self._prepare_tagfile(taglib_file_mock, 6)
-            listdir_mock.return_value = ['03 - some_file.mp3', '2 - some_other_file.mp3', '1 - some_file.mp3', 'some music.mp3', '3-01 - test.mp3', '3-02 - test.mp3']
-            tracks = self.sut.read('some_dir')
+            tracks = self.sut.read(path)
             self.assertEqual(len(tracks), 6)
-            self.assertEqual(tracks[0].path, 'some_dir/1 - some_file.mp3')
-            self.assertEqual(tracks[1].path, 'some_dir/2 - some_other_file.mp3')
-            self.assertEqual(tracks[2].path, 'some_dir/03 - some_file.mp3')
-            self.assertEqual(tracks[3].path, 'some_dir/3-01 - test.mp3')
-            self.assertEqual(tracks[4].path, 'some_dir/3-02 - test.mp3')
-            self.assertEqual(tracks[5].path, 'some_dir/some music.mp3')
+            self.assertEqual(tracks[0].path, os.path.join(path, '1 - some_file.mp3'))
+            self.assertEqual(tracks[1].path, os.path.join(path, '2 - some_other_file.mp3'))
+            self.assertEqual(tracks[2].path, os.path.join(path, '03 - some_file.mp3'))
+            self.assertEqual(tracks[3].path, os.path.join(path, '3-01 - test.mp3'))
+            self.assertEqual(tracks[4].path, os.path.join(path, '3-02 - test.mp3'))
+            self.assertEqual(tracks[5].path, os.path.join(path, 'some music.mp3'))
+
+    def test_tracks_read_in_parallel_have_proper_order(self):
+        config = Mock()
+        config.metadata_cache = None
+        config.tracks_reader.workers = 4
+        config.tracks_reader.processes = False
+        self.sut = TracksReader(config)
+        names = ['track{:02}.mp3'.format(i) for i in range(1, 33)]
+        path = self._create_files(reversed(names))
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, len(names))
+            tracks = self.sut.read(path)
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, n) for n in names])
+
+    def test_placeholders_are_read_in_spawned_processes(self):
+        config = Mock()
+        config.metadata_cache = None
+        config.tracks_reader.workers = 2
+        config.tracks_reader.processes = True
+        config.tracks_reader.read_tags = False
+        self.sut = TracksReader(config)
+        self.assertEqual(self.sut._executor._mp_context.get_start_method(), 'spawn')
+        names = ['track{:02}.wav'.format(i) for i in range(1, 5)]
+        paths = [os.path.join(self._create_files(names), n) for n in names]
+        read = list(self.sut.iter_read_metadata(paths))
+        self.sut._executor.shutdown()
+        self.assertEqual([tracks[0].path if tracks else None for tracks in read], paths)
 
     def test_can_handle_dir_with_empty_cue_sheet(self):
-        with patch('os.path.isdir') as isdir_mock, \
-                patch('os.listdir') as listdir_mock, \
-                patch('playerlib.track.tracks_reader.CueReader') as cueparser_class_mock, \
-                patch('builtins.open') as open_mock:
-            isdir_mock.return_value = True
-            listdir_mock.return_value = ['some_sheet.cue']
-            cuesheet_mock = Mock()
-            cuesheet_mock.tracks = []
-            cuereader_mock = Mock()
-            cuereader_mock.parse.return_value = cuesheet_mock
-            cueparser_class_mock.return_value = cuereader_mock
-            tracks = self.sut.read('some_dir')
-            self.assertEqual(len(tracks), 0)
+        path = self._create_files(['some_sheet.cue'])
+        tracks = self.sut.read(path)
+        self.assertEqual(len(tracks), 0)
+
+    def test_does_not_read_tags_of_files_covered_by_cue_sheet(self):
+        path = self._create_files(['album.flac', 'bonus.mp3'])
+        with open(os.path.join(path, 'album.cue'), 'w') as f:
+            f.write('FILE "album.flac" WAVE\n  TRACK 01 AUDIO\n    INDEX 01 00:00:00\n'
+                '  TRACK 02 AUDIO\n    INDEX 01 01:40:00\n')
+        with patch('taglib.File') as taglib_file_mock:
+            taglib_file_mock.return_value.tags = {}
+            taglib_file_mock.return_value.length = 300
+            tracks = self.sut.read(path)
+            self.assertEqual([c.args[0] for c in taglib_file_mock.call_args_list],
+                [os.path.join(path, 'album.flac'), os.path.join(path, 'bonus.mp3')])
+        self.assertEqual([t.path for t in tracks], [os.path.join(path, p) for p in ['album.flac', 'album.flac', 'bonus.mp3']])
+        self.assertEqual([t.length for t in tracks], [100, 200, 300])
+
+    def test_cue_sheet_file_is_found_by_its_stem_if_missing(self):
+        path = self._create_files(['album.flac'])
+        with open(os.path.join(path, 'album.cue'), 'w') as f:
+            f.write('FILE "album.wav" WAVE\n  TRACK 01 AUDIO\n    INDEX 01 00:00:00\n'
+                '  TRACK 02 AUDIO\n    INDEX 01 01:40:00\n')
+        with patch('taglib.File') as taglib_file_mock:
+            taglib_file_mock.return_value.tags = {}
+            taglib_file_mock.return_value.length = 300
+            tracks = self.sut.read(path)
+            self.assertEqual([c.args[0] for c in taglib_file_mock.call_args_list], [os.path.join(path, 'album.flac')])
+        self.assertEqual([t.path for t in tracks], [os.path.join(path, 'album.flac')] * 2)
+        self.assertEqual([t.length for t in tracks], [100, 200])
+
+    def test_yields_placeholders_without_reading_files(self):
+        path = self._create_files(['b.mp3', 'a.flac', 'cover.jpg'])
+        with patch('taglib.File') as taglib_file_mock:
+            tracks = list(self.sut.iter_tracks(path, placeholders=True))
+            taglib_file_mock.assert_not_called()
+            self._prepare_tagfile(taglib_file_mock, 1)
+            read = self.sut.read_metadata(tracks[0].path)
+        self.assertEqual([t.path for t in tracks], [os.path.join(path, p) for p in ['a.flac', 'b.mp3']])
+        self.assertEqual([t.title for t in tracks], ['a.flac', 'b.mp3'])
+        self.assertEqual([t.pending for t in tracks], [True, True])
+        self.assertEqual([t.path for t in read], [os.path.join(path, 'a.flac')])
+        self.assertFalse(read[0].pending)
+
+    def test_placeholders_are_read_in_parallel(self):
+        config = Mock()
+        config.metadata_cache = None
+        config.tracks_reader.workers = 4
+        config.tracks_reader.processes = False
+        self.sut = TracksReader(config)
+        names = ['track{:02}.mp3'.format(i) for i in range(1, 17)]
+        paths = [os.path.join(self._create_files(names), n) for n in names]
+        def read_tags(path):
+            if path == paths[3]: raise OSError('Could not read file')
+            tags = Mock()
+            tags.tags = {'TITLE': [os.path.basename(path)]}
+            tags.length = 10
+            return tags
+        with patch('taglib.File', side_effect=read_tags):
+            read = list(self.sut.iter_read_metadata(paths))
+        self.assertIsNone(read[3])
+        self.assertEqual([tracks[0].title for tracks in read[:3] + read[4:]], names[:3] + names[4:])
+
+    def test_does_not_read_subdirs_if_not_recursive(self):
+        path = self._create_files(['a.mp3', 'sub/b.mp3'])
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, 2)
+            tracks = list(self.sut.iter_tracks(path))
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, 'a.mp3')])
+
+    def test_can_read_dirs_recursively(self):
+        path = self._create_files(['b.mp3', 'a/y.mp3', 'a/x.mp3', 'a/b/c.mp3', 'c/d.flac'])
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, 5)
+            tracks = list(self.sut.iter_tracks(path, recursive=True))
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, p) for p in ['b.mp3', 'a/x.mp3', 'a/y.mp3', 'a/b/c.mp3', 'c/d.flac']])
+
+    def test_recursive_read_respects_max_depth(self):
+        config = Mock()
+        config.metadata_cache = None
+        config.tracks_reader.workers = 1
+        config.tracks_reader.max_depth = 1
+        self.sut = TracksReader(config)
+        path = self._create_files(['a.mp3', 'a/b.mp3', 'a/b/c.mp3'])
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, 3)
+            tracks = list(self.sut.iter_tracks(path, recursive=True))
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, p) for p in ['a.mp3', 'a/b.mp3']])
+
+    def test_recursive_read_skips_dirs_which_cannot_be_read(self):
+        path = self._create_files(['a/x.mp3', 'b/y.mp3', 'c/z.mp3'])
+        scandir = os.scandir
+        def scandir_mock(p):
+            if p == os.path.join(path, 'b'): raise PermissionError('Permission denied')
+            return scandir(p)
+        with patch('taglib.File') as taglib_file_mock, patch('os.scandir', side_effect=scandir_mock):
+            self._prepare_tagfile(taglib_file_mock, 2)
+            tracks = list(self.sut.iter_tracks(path, recursive=True))
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, p) for p in ['a/x.mp3', 'c/z.mp3']])
+
+    def test_recursive_read_detects_symlink_loops(self):
+        path = self._create_files(['a/b.mp3'])
+        os.symlink(path, os.path.join(path, 'a', 'loop'))
+        with patch('taglib.File') as taglib_file_mock:
+            self._prepare_tagfile(taglib_file_mock, 1)
+            tracks = list(self.sut.iter_tracks(path, recursive=True))
+            self.assertEqual([t.path for t in tracks], [os.path.join(path, 'a/b.mp3')])
 
     def test_can_handle_cuesheet(self):
         with patch('os.path.isdir') as isdir_mock, \
@@ -129,14 +279,16 @@ class TracksReaderTests(TestCase):
             track.index = 1
             track.length = 203
             track.offset = 0
-            cuesheet_mock = Mock()
-            cuesheet_mock.title = 'Album Title'
-            cuesheet_mock.tracks = [track]
-            cueparser_mock.parse.return_value = cuesheet_mock
+            def iter_tracks(path, use_taglib, lazy_lengths, cuesheet):
+                self.assertFalse(lazy_lengths)
+                cuesheet.title = 'Album Title'
+                yield track
+            cueparser_mock.iter_tracks.side_effect = iter_tracks
             tracks = self.sut.read('some_cue.cue')
             self.assertEqual(len(tracks), 1)
             self.assertEqual(tracks[0].path, 'some_file.flac')
             self.assertEqual(tracks[0].title, 'Title')
+            self.assertEqual(tracks[0].album, 'Album Title')
             self.assertEqual(tracks[0].index, '1')
             self.assertEqual(tracks[0].length, 203)
             self.assertEqual(tracks[0].offset, 0)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 from unittest import TestCase
-from unittest.mock import Mock, PropertyMock, patch
+from unittest.mock import MagicMock, Mock, PropertyMock, patch
 
 class UrwimCommandHandlerTests(TestCase):
 
@@ -13,8 +13,10 @@ class UrwimCommandHandlerTests(TestCase):
         self.app_instance.command_handler = self.command_handler_mock
         self.app_instance.command_panel = self.command_panel_mock
         self.app_instance.window = self.window_mock
+        self.app_instance.draw_lock = MagicMock()
         self.app_mock = Mock()
         self.app_mock.return_value = self.app_instance
+        self.app_mock._instance = self.app_instance
 
         patch('urwim.App', self.app_mock).start()
         patch('urwim.app.App', self.app_mock).start()
@@ -110,6 +112,17 @@ class UrwimCommandHandlerTests(TestCase):
         self.command_panel_mock.error.reset_mock()
 
 
+    def test_can_set_string_value(self):
+        import urwim
+        urwim.rdb['string_key'] = urwim.RdbObject('off', choices=('off', 'on'))
+        self.sut(':set string_key on')
+        self.command_panel_mock.error.assert_not_called()
+        self.assertEqual(urwim.rdb['string_key'], 'on')
+        self.sut(':set string_key 1')
+        self.command_panel_mock.error.assert_called_once()
+        self.assertEqual(urwim.rdb['string_key'], 'on')
+
+
     def test_cannot_get_bad_key(self):
         self.sut(':get aaakkk')
         self.command_panel_mock.error.assert_called_once()
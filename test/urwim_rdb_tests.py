@@ -27,3 +27,11 @@ class UrwimRdbTests(TestCase):
         self.sut['ddd'] = 'ggg'
         callback_mock.assert_called_once_with('ggg')
 
+
+    def test_value_has_to_be_one_of_choices(self):
+        self.sut['aaa'] = RdbObject('off', choices=('off', 'all', 'one'))
+        self.sut['aaa'] = 'all'
+        self.assertEqual(self.sut['aaa'], 'all')
+        with self.assertRaises(RuntimeError):
+            self.sut['aaa'] = 'some'
+        self.assertEqual(self.sut['aaa'], 'all')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+from unittest import TestCase
+from urwim.list_item import *
+from urwim.list_widget import *
+from urwim.virtual_list_walker import *
+
+class Item(ListItem):
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__(name, 'file', 'file_focused')
+
+    @property
+    def text(self):
+        return self.name
+
+class VirtualListWalkerTests(TestCase):
+
+    def setUp(self):
+        self.items = [Item(str(i)) for i in range(1000)]
+        self.sut = VirtualListWalker(self.items, cache_size=20)
+        self.listbox = ListWidget(self.sut)
+
+    def _built(self):
+        return [i for i, item in enumerate(self.items) if item._widget is not None]
+
+    def test_widgets_are_not_built_until_shown(self):
+        self.assertEqual(self._built(), [])
+        self.assertEqual(self.sut[3], self.items[3])
+        self.assertEqual(self._built(), [])
+
+    def test_widgets_are_built_only_for_shown_rows(self):
+        canvas = self.listbox.render((10, 5), focus=True)
+        self.assertEqual(self._built(), [0, 1, 2, 3, 4])
+        self.assertEqual([line.decode().strip() for line in canvas.text], ['0', '1', '2', '3', '4'])
+
+    def test_number_of_built_widgets_is_bounded(self):
+        for position in range(0, 100, 5):
+            self.listbox.focus_position = position
+            self.listbox.render((10, 5), focus=True)
+        self.assertEqual(self.sut.cached, 20)
+        self.assertEqual(len(self._built()), 20)
+        self.assertTrue(all(i >= 100 - 25 for i in self._built()))
+
+    def test_updated_item_is_shown_with_new_text(self):
+        self.listbox.render((10, 5), focus=True)
+        self.items[1].name = 'changed'
+        self.items[1].update('changed', 'file', 'file_focused')
+        canvas = self.listbox.render((10, 5), focus=True)
+        self.assertEqual(canvas.text[1].decode().strip(), 'changed')
+
+    def test_focus_item_is_item_at_focus_position(self):
+        self.listbox.focus_position = 7
+        self.assertEqual(self.sut.focus_item, self.items[7])
+
+    def test_can_be_searched_and_modified_as_a_list(self):
+        self.listbox.search_forward('500')
+        self.assertEqual(self.listbox.focus_position, 500)
+        del self.sut[0:10]
+        self.sut.insert(0, Item('new'))
+        self.assertEqual(self.sut[0].text, 'new')
+        self.assertEqual(len(self.sut), 991)
+
+    def test_removed_items_are_dropped_from_cache(self):
+        self.listbox.render((10, 5), focus=True)
+        self.assertEqual(self.sut.cached, 5)
+        del self.sut[1]
+        self.assertEqual(self.sut.cached, 4)
+        self.assertIsNone(self.items[1]._widget)
+        self.sut[0:2] = [self.items[0], Item('new')]
+        self.assertEqual(self.sut.cached, 3)
+        self.assertIsNotNone(self.items[0]._widget)
+        self.assertIsNone(self.items[2]._widget)
+        self.sut.clear()
+        self.assertEqual(self.sut.cached, 0)
+        self.assertEqual(self._built(), [])